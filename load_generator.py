@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+import json
+import random
+import string
+import sys
+import time
+import urllib.parse
+
+
+#Lastgenerator für den Music-Service: viele gleichzeitige Verbindungen mit Keep-Alive, misst Anfragen pro Sekunde und Latenzen
+#Beispiel: python load_generator.py --port 8000 --connections 50 --duration 10
+
+
+async def request(reader, writer, method, path, body=None):
+    #Sendet eine Anfrage über eine offene Verbindung und gibt (Status, JSON-Antwort) zurück
+    data = json.dumps(body).encode('utf-8') if body is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode('latin-1') + data)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith('content-length:'):
+            length = int(line.split(':', 1)[1])
+    payload = await reader.readexactly(length)
+    return status, json.loads(payload) if payload else None
+
+
+async def collect_names(host, port, count):
+    #Holt sich echte Songnamen über die Präfixsuche, damit die Last aus Treffern besteht
+    reader, writer = await asyncio.open_connection(host, port)
+    names = []
+    for letter in string.ascii_lowercase:
+        _, payload = await request(reader, writer, 'GET', f"/songs/prefix?q={letter}&limit={max(1, count // 26)}")
+        names.extend(song['name'] for song in payload['songs'])
+    writer.close()
+    return names or ['unknown']
+
+
+def build_paths(names, rng, playlist):
+    #Mischung der Anfragen: exakte Suche, geordnete Suche, Präfixsuche, Playlist-Änderungen und Statistik
+    quote = urllib.parse.quote
+    return [
+        (60, lambda: ('GET', f"/songs?name={quote(rng.choice(names))}", None)),
+        (20, lambda: ('GET', f"/songs/ordered?algorithm={rng.choice(('binary', 'jump', 'fibonacci', 'exponential'))}&name={quote(rng.choice(names))}", None)),
+        (15, lambda: ('GET', f"/songs/prefix?q={quote(rng.choice(names)[:2])}&limit=10", None)),
+        (4, lambda: ('POST', f"/playlists/{quote(playlist)}/songs", {"song": rng.choice(names)})),
+        (1, lambda: ('GET', "/stats", None)),
+    ]
+
+
+async def client(host, port, deadline, remaining, choices, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline and remaining[0] != 0:
+            remaining[0] -= 1
+            method, path, body = choices()
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, method, path, body)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors[status] = errors.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(percent / 100 * len(sorted_values)) - 1))]
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    names = await collect_names(args.host, args.port, 2000)
+    playlist = f"load-test-{int(time.time())}"
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    await request(reader, writer, 'POST', "/playlists", {"name": playlist})
+    writer.close()
+
+    weighted = build_paths(names, rng, playlist)
+    weights = [weight for weight, _ in weighted]
+    makers = [maker for _, maker in weighted]
+
+    def choices():
+        return rng.choices(makers, weights)[0]()
+
+    latencies = []
+    errors = {}
+    remaining = [args.requests or -1]
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(client(args.host, args.port, deadline, remaining, choices, latencies, errors) for _ in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    report = {
+        "benchmark": "service",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "connections": args.connections,
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0,
+        "errors": errors
+    }
+    print(f"{report['requests']} requests in {report['seconds']} s over {args.connections} connections: "
+          f"{report['requests_per_second']} req/s, p50 {report['p50_ms']} ms, p95 {report['p95_ms']} ms, p99 {report['p99_ms']} ms"
+          + (f", errors {errors}" if errors else ""))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results were saved to {args.output}.")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the music service (python main.py serve).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--connections', type=int, default=50, help="concurrent keep-alive connections (default: 50)")
+    parser.add_argument('--duration', type=float, default=10, help="seconds to run (default: 10)")
+    parser.add_argument('--requests', type=int, default=0, help="stop after this many requests (default: no limit)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run(args))
+    except ConnectionError as error:
+        print(f"Could not reach the service on {args.host}:{args.port}: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
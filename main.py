@@ -1,39 +1,115 @@
+import bisect
+import codecs
+import array
+import collections
+import contextlib
+import csv
+import gc
+import heapq
+import itertools
+import io
 import json
 import os
 import math
+import mmap
+import operator
+import re
+import sys
 import time
 import random
 import string
-import matplotlib.pyplot as plt
-import networkx as nx
+import struct
+import threading
+import weakref
 
 class Song:
-    def __init__(self, name, artist, album, genre, duration):
+    #__slots__ spart das __dict__ pro Song, bei Millionen von Songs ist das der größte Teil des Speicherverbrauchs
+    #invalid_duration enthält die ursprüngliche Angabe einer ungültigen Dauer aus älteren Dateien (sonst None), siehe from_dict
+    __slots__ = ('id', 'name', 'artist', 'album', 'genre', 'duration_seconds', 'invalid_duration')
+
+    def __init__(self, name, artist, album, genre, duration, song_id=None):
         #Initialisiert die Song-Instanz mit Name, Künstler, Album, Genre und Dauer
+        #song_id ist eine stabile ID, über die Playlists auf den Song verweisen (wird von der MusicApp vergeben)
+        #Künstler, Album und Genre wiederholen sich oft, durch sys.intern teilen sich gleiche Werte ein einziges String-Objekt
+        self.id = song_id
         self.name = name
-        self.artist = artist
-        self.album = album
-        self.genre = genre
+        self.artist = sys.intern(artist)
+        self.album = sys.intern(album)
+        self.genre = sys.intern(genre)
+        #Die Dauer wird als ganze Sekunden gespeichert, übergeben werden kann "M:SS" oder eine Zahl
         self.duration = duration
 
+    @staticmethod
+    def parse_duration(duration, invalid=ValueError):
+        #Wandelt eine Dauer im Format "M:SS" (oder "H:MM:SS") in Sekunden um
+        #Ungültige Werte lösen einen ValueError aus; mit invalid=<Wert> wird stattdessen dieser Wert zurückgegeben (für gespeicherte Altdaten)
+        if isinstance(duration, int):
+            return duration
+        seconds = 0
+        for part in str(duration).strip().split(':'):
+            if not part.isdigit():
+                if invalid is ValueError:
+                    raise ValueError(f"Invalid duration: {duration!r} (expected mm:ss)")
+                return invalid
+            seconds = seconds * 60 + int(part)
+        return seconds
+
+    @staticmethod
+    def format_duration(seconds):
+        #Wandelt Sekunden in das Anzeigeformat "M:SS" um, ab einer Stunde "H:MM:SS" (so bleibt "1:05:00" beim Speichern und Laden erhalten)
+        minutes, seconds = divmod(seconds, 60)
+        if minutes >= 60:
+            hours, minutes = divmod(minutes, 60)
+            return f"{hours}:{minutes:02d}:{seconds:02d}"
+        return f"{minutes}:{seconds:02d}"
+
+    @property
+    def duration(self):
+        #Die Dauer als "M:SS"-String, so wie sie angezeigt und in der JSON-Datei gespeichert wird
+        return Song.format_duration(self.duration_seconds)
+
+    @duration.setter
+    def duration(self, duration):
+        self.duration_seconds = Song.parse_duration(duration)
+        self.invalid_duration = None
+
+    def stored_duration_seconds(self):
+        #Dauer in Sekunden für die Binär- und SQLite-Speicherung; diese Formate kennen nur Zahlen und könnten eine ungültige Angabe nicht erhalten
+        if self.invalid_duration is not None:
+            raise ValueError(f"The song '{self.name}' has the invalid duration {self.invalid_duration!r}. "
+                             f"Please correct it before storing the catalog in this format.")
+        return self.duration_seconds
+
     def __str__(self):
          #Gibt eine formatierte String-Repräsentation des Songs zurück
         return f"{self.name} by {self.artist} - Album: {self.album}, Genre: {self.genre}, Duration: {self.duration}"
 
     def to_dict(self):
         #Wandelt die Song-Instanz in ein Dictionary um
-        return {
+        data = {
             "name": self.name,
             "artist": self.artist,
             "album": self.album,
             "genre": self.genre,
-            "duration": self.duration
+            #Eine ungültige Dauer aus einer älteren Datei wird unverändert zurückgeschrieben
+            "duration": self.duration if self.invalid_duration is None else self.invalid_duration
         }
+        if self.id is not None:
+            data["id"] = self.id
+        return data
 
     @staticmethod
     def from_dict(data):
-        #Erstellt eine Song-Instanz aus einem Dictionary
-        return Song(data['name'], data['artist'], data['album'], data['genre'], data['duration'])
+        #Erstellt eine Song-Instanz aus einem Dictionary (ältere Dateien enthalten noch keine ID)
+        #Ältere Versionen haben jede Eingabe als Dauer gespeichert (z.B. "3.5", "" oder "3 min"); solche Songs werden mit 0:00 geladen statt das Laden abzubrechen
+        #Die ursprüngliche Angabe bleibt in invalid_duration erhalten und wird von to_dict wieder geschrieben, bis eine neue Dauer gesetzt wird
+        duration = Song.parse_duration(data['duration'], invalid=None)
+        if duration is None:
+            print(f"\033[103mThe song '{data['name']}' has an invalid duration {data['duration']!r}, it is shown as 0:00 and saved unchanged.\033[0m")
+            song = Song(data['name'], data['artist'], data['album'], data['genre'], 0, data.get('id'))
+            song.invalid_duration = data['duration']
+            return song
+        return Song(data['name'], data['artist'], data['album'], data['genre'], duration, data.get('id'))
     
     def __lt__(self, other):
         #Überprüft, ob der Name des aktuellen Songs lexikografisch kleiner als der des anderen Songs ist
@@ -51,6 +127,71 @@ class Song:
         #Überprüft, ob der Name des aktuellen Songs gleich dem des anderen Songs ist
         return self.name == other.name
 
+class CountingSong(Song):
+    #Song, der jeden Vergleich mitzählt (wird im Sortier-Benchmark für die Anzahl der Vergleiche verwendet)
+    __slots__ = ()
+    comparisons = 0
+
+    def __lt__(self, other):
+        CountingSong.comparisons += 1
+        return self.name < other.name
+
+    def __le__(self, other):
+        CountingSong.comparisons += 1
+        return self.name <= other.name
+
+    def __gt__(self, other):
+        CountingSong.comparisons += 1
+        return self.name > other.name
+
+    def __eq__(self, other):
+        CountingSong.comparisons += 1
+        return self.name == other.name
+
+class MappedSong(Song):
+    #Song aus einem binären Snapshot: die Felder werden erst beim ersten Zugriff aus der gemappten Datei gelesen
+    #Bis dahin sind die Slots von Song leer; der Zugriff auf einen leeren Slot landet in __getattr__, danach ist das Feld ein normaler Slot
+    __slots__ = ('catalog', 'index')
+
+    def __init__(self, catalog, index):
+        self.catalog = catalog
+        self.index = index
+        self.invalid_duration = None
+
+    def __getattr__(self, field):
+        if field in ('catalog', 'index'):
+            raise AttributeError(field)
+        value = self.catalog.field(field, self.index)
+        setattr(self, field, value)
+        return value
+
+    def __reduce__(self):
+        #Kopien (pickle, copy) werden normale Songs und halten die gemappte Datei nicht offen
+        return Song, (self.name, self.artist, self.album, self.genre, self.duration_seconds, self.id)
+
+class StoredSong(Song):
+    #Song aus der SQLite-Datenbank: beim Start wird nur die ID geladen, die übrigen Felder liest der erste Zugriff mit einer einzigen Abfrage
+    #Wie bei MappedSong landet der Zugriff auf einen leeren Slot in __getattr__, danach sind alle Felder normale Slots
+    __slots__ = ('store',)
+
+    def __init__(self, store, song_id):
+        self.store = store
+        self.id = song_id
+        self.invalid_duration = None
+
+    def __getattr__(self, field):
+        if field not in Song.__slots__:
+            raise AttributeError(field)
+        name, artist, album, genre, self.duration_seconds = self.store.song_fields(self.id)
+        self.name = name
+        self.artist = sys.intern(artist)
+        self.album = sys.intern(album)
+        self.genre = sys.intern(genre)
+        return getattr(self, field)
+
+    def __reduce__(self):
+        return Song, (self.name, self.artist, self.album, self.genre, self.duration_seconds, self.id)
+
 class Playlist:
     def __init__(self, name):
         #Initialisiert die Playlist-Instanz mit Name und einer leeren Liste von Songs (Playlist ist anfangs noch nicht gefüllt)
@@ -65,81 +206,2002 @@ class Playlist:
          #Gibt eine formatierte String-Repräsentation der Playlist und der Anzahl der Songs zurück
         return f"Playlist: {self.name}, Songs: {len(self.songs)}"
 
+    def remove_song(self, song):
+        #Entfernt alle Einträge dieses Song-Objekts aus der Playlist (Vergleich über Identität, nicht über den Namen)
+        self.songs = [entry for entry in self.songs if entry is not song]
+
     def to_dict(self):
-        #Wandelt die Playlist-Instanz in ein Dictionary um, einschließlich der Songs
+        #Wandelt die Playlist-Instanz in ein Dictionary um; die Songs werden nur über ihre IDs referenziert
         return {
             "name": self.name,
-            "songs": [song.to_dict() for song in self.songs]
+            "song_ids": [song.id for song in self.songs]
         }
 
     @staticmethod
-    def from_dict(data):
-        #Erstellt eine Playlist-Instanz aus einem Dictionary, einschließlich der enthaltenen Songs
+    def from_dict(data, songs_by_id=None):
+        #Erstellt eine Playlist-Instanz aus einem Dictionary
+        #Die IDs werden auf die gemeinsamen Song-Objekte aus dem Katalog (songs_by_id) aufgelöst, unbekannte IDs werden übersprungen
+        #Ältere Dateien enthalten die Songs noch komplett eingebettet, dann werden eigene Song-Objekte erzeugt
         playlist = Playlist(data['name'])
-        playlist.songs = [Song.from_dict(song_data) for song_data in data['songs']]
+        if 'song_ids' in data:
+            songs_by_id = songs_by_id or {}
+            playlist.songs = [songs_by_id[song_id] for song_id in data['song_ids'] if song_id in songs_by_id]
+        else:
+            playlist.songs = [Song.from_dict(song_data) for song_data in data.get('songs', [])]
+        return playlist
+
+class BinaryCatalog:
+    #Binäres Snapshot-Format, das per mmap geöffnet wird (alle Zahlen little-endian):
+    #  Kopf: Magic, Version, journal_seq, Anzahl Songs / Strings / Songnamen / Playlists, nächste freie Song-ID und die Startpositionen der Abschnitte
+    #  String-Pool: Startpositionen (Q, Anzahl + 1) und die UTF-8-Bytes aller verschiedenen Strings, jeweils mit einem Null-Byte abgeschlossen
+    #  Die Songnamen stehen am Anfang des Pools, damit sie beim Öffnen in einem Stück dekodiert werden können
+    #  Songs spaltenweise: ids (Q), Verweise auf den String-Pool für name, artist, album, genre (je I) und duration_seconds (I)
+    #  Playlists: Namensverweise (I), Startpositionen in der ID-Liste (Q, Anzahl + 1) und die Song-IDs aller Playlists (Q)
+    MAGIC = b'MUSICBIN'
+    VERSION = 2
+    HEADER = struct.Struct('<8sIIQQQQQQ')
+    #Version 1 hatte noch keine nächste freie Song-ID im Kopf, sie wird dort aus der größten ID bestimmt
+    HEADERS = {1: struct.Struct('<8sIIQQQQQ'), 2: HEADER}
+    #Abschnitte in der Reihenfolge in der Datei mit ihrem array-Typcode
+    SECTIONS = (('string_offsets', 'Q'), ('string_data', 'B'), ('ids', 'Q'), ('name', 'I'), ('artist', 'I'), ('album', 'I'),
+                ('genre', 'I'), ('duration_seconds', 'I'), ('playlist_names', 'I'), ('playlist_offsets', 'Q'), ('playlist_song_ids', 'Q'))
+    SECTION_TABLE = struct.Struct('<' + 'Q' * len(SECTIONS))
+    STRING_FIELDS = ('name', 'artist', 'album', 'genre')
+    #Alle noch gemappten Kataloge; write() muss sie unter Windows vor dem Ersetzen der Datei schließen (detach)
+    open_catalogs = weakref.WeakSet()
+
+    def __init__(self, file_path):
+        #Öffnet die Datei per mmap; es werden nur Kopf und Abschnittstabelle gelesen, alle Spalten bleiben in der Datei
+        self.file_path = os.path.abspath(file_path)
+        with open(file_path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = struct.unpack_from('<8sI', self.mm, 0)
+        header = self.HEADERS.get(version)
+        if magic != self.MAGIC or header is None:
+            self.mm.close()
+            raise ValueError(f"{file_path} is not a binary catalog (version {self.VERSION}).")
+        (_, _, _, self.journal_seq, self.song_count, self.string_count, self.name_count,
+         self.playlist_count, *next_song_id) = header.unpack_from(self.mm, 0)
+        self.next_song_id = next_song_id[0] if next_song_id else 0
+        offsets = self.SECTION_TABLE.unpack_from(self.mm, header.size)
+        lengths = {'string_offsets': self.string_count + 1, 'string_data': None, 'playlist_names': self.playlist_count,
+                   'playlist_offsets': self.playlist_count + 1}
+        view = memoryview(self.mm)
+        self.columns = {}
+        for (section, typecode), start in zip(self.SECTIONS, offsets):
+            count = lengths.get(section, self.song_count)
+            if section == 'string_data':
+                self.string_data = view[start:offsets[2]]
+                continue
+            if section == 'playlist_song_ids':
+                count = self.columns['playlist_offsets'][-1]
+            self.columns[section] = self.column(view, start, count, typecode)
+        self.ids = self.columns['ids']
+        #Dekodierte Strings des Pools (jeder String wird höchstens einmal dekodiert, gleiche Werte teilen sich ein Objekt)
+        self.strings = [None] * self.string_count
+        BinaryCatalog.open_catalogs.add(self)
+
+    def detach(self):
+        #Kopiert die Spalten und den String-Pool in den Speicher und schließt die gemappte Datei
+        #Die MappedSongs lesen ihre noch nicht geladenen Felder danach aus den Kopien
+        if self.mm.closed:
+            return
+        for section, column in self.columns.items():
+            if isinstance(column, memoryview):
+                self.columns[section] = array.array(column.format, column.tobytes())
+                column.release()
+        self.ids = self.columns['ids']
+        string_data = self.string_data
+        self.string_data = string_data.tobytes()
+        string_data.release()
+        self.mm.close()
+        BinaryCatalog.open_catalogs.discard(self)
+
+    @staticmethod
+    def column(view, start, count, typecode):
+        #Spalte als memoryview direkt auf die Datei; nur auf Big-Endian-Systemen wird eine umgedrehte Kopie erzeugt
+        size = array.array(typecode).itemsize
+        column = view[start:start + count * size].cast(typecode)
+        if sys.byteorder == 'big':
+            column = array.array(typecode, column)
+            column.byteswap()
+        return column
+
+    def string(self, ref):
+        value = self.strings[ref]
+        if value is None:
+            offsets = self.columns['string_offsets']
+            value = sys.intern(str(self.string_data[offsets[ref]:offsets[ref + 1] - 1], 'utf-8'))
+            self.strings[ref] = value
+        return value
+
+    def field(self, field, index):
+        #Liest ein einzelnes Feld des Songs an Position index
+        if field in self.STRING_FIELDS:
+            return self.string(self.columns[field][index])
+        if field == 'duration_seconds':
+            return self.columns[field][index]
+        if field == 'id':
+            return self.ids[index]
+        raise AttributeError(field)
+
+    def songs(self):
+        return [MappedSong(self, index) for index in range(self.song_count)]
+
+    def name_index(self, songs, normalize):
+        #Baut den Namensindex über die Verweise in den String-Pool
+        #Alle Songnamen werden mit einem einzigen decode/split dekodiert und je einmal normalisiert, die übrigen Felder bleiben ungelesen
+        if self.name_count:
+            end = self.columns['string_offsets'][self.name_count]
+            self.strings[:self.name_count] = str(self.string_data[:end], 'utf-8').split('\0')[:self.name_count]
+        keys = list(map(normalize, self.strings[:self.name_count]))
+        #Songs nach Namensverweis einsortieren (Listenzugriff über den Verweis statt Dictionary-Zugriff pro Song)
+        buckets = [[] for _ in range(self.name_count)]
+        for song, ref in zip(songs, self.columns['name']):
+            buckets[ref].append(song)
+        name_index = dict(zip(keys, buckets))
+        if len(name_index) < len(keys):
+            #Namen, die sich nur in der Groß- und Kleinschreibung unterscheiden, teilen sich einen Schlüssel
+            name_index = {}
+            for key, bucket in zip(keys, buckets):
+                existing = name_index.setdefault(key, bucket)
+                if existing is not bucket:
+                    existing.extend(bucket)
+                    existing.sort(key=lambda song: song.index)
+        return name_index
+
+    def playlists(self):
+        #Liefert (Name, Liste der Song-IDs) für jede Playlist
+        names = self.columns['playlist_names']
+        offsets = self.columns['playlist_offsets']
+        song_ids = self.columns['playlist_song_ids']
+        for index in range(self.playlist_count):
+            yield self.string(names[index]), song_ids[offsets[index]:offsets[index + 1]].tolist()
+
+    @staticmethod
+    def is_binary(file_path):
+        #Erkennt einen binären Snapshot an den ersten Bytes der Datei
+        try:
+            with open(file_path, 'rb') as f:
+                return f.read(len(BinaryCatalog.MAGIC)) == BinaryCatalog.MAGIC
+        except OSError:
+            return False
+
+    @staticmethod
+    def write(file_path, songs, playlists, journal_seq=0, next_song_id=0):
+        #Schreibt Songs und Playlists als binären Snapshot (erst in eine temporäre Datei, dann atomar ersetzen)
+        #Eine noch gemappte alte Version bleibt unter POSIX gültig, bis sie nicht mehr referenziert wird
+        pool = {}
+        pool_bytes = []
+
+        def ref(value):
+            index = pool.get(value)
+            if index is None:
+                if '\0' in value:
+                    raise ValueError(f"Strings with null characters cannot be stored: {value!r}")
+                index = pool[value] = len(pool_bytes)
+                pool_bytes.append(value.encode('utf-8') + b'\0')
+            return index
+
+        #Erst alle Songnamen in den Pool, damit sie dort einen zusammenhängenden Bereich bilden
+        for song in songs:
+            ref(song.name)
+        name_count = len(pool_bytes)
+
+        columns = {section: array.array(typecode) for section, typecode in BinaryCatalog.SECTIONS if section != 'string_data'}
+        for song in songs:
+            columns['ids'].append(song.id)
+            columns['name'].append(ref(song.name))
+            columns['artist'].append(ref(song.artist))
+            columns['album'].append(ref(song.album))
+            columns['genre'].append(ref(song.genre))
+            columns['duration_seconds'].append(song.stored_duration_seconds())
+        columns['playlist_offsets'].append(0)
+        for playlist in playlists:
+            columns['playlist_names'].append(ref(playlist.name))
+            columns['playlist_song_ids'].extend(song.id for song in playlist.songs)
+            columns['playlist_offsets'].append(len(columns['playlist_song_ids']))
+        columns['string_offsets'].extend(itertools.accumulate((len(value) for value in pool_bytes), initial=0))
+
+        temp_file = file_path + '.tmp'
+        with open(temp_file, 'wb') as f:
+            #Kopf und Abschnittstabelle werden am Ende geschrieben, wenn die Positionen bekannt sind
+            f.write(bytes(BinaryCatalog.HEADER.size + BinaryCatalog.SECTION_TABLE.size))
+            offsets = []
+            for section, _ in BinaryCatalog.SECTIONS:
+                #Jeder Abschnitt beginnt an einer durch 8 teilbaren Position
+                f.write(bytes(-f.tell() % 8))
+                offsets.append(f.tell())
+                if section == 'string_data':
+                    f.writelines(pool_bytes)
+                    continue
+                column = columns[section]
+                if sys.byteorder == 'big':
+                    column.byteswap()
+                column.tofile(f)
+            f.seek(0)
+            f.write(BinaryCatalog.HEADER.pack(BinaryCatalog.MAGIC, BinaryCatalog.VERSION, 0, journal_seq,
+                                              len(columns['ids']), len(pool_bytes), name_count, len(columns['playlist_names']), next_song_id))
+            f.write(BinaryCatalog.SECTION_TABLE.pack(*offsets))
+        #Unter Windows schlägt os.replace mit PermissionError fehl, solange die Zieldatei gemappt ist
+        if os.name == 'nt':
+            for catalog in [catalog for catalog in BinaryCatalog.open_catalogs if catalog.file_path == os.path.abspath(file_path)]:
+                catalog.detach()
+        os.replace(temp_file, file_path)
+
+class SQLiteStore:
+    #Speichert Songs, Playlists und die Playlist-Einträge in einer lokalen SQLite-Datenbank
+    #Die *_key-Spalten enthalten die normalisierten Werte (casefold), SQLite selbst kennt nur ASCII-Kleinschreibung
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS songs (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            name_key TEXT NOT NULL,
+            artist TEXT NOT NULL,
+            artist_key TEXT NOT NULL,
+            album TEXT NOT NULL,
+            genre TEXT NOT NULL,
+            genre_key TEXT NOT NULL,
+            duration_seconds INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS songs_name ON songs (name_key);
+        CREATE INDEX IF NOT EXISTS songs_artist ON songs (artist_key);
+        CREATE INDEX IF NOT EXISTS songs_genre ON songs (genre_key);
+        CREATE INDEX IF NOT EXISTS songs_duration ON songs (duration_seconds);
+        CREATE TABLE IF NOT EXISTS playlists (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            name_key TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS playlists_name ON playlists (name_key);
+        CREATE TABLE IF NOT EXISTS playlist_songs (
+            playlist_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            song_id INTEGER NOT NULL,
+            PRIMARY KEY (playlist_id, position)
+        );
+        CREATE INDEX IF NOT EXISTS playlist_songs_song ON playlist_songs (song_id);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, file_path):
+        import sqlite3
+        self.file_path = file_path
+        #isolation_level=None: Transaktionen werden selbst mit BEGIN/COMMIT gesteuert
+        #check_same_thread=False: der ConcurrentCatalog schreibt aus mehreren Threads, serialisiert die Zugriffe aber selbst über die Schreibsperre
+        self.connection = sqlite3.connect(file_path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        #Für das Album gibt es keine *_key-Spalte, Abfragen vergleichen es über dieselbe Normalisierung wie im Speicher
+        self.connection.create_function('casefold', 1, self.normalize, deterministic=True)
+        #Verschachtelungstiefe von transaction(); nur die äußerste Ebene schreibt BEGIN und COMMIT
+        self.depth = 0
+
+    @staticmethod
+    def normalize(value):
+        return value.casefold()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        #Fasst alle Schreibzugriffe innerhalb des with-Blocks in einer Transaktion zusammen (bei einem Fehler wird alles zurückgerollt)
+        if self.depth == 0:
+            self.connection.execute("BEGIN")
+        self.depth += 1
+        try:
+            yield self.connection
+        except BaseException:
+            self.depth -= 1
+            if self.depth == 0:
+                self.connection.execute("ROLLBACK")
+            raise
+        self.depth -= 1
+        if self.depth == 0:
+            self.connection.execute("COMMIT")
+
+    def is_empty(self):
+        return self.connection.execute("SELECT NOT EXISTS (SELECT 1 FROM songs) AND NOT EXISTS (SELECT 1 FROM playlists)").fetchone()[0] == 1
+
+    def song_rows(self, songs):
+        for song in songs:
+            yield (song.id, song.name, self.normalize(song.name), song.artist, self.normalize(song.artist), song.album,
+                   song.genre, self.normalize(song.genre), song.stored_duration_seconds())
+
+    def import_catalog(self, songs, playlists, next_song_id=0):
+        #Schreibt einen kompletten Katalog in einer einzigen Transaktion (vorhandene Daten werden ersetzt)
+        with self.transaction() as connection:
+            self.clear()
+            self.reserve_song_id(next_song_id)
+            connection.executemany("INSERT INTO songs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self.song_rows(songs))
+            for playlist in playlists:
+                playlist_id = connection.execute("INSERT INTO playlists (name, name_key) VALUES (?, ?)",
+                                                 (playlist.name, self.normalize(playlist.name))).lastrowid
+                connection.executemany("INSERT INTO playlist_songs VALUES (?, ?, ?)",
+                                       ((playlist_id, position, song.id) for position, song in enumerate(playlist.songs)))
+
+    def clear(self):
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM playlist_songs")
+            connection.execute("DELETE FROM playlists")
+            connection.execute("DELETE FROM songs")
+            connection.execute("DELETE FROM meta")
+
+    def reserve_song_id(self, next_song_id):
+        #Merkt sich die nächste freie Song-ID; sie sinkt nie, auch wenn der Song mit der größten ID gelöscht wird
+        self.connection.execute("INSERT INTO meta VALUES ('next_song_id', ?) ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)",
+                                (next_song_id,))
+
+    def next_song_id(self):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'next_song_id'").fetchone()
+        return row[0] if row else 0
+
+    def song_ids(self):
+        #Alle Song-IDs (aufsteigend); die Felder lädt erst StoredSong bei Bedarf
+        return [row[0] for row in self.connection.execute("SELECT id FROM songs ORDER BY id")]
+
+    def song_names(self):
+        #(ID, Name) aller Songs, für den Namensindex, wenn er im Speicher gebraucht wird
+        return self.connection.execute("SELECT id, name FROM songs")
+
+    def song_fields(self, song_id):
+        row = self.connection.execute("SELECT name, artist, album, genre, duration_seconds FROM songs WHERE id = ?", (song_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Song {song_id} is not in {self.file_path}")
+        return row
+
+    def playlists(self):
+        #Alle Playlists als [(Name, [Song-IDs])] in der Reihenfolge, in der sie angelegt wurden
+        playlists = []
+        for playlist_id, name in self.connection.execute("SELECT id, name FROM playlists ORDER BY id").fetchall():
+            song_ids = [row[0] for row in self.connection.execute(
+                "SELECT song_id FROM playlist_songs WHERE playlist_id = ? ORDER BY position", (playlist_id,))]
+            playlists.append((name, song_ids))
+        return playlists
+
+    def playlist_keys(self, song_id):
+        #Normalisierte Namen der Playlists, die den Song enthalten (über den Index auf playlist_songs.song_id)
+        return {row[0] for row in self.connection.execute(
+            "SELECT DISTINCT playlists.name_key FROM playlist_songs JOIN playlists ON playlists.id = playlist_songs.playlist_id "
+            "WHERE playlist_songs.song_id = ?", (song_id,))}
+
+    def playlist_id(self, name):
+        #Bei gleichen Namen gilt wie im Speicher die zuerst angelegte Playlist
+        row = self.connection.execute("SELECT id FROM playlists WHERE name_key = ? ORDER BY id LIMIT 1", (self.normalize(name),)).fetchone()
+        return row[0] if row else None
+
+    def apply(self, record):
+        #Führt eine Änderung im selben Format wie die Journal-Einträge aus (add_song, delete_song, create_playlist, add_to_playlist)
+        #Außerhalb von transaction() wird jede Änderung sofort committet
+        with self.transaction() as connection:
+            op = record['op']
+            if op == 'add_song':
+                song = Song.from_dict(record['song'])
+                connection.execute("INSERT INTO songs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", next(self.song_rows([song])))
+                self.reserve_song_id(song.id + 1)
+            elif op == 'delete_song':
+                connection.execute("DELETE FROM playlist_songs WHERE song_id = ?", (record['id'],))
+                connection.execute("DELETE FROM songs WHERE id = ?", (record['id'],))
+            elif op == 'create_playlist':
+                connection.execute("INSERT INTO playlists (name, name_key) VALUES (?, ?)", (record['name'], self.normalize(record['name'])))
+            elif op == 'add_to_playlist':
+                playlist_id = self.playlist_id(record['playlist'])
+                if playlist_id is not None:
+                    connection.execute("INSERT INTO playlist_songs SELECT ?, COALESCE(MAX(position) + 1, 0), ? FROM playlist_songs WHERE playlist_id = ?",
+                                       (playlist_id, record['song_id'], playlist_id))
+
+    def find_song_ids(self, name):
+        #Indizierte Suche über den normalisierten Namen
+        return [row[0] for row in self.connection.execute("SELECT id FROM songs WHERE name_key = ? ORDER BY id", (self.normalize(name),))]
+
+    def query_ids(self, artist=None, album=None, genre=None, min_seconds=None, max_seconds=None):
+        #Abfrage mit denselben Bedingungen wie MusicApp.query (UND-Verknüpfung); SQLite wählt selbst den passenden Index
+        #Künstler, Genre und Dauer sind indiziert, das Album wird beim Durchlauf der übrigen Treffer geprüft
+        conditions = []
+        parameters = []
+        for condition, value in (('artist_key = ?', artist), ('casefold(album) = ?', album), ('genre_key = ?', genre)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(self.normalize(value))
+        for condition, value in (('duration_seconds >= ?', min_seconds), ('duration_seconds <= ?', max_seconds)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return [row[0] for row in self.connection.execute(f"SELECT id FROM songs{where} ORDER BY id", parameters)]
+
+    def checkpoint(self):
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        self.connection.close()
+
+
+class JSONStreamReader:
+    #Regulärer Ausdruck zum Überspringen von Leerzeichen (schneller als Zeichen für Zeichen in Python)
+    WHITESPACE = re.compile(r'[ \t\r\n]*')
+    #Rest des Puffers, der noch zu einer Zahl gehören kann ("12." oder "1e" am Ende eines Blocks)
+    NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')
+
+    def __init__(self, f, chunk_size=1 << 16):
+        #Liest eine JSON-Datei der Form {"key": [...], ...} stückweise ein, ohne den ganzen Text im Speicher zu halten
+        #f muss im Binärmodus geöffnet sein, damit die Anzahl der gelesenen Bytes für die Fortschrittsanzeige bekannt ist
+        self.f = f
+        self.chunk_size = chunk_size
+        #scan_once ist der C-Scanner hinter json.loads und dekodiert einen Wert ab einer Position ohne zusätzlichen Overhead
+        self.scan_once = json.JSONDecoder().scan_once
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.bytes_read = 0
+        self.eof = False
+
+    def fill(self):
+        #Liest den nächsten Block aus der Datei und verwirft dabei den bereits verarbeiteten Teil des Puffers
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self.eof = True
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return bool(chunk)
+
+    def peek(self):
+        #Überspringt Leerzeichen und gibt das nächste Zeichen zurück ('' am Dateiende)
+        while True:
+            self.pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, characters):
+        #Liest ein einzelnes Strukturzeichen ({, [, :, ...) und prüft, ob es erlaubt ist
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(f"Unexpected character {character!r} at byte {self.bytes_read}, expected one of {characters!r}")
+        self.pos += 1
+        return character
+
+    def value(self):
+        #Dekodiert genau einen JSON-Wert; reicht der Puffer nicht aus, wird nachgeladen und erneut versucht
+        self.peek()
+        while True:
+            try:
+                value, end = self.scan_once(self.buffer, self.pos)
+            except (StopIteration, json.JSONDecodeError) as error:
+                if not self.fill():
+                    raise ValueError(f"Invalid JSON near byte {self.bytes_read}") from error
+                continue
+            #Eine Zahl am Pufferende könnte abgeschnitten sein: scan_once liest von "12.", "1e" oder "1e-" nur den gültigen Anfang,
+            #daher wird nachgeladen, solange der Rest des Puffers noch zur Zahl gehören kann
+            if isinstance(value, (int, float)) and self.NUMBER_TAIL.match(self.buffer, end) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self):
+        #Liefert (key, value) für jeden Eintrag des äußeren Objekts; bei Arrays wird jedes Element einzeln geliefert
+        self.expect('{')
+        if self.peek() == '}':
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            if self.peek() == '[':
+                self.pos += 1
+                if self.peek() == ']':
+                    self.pos += 1
+                else:
+                    while True:
+                        yield key, self.value()
+                        #Schneller Weg für das Trennzeichen, solange es noch im Puffer liegt
+                        pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+                        if pos < len(self.buffer) and self.buffer[pos] == ',':
+                            self.pos = pos + 1
+                            continue
+                        if self.expect(',]') == ']':
+                            break
+            else:
+                yield key, self.value()
+            if self.expect(',}') == '}':
+                return
+
+
+class PrefixIndex:
+    #Kurze Präfixe passen auf sehr viele verschiedene Werte, für sie (bis TOP_PREFIX_LENGTH Zeichen, auch das leere Präfix) werden die
+    #TOP_SIZE häufigsten Werte vorab bestimmt und in add/remove gepflegt; längere Präfixe decken so wenige Werte ab, dass der Bereich durchlaufen wird
+    TOP_PREFIX_LENGTH = 2
+    TOP_SIZE = 32
+
+    def __init__(self, field, songs=()):
+        #Sortierter Index über ein Textfeld (name, artist oder album) für die Präfixsuche
+        #keys enthält die normalisierten Werte in sortierter Reihenfolge, songs an derselben Position den zugehörigen Song
+        #Ein Präfix entspricht einem zusammenhängenden Bereich in keys, der mit Binärsuche gefunden wird
+        self.field = field
+        pairs = sorted(((self.normalize(getattr(song, field)), song) for song in songs), key=lambda pair: pair[0])
+        self.keys = [key for key, _ in pairs]
+        self.songs = [song for _, song in pairs]
+        #top: Präfix -> [Einträge, Schranke]; Einträge sind (-Anzahl, Schlüssel), aufsteigend sortiert (häufigster Wert zuerst, bei gleicher Anzahl alphabetisch)
+        #Jeder nicht aufgeführte Wert mit diesem Präfix liegt in dieser Ordnung hinter der Schranke (None: es fehlt keiner),
+        #alle Einträge vor der Schranke sind also sicher die häufigsten Werte
+        self.top = self.build_top()
+
+    @staticmethod
+    def normalize(value):
+        #Gleiche Werte (z.B. derselbe Künstler) teilen sich durch sys.intern ein einziges String-Objekt
+        return sys.intern(value.casefold())
+
+    def add(self, song):
+        #Fügt einen Song an der passenden Position ein (Binärsuche statt neu zu sortieren)
+        key = self.normalize(getattr(song, self.field))
+        index = bisect.bisect_right(self.keys, key)
+        self.keys.insert(index, key)
+        self.songs.insert(index, song)
+        self.update_top(key, index + 1 - bisect.bisect_left(self.keys, key, 0, index))
+
+    def remove(self, song):
+        #Entfernt genau dieses Song-Objekt aus dem Index
+        key = self.normalize(getattr(song, self.field))
+        start = index = bisect.bisect_left(self.keys, key)
+        while index < len(self.keys) and self.keys[index] == key:
+            if self.songs[index] is song:
+                del self.keys[index]
+                del self.songs[index]
+                self.update_top(key, bisect.bisect_right(self.keys, key, start) - start)
+                return
+            index += 1
+
+    def prefix_end(self, prefix, start=0):
+        #Ende des Bereichs in keys, dessen Schlüssel mit prefix beginnen: Binärsuche nach dem kleinsten String hinter diesem Bereich
+        stripped = prefix.rstrip('\U0010ffff')
+        if not stripped:
+            return len(self.keys)
+        return bisect.bisect_left(self.keys, stripped[:-1] + chr(ord(stripped[-1]) + 1), start)
+
+    def rank(self, start, end):
+        #Die TOP_SIZE häufigsten Schlüssel in keys[start:end] als [Einträge, Schranke] (siehe top)
+        #Counter zählt und sorted ordnet in C; sorted ist stabil, gleich häufige Schlüssel bleiben alphabetisch
+        counts = collections.Counter(self.keys[start:end])
+        ranked = [(-counts[key], key) for key in sorted(counts, key=counts.__getitem__, reverse=True)[:self.TOP_SIZE + 1]]
+        return [ranked, ranked.pop() if len(ranked) > self.TOP_SIZE else None]
+
+    def build_top(self):
+        #Zuerst je ein Bereich pro Präfix der Länge TOP_PREFIX_LENGTH (kürzere Schlüssel bilden einen eigenen Bereich),
+        #die kürzeren Präfixe entstehen durch Zusammenführen: die häufigsten Werte eines Präfixes sind unter den häufigsten seiner Teilbereiche
+        length = self.TOP_PREFIX_LENGTH
+        level = {}
+        index = 0
+        while index < len(self.keys):
+            prefix = self.keys[index][:length]
+            end = self.prefix_end(prefix, index) if len(prefix) == length else bisect.bisect_right(self.keys, prefix, index)
+            level[(prefix, index)] = self.rank(index, end)
+            index = end
+        top = {}
+        while True:
+            top.update((prefix, entry) for (prefix, _), entry in level.items() if len(prefix) == length)
+            if length == 0:
+                return top
+            length -= 1
+            parents = {}
+            for (prefix, _), (entries, bound) in level.items():
+                parent = parents.setdefault((prefix[:length], 0), [[], None])
+                parent[0].extend(entries)
+                parent[1] = self.lower_bound(parent[1], bound)
+            for parent in parents.values():
+                parent[0].sort()
+                if len(parent[0]) > self.TOP_SIZE:
+                    parent[1] = self.lower_bound(parent[1], parent[0][self.TOP_SIZE])
+                    del parent[0][self.TOP_SIZE:]
+            level = parents
+
+    @staticmethod
+    def lower_bound(first, second):
+        #Die frühere von zwei Schranken, None steht für keine Schranke
+        if first is None or second is None:
+            return second if first is None else first
+        return min(first, second)
+
+    def update_top(self, key, count):
+        #Der Schlüssel kommt jetzt auf count Songs; angepasst werden alle vorab bestimmten Präfixe des Schlüssels
+        for length in range(min(self.TOP_PREFIX_LENGTH, len(key)) + 1):
+            prefix = key[:length]
+            top = self.top.get(prefix)
+            if top is None:
+                if count:
+                    self.top[prefix] = [[(-count, key)], None]
+                continue
+            entries = [entry for entry in top[0] if entry[1] != key]
+            if count:
+                bisect.insort(entries, (-count, key))
+            if len(entries) > self.TOP_SIZE:
+                top[1] = self.lower_bound(top[1], entries.pop())
+            if not entries and top[1] is None:
+                del self.top[prefix]
+            else:
+                top[0] = entries
+
+    def complete(self, prefix, limit=10):
+        #Gibt die limit häufigsten Werte zurück, die mit dem Präfix beginnen: [(Wert, Anzahl der Songs), ...], der häufigste zuerst
+        #(bei gleicher Anzahl alphabetisch)
+        #Kurze Präfixe werden aus top beantwortet; liegen nicht alle limit Einträge vor der Schranke (nach vielen Änderungen),
+        #wird die Liste für dieses Präfix neu bestimmt. Bei längeren Präfixen werden gleiche Werte per Binärsuche übersprungen
+        prefix = prefix.casefold()
+        if limit <= 0:
+            return []
+        if len(prefix) > self.TOP_PREFIX_LENGTH or limit > self.TOP_SIZE:
+            return heapq.nlargest(limit, self.prefix_values(prefix), key=operator.itemgetter(1))
+        top = self.top.get(prefix)
+        if top is None:
+            return []
+        entries, bound = top
+        if bound is not None and (len(entries) < limit or entries[limit - 1] > bound):
+            start = bisect.bisect_left(self.keys, prefix)
+            top = self.top[prefix] = self.rank(start, self.prefix_end(prefix, start))
+            entries = top[0]
+        return [(getattr(self.songs[bisect.bisect_left(self.keys, key)], self.field), -count) for count, key in entries[:limit]]
+
+    def prefix_values(self, prefix):
+        #Liefert (Wert, Anzahl der Songs) für jeden verschiedenen Wert, der mit dem (normalisierten) Präfix beginnt, alphabetisch
+        index = bisect.bisect_left(self.keys, prefix)
+        while index < len(self.keys) and self.keys[index].startswith(prefix):
+            end = bisect.bisect_right(self.keys, self.keys[index], index)
+            yield getattr(self.songs[index], self.field), end - index
+            index = end
+
+    def songs_with_prefix(self, prefix, limit=None):
+        #Gibt die Songs zurück, deren Feld mit dem Präfix beginnt (höchstens limit Songs)
+        prefix = prefix.casefold()
+        start = bisect.bisect_left(self.keys, prefix)
+        end = start
+        while end < len(self.keys) and (limit is None or end - start < limit) and self.keys[end].startswith(prefix):
+            end += 1
+        return self.songs[start:end]
+
+
+class NGramIndex:
+    def __init__(self, keys=(), n=3):
+        #Invertierter Index: Zeichen-n-Gramm -> Menge der normalisierten Songnamen, die dieses n-Gramm enthalten
+        #Jeder Name steht nur einmal im Index, auch wenn mehrere Songs so heißen
+        self.n = n
+        self.postings = {}
+        for key in keys:
+            self.add(key)
+
+    def grams(self, key):
+        #Zerlegt einen Namen in überlappende n-Gramme; Leerzeichen am Rand markieren Anfang und Ende des Namens
+        padded = f" {key} "
+        return {padded[index:index + self.n] for index in range(max(1, len(padded) - self.n + 1))}
+
+    def add(self, key):
+        for gram in self.grams(key):
+            self.postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key):
+        for gram in self.grams(key):
+            names = self.postings.get(gram)
+            if names is not None:
+                names.discard(key)
+                if not names:
+                    del self.postings[gram]
+
+    def candidates(self, query, limit=200, posting_budget=20000):
+        #Sucht die Namen, die die meisten n-Gramme mit der Anfrage teilen
+        #Seltene n-Gramme werden zuerst ausgewertet; sehr häufige werden übersprungen, sobald das Budget an Einträgen verbraucht ist
+        #Dadurch bleibt der Aufwand pro Anfrage begrenzt, egal wie groß der Katalog ist
+        postings = sorted((self.postings.get(gram, ()) for gram in self.grams(query)), key=len)
+        counts = collections.Counter()
+        examined = 0
+        for names in postings:
+            if counts and examined + len(names) > posting_budget:
+                break
+            counts.update(names)
+            examined += len(names)
+        return [key for key, _ in counts.most_common(limit)]
+
+    @staticmethod
+    def bounded_edit_distance(first, second, max_distance):
+        #Levenshtein-Distanz mit Abbruch: sobald jede Zelle einer Zeile über max_distance liegt, wird max_distance + 1 zurückgegeben
+        if abs(len(first) - len(second)) > max_distance:
+            return max_distance + 1
+        previous = list(range(len(second) + 1))
+        for row, first_character in enumerate(first, 1):
+            current = [row]
+            for column, second_character in enumerate(second, 1):
+                cost = 0 if first_character == second_character else 1
+                current.append(min(previous[column] + 1, current[column - 1] + 1, previous[column - 1] + cost))
+            if min(current) > max_distance:
+                return max_distance + 1
+            previous = current
+        return previous[-1]
+
+
+class QueryIndex:
+    #Felder mit wenigen verschiedenen Werten, die über einen Hash-Index abgefragt werden
+    CATEGORICAL_FIELDS = ('artist', 'album', 'genre')
+
+    def __init__(self, songs=()):
+        #Sekundärindizes für Abfragen über mehrere Felder
+        #values: Feld -> normalisierter Wert -> {Song-ID: Song}; das Dictionary erlaubt schnelles Prüfen und Entfernen über die ID
+        #durations/duration_songs: nach Dauer sortierte Sekunden und an derselben Position der zugehörige Song (für Bereichsabfragen)
+        self.values = {field: {} for field in self.CATEGORICAL_FIELDS}
+        pairs = sorted(((song.duration_seconds, song) for song in songs), key=lambda pair: pair[0])
+        self.durations = [seconds for seconds, _ in pairs]
+        self.duration_songs = [song for _, song in pairs]
+        for song in songs:
+            self.add_values(song)
+
+    @staticmethod
+    def normalize(value):
+        return sys.intern(value.casefold())
+
+    def add_values(self, song):
+        for field, index in self.values.items():
+            index.setdefault(self.normalize(getattr(song, field)), {})[song.id] = song
+
+    def add(self, song):
+        self.add_values(song)
+        index = bisect.bisect_right(self.durations, song.duration_seconds)
+        self.durations.insert(index, song.duration_seconds)
+        self.duration_songs.insert(index, song)
+
+    def remove(self, song):
+        for field, index in self.values.items():
+            key = self.normalize(getattr(song, field))
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(song.id, None)
+                if not bucket:
+                    del index[key]
+        index = bisect.bisect_left(self.durations, song.duration_seconds)
+        while index < len(self.durations) and self.durations[index] == song.duration_seconds:
+            if self.duration_songs[index] is song:
+                del self.durations[index]
+                del self.duration_songs[index]
+                return
+            index += 1
+
+    def duration_range(self, min_seconds=None, max_seconds=None):
+        #Positionsbereich [start, end) in der sortierten Dauer-Liste
+        start = 0 if min_seconds is None else bisect.bisect_left(self.durations, min_seconds)
+        end = len(self.durations) if max_seconds is None else bisect.bisect_right(self.durations, max_seconds)
+        return start, max(start, end)
+
+    def plan(self, filters, min_seconds=None, max_seconds=None):
+        #Schätzt für jedes Prädikat die Anzahl passender Songs und sortiert aufsteigend
+        #Die Größe eines Hash-Buckets bzw. eines Dauer-Bereichs ist ohne Durchlauf bekannt, daher kostet die Planung fast nichts
+        steps = []
+        for field, value in filters.items():
+            bucket = self.values[field].get(self.normalize(value), {})
+            steps.append((len(bucket), field, bucket))
+        if min_seconds is not None or max_seconds is not None:
+            start, end = self.duration_range(min_seconds, max_seconds)
+            steps.append((end - start, 'duration', (start, end)))
+        steps.sort(key=lambda step: step[0])
+        return steps
+
+    def run(self, steps):
+        #Durchläuft nur das selektivste Prädikat und prüft die übrigen Song für Song (lazy, ohne Zwischenlisten)
+        if not steps:
+            return
+        _, driver_field, driver = steps[0]
+        if driver_field == 'duration':
+            start, end = driver
+            candidates = itertools.islice(self.duration_songs, start, end)
+        else:
+            candidates = driver.values()
+
+        checks = []
+        for _, field, source in steps[1:]:
+            if field == 'duration':
+                start, end = source
+                low = self.durations[start] if start < end else None
+                high = self.durations[end - 1] if start < end else None
+                checks.append(lambda song, low=low, high=high: low is not None and low <= song.duration_seconds <= high)
+            else:
+                checks.append(lambda song, bucket=source: song.id in bucket)
+
+        for song in candidates:
+            if all(check(song) for check in checks):
+                yield song
+
+
+class QueryCache:
+    def __init__(self, maxsize=4096):
+        #LRU-Cache für Suchergebnisse: Schlüssel (Algorithmus, normalisierte Anfrage, ...) -> Ergebnis
+        #Die Reihenfolge des OrderedDict ist die Nutzungsreihenfolge, vorne steht der am längsten nicht genutzte Eintrag
+        #Die Sperre schützt die Einträge, wenn mehrere Leser gleichzeitig suchen (ConcurrentCatalog.read)
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            value = self.entries.get(key, default)
+            if value is default:
+                self.misses += 1
+            else:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate):
+        #Entfernt alle Einträge, für die predicate(key, value) wahr ist, und gibt ihre Anzahl zurück
+        with self.lock:
+            stale = [key for key, value in self.entries.items() if predicate(key, value)]
+            for key in stale:
+                del self.entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self.lock:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"size": len(self.entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0, "evictions": self.evictions,
+                "invalidations": self.invalidations}
+
+
+class SearchTree:
+    def __init__(self, songs):
+        #Balancierter binärer Suchbaum über einer nach Namen sortierten Song-Liste, in Arrays statt verschachtelten Dictionaries gespeichert
+        #Knoten i ist der Song songs[i]; left[i] und right[i] sind die Indizes der Kinder (-1 = kein Kind)
+        #Der Baum wird einmal iterativ aufgebaut, ohne Teillisten zu kopieren und ohne Rekursion
+        self.songs = songs
+        num_elements = len(songs)
+        typecode = 'i' if num_elements < 2 ** 31 else 'q'
+        self.left = array.array(typecode, [-1]) * num_elements
+        self.right = array.array(typecode, [-1]) * num_elements
+        self.root = -1
+
+        #Jeder Eintrag beschreibt einen Bereich [low, high) der sortierten Liste, dessen Mitte ein Knoten wird
+        stack = [(0, num_elements, -1, False)] if num_elements else []
+        while stack:
+            low, high, parent, is_right = stack.pop()
+            mid = (low + high) // 2
+            if parent == -1:
+                self.root = mid
+            elif is_right:
+                self.right[parent] = mid
+            else:
+                self.left[parent] = mid
+            if low < mid:
+                stack.append((low, mid, mid, False))
+            if mid + 1 < high:
+                stack.append((mid + 1, high, mid, True))
+
+    def __len__(self):
+        return len(self.songs)
+
+    def path_to(self, node):
+        #Gibt den Weg von der Wurzel bis zum Knoten zurück (die Knotennummern sind die Positionen in der sortierten Liste)
+        path = []
+        current = self.root
+        while current != -1:
+            path.append(current)
+            if current == node:
+                break
+            current = self.left[current] if node < current else self.right[current]
+        return path
+
+
+class CatalogGenerator:
+    #Übersetzungstabelle Byte -> Kleinbuchstabe
+    LETTERS = bytes(ord('a') + byte % 26 for byte in range(256))
+
+    def __init__(self, seed=None, num_artists=5000, albums_per_artist=4, num_genres=40, artist_skew=1.0, genre_skew=1.2,
+                 duplicate_rate=0.01, min_duration=120, max_duration=359, min_name_length=3, max_name_length=10):
+        #Reproduzierbarer Generator für synthetische Kataloge (gleicher seed -> gleicher Katalog)
+        #Künstler und Genres werden nach einer Zipf-Verteilung gewählt (skew 0 = gleichverteilt, größer = wenige sehr häufige Werte)
+        #duplicate_rate ist der Anteil der Songs, die den Namen eines früheren Songs wiederverwenden; Dauern liegen in Sekunden zwischen min_duration und max_duration
+        #Statt einzelner random-Aufrufe pro Feld werden alle Werte eines Blocks mit einem rng.choices-Aufruf pro Feld erzeugt
+        self.rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+        if min_duration > max_duration or min_name_length > max_name_length:
+            raise ValueError("The minimum must not be larger than the maximum.")
+        self.duplicate_rate = duplicate_rate
+        self.min_name_length = min_name_length
+        self.max_name_length = max_name_length
+        self.albums_per_artist = albums_per_artist
+        self.artists = self.random_strings(num_artists)
+        self.albums = self.random_strings(num_artists * albums_per_artist)
+        self.genres = self.random_strings(num_genres)
+        self.artist_weights = self.zipf_weights(num_artists, artist_skew)
+        self.genre_weights = self.zipf_weights(num_genres, genre_skew)
+        self.durations = range(min_duration, max_duration + 1)
+        #Formatierte Dauer pro Sekundenwert, damit beim Schreiben nicht jede Dauer einzeln formatiert wird
+        self.duration_texts = {seconds: Song.format_duration(seconds) for seconds in self.durations}
+        self.next_id = 1
+
+    @staticmethod
+    def zipf_weights(count, skew):
+        #Kumulierte Gewichte 1/rang^skew für rng.choices(cum_weights=...)
+        return list(itertools.accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+    def random_strings(self, count):
+        #Erzeugt count zufällige, großgeschriebene Namen mit nur zwei rng-Aufrufen
+        #Zufällige Bytes werden per Übersetzungstabelle auf Buchstaben abgebildet, das ist viel schneller als ein choices-Aufruf pro Buchstabe
+        span = self.max_name_length - self.min_name_length + 1
+        lengths = [self.min_name_length + byte % span for byte in self.rng.randbytes(count)]
+        letters = self.rng.randbytes(sum(lengths)).translate(self.LETTERS).decode('ascii')
+        names = []
+        position = 0
+        for length in lengths:
+            names.append(letters[position:position + length].capitalize())
+            position += length
+        return names
+
+    def batches(self, num_songs, batch_size=100000):
+        #Liefert die Songs blockweise als Spalten (ids, names, artists, albums, genres, durations), jede Spalte ist eine Liste mit einem Wert pro Song
+        choices = self.rng.choices
+        per_artist = self.albums_per_artist
+        previous_names = None
+        remaining = num_songs
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            names = self.random_strings(size)
+            #Ein Anteil von duplicate_rate der Namen wird durch Namen aus dem vorherigen Block (bzw. im ersten Block aus demselben Block) ersetzt
+            duplicates = self.rng.sample(range(size), round(size * self.duplicate_rate))
+            for index, name in zip(duplicates, choices(previous_names or names, k=len(duplicates))):
+                names[index] = name
+            artist_indexes = choices(range(len(self.artists)), cum_weights=self.artist_weights, k=size)
+            album_offsets = choices(range(per_artist), k=size)
+            artists = list(map(self.artists.__getitem__, artist_indexes))
+            albums = [self.albums[artist * per_artist + offset] for artist, offset in zip(artist_indexes, album_offsets)]
+            genres = choices(self.genres, cum_weights=self.genre_weights, k=size)
+            durations = choices(self.durations, k=size)
+            yield range(self.next_id, self.next_id + size), names, artists, albums, genres, durations
+            self.next_id += size
+            previous_names = names
+            remaining -= size
+
+    def songs(self, num_songs, batch_size=100000):
+        #Erzeugt die Songs als Song-Objekte ohne ID (für Kataloge, die im Speicher bleiben; die IDs vergibt die MusicApp beim Einfügen)
+        for batch in self.batches(num_songs, batch_size):
+            for name, artist, album, genre, seconds in zip(*batch[1:]):
+                yield Song(name, artist, album, genre, seconds)
+
+    def write(self, file_path, num_songs, batch_size=100000, progress=None):
+        #Schreibt einen Katalog direkt im Format der Datendatei, ohne die Songs im Speicher zu halten
+        #Die Namen bestehen nur aus ASCII-Buchstaben, daher können die JSON-Zeilen ohne Escaping zusammengesetzt werden
+        #Es wird zuerst in eine temporäre Datei geschrieben und dann atomar ersetzt
+        temp_file = file_path + '.tmp'
+        durations = self.duration_texts
+        written = 0
+        with open(temp_file, 'w') as f:
+            f.write('{\n    "journal_seq": 0,\n    "songs": [')
+            separator = '\n'
+            for batch in self.batches(num_songs, batch_size):
+                f.write(separator)
+                f.write(',\n'.join(
+                    f'        {{"name": "{name}", "artist": "{artist}", "album": "{album}", "genre": "{genre}", "duration": "{durations[seconds]}", "id": {song_id}}}'
+                    for song_id, name, artist, album, genre, seconds in zip(*batch)))
+                separator = ',\n'
+                written += len(batch[0])
+                if progress:
+                    progress(written, num_songs)
+            f.write('\n    ],\n    "playlists": []\n}\n')
+        os.replace(temp_file, file_path)
+        return written
+
+
+class ReadWriteLock:
+    def __init__(self):
+        #Beliebig viele Leser oder genau ein Schreiber; wartende Schreiber haben Vorrang, damit ständige Leser sie nicht aushungern
+        #Nicht reentrant: wer die Sperre hält, darf sie nicht ein zweites Mal anfordern
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    @contextlib.contextmanager
+    def read(self):
+        with self.condition:
+            while self.writer or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                if not self.readers:
+                    self.condition.notify_all()
+
+    @contextlib.contextmanager
+    def write(self):
+        with self.condition:
+            self.waiting_writers += 1
+            try:
+                while self.writer or self.readers:
+                    self.condition.wait()
+            finally:
+                self.waiting_writers -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writer = False
+                self.condition.notify_all()
+
+
+class ChunkedList:
+    #Blockgröße: Einfügen und Löschen kopieren einen Block dieser Größe (bis zur doppelten Größe, dann wird er geteilt)
+    CHUNK_SIZE = 1024
+
+    def __init__(self, chunks=()):
+        #Unveränderliche Liste aus Blöcken (Tupeln) für den CatalogSnapshot
+        #Jede Änderung gibt eine neue ChunkedList zurück, die alle unveränderten Blöcke mit der alten teilt:
+        #kopiert werden nur der betroffene Block und die Liste der Blockanfänge, also O(Blockgröße + Anzahl der Blöcke) statt O(n)
+        self.chunks = chunks
+        #offsets[i] ist die Position des ersten Elements von chunks[i] in der Gesamtliste
+        self.offsets = list(itertools.accumulate((len(chunk) for chunk in chunks[:-1]), initial=0)) if chunks else []
+        self.length = self.offsets[-1] + len(chunks[-1]) if chunks else 0
+
+    @classmethod
+    def from_iterable(cls, items):
+        items = tuple(items)
+        size = cls.CHUNK_SIZE
+        return cls(tuple(items[start:start + size] for start in range(0, len(items), size)))
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.chunks)
+
+    def locate(self, index):
+        #Block und Position im Block für eine Position der Gesamtliste (Binärsuche über die Blockanfänge)
+        chunk_index = bisect.bisect_right(self.offsets, index) - 1
+        return chunk_index, index - self.offsets[chunk_index]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("ChunkedList index out of range")
+        chunk_index, position = self.locate(index)
+        return self.chunks[chunk_index][position]
+
+    def replace_chunk(self, chunk_index, new_chunks, count=1):
+        #Ersetzt count Blöcke ab chunk_index; leere Blöcke werden weggelassen
+        return ChunkedList(self.chunks[:chunk_index] + tuple(chunk for chunk in new_chunks if chunk) + self.chunks[chunk_index + count:])
+
+    def insert(self, index, item):
+        if not self.chunks:
+            return ChunkedList(((item,),))
+        if index >= self.length:
+            chunk_index, position = len(self.chunks) - 1, len(self.chunks[-1])
+        else:
+            chunk_index, position = self.locate(max(0, index))
+        chunk = self.chunks[chunk_index]
+        chunk = chunk[:position] + (item,) + chunk[position:]
+        if len(chunk) > 2 * self.CHUNK_SIZE:
+            middle = len(chunk) // 2
+            return self.replace_chunk(chunk_index, (chunk[:middle], chunk[middle:]))
+        return self.replace_chunk(chunk_index, (chunk,))
+
+    def append(self, item):
+        return self.insert(self.length, item)
+
+    def delete(self, index):
+        chunk_index, position = self.locate(index)
+        chunk = self.chunks[chunk_index]
+        chunk = chunk[:position] + chunk[position + 1:]
+        #Zu klein gewordene Blöcke werden mit dem nächsten zusammengelegt, damit die Liste nicht in viele winzige Blöcke zerfällt
+        if len(chunk) < self.CHUNK_SIZE // 2 and chunk_index + 1 < len(self.chunks) and len(chunk) + len(self.chunks[chunk_index + 1]) <= 2 * self.CHUNK_SIZE:
+            return self.replace_chunk(chunk_index, (chunk + self.chunks[chunk_index + 1],), 2)
+        return self.replace_chunk(chunk_index, (chunk,))
+
+
+class ShardedMap:
+    def __init__(self, shards):
+        #Unveränderliches Dictionary aus mehreren Teil-Dictionaries (Shard = hash(key) % Anzahl)
+        #set und delete kopieren nur den betroffenen Shard und das Tupel der Shards, alle anderen teilt die neue Version mit der alten
+        self.shards = shards
+
+    @classmethod
+    def from_dict(cls, data, shard_count=None):
+        #Ohne Angabe etwa Wurzel aus n Shards: dann kostet eine Änderung O(√n) für den Shard und O(√n) für das Tupel
+        shard_count = shard_count or max(64, math.isqrt(len(data)))
+        shards = [{} for _ in range(shard_count)]
+        for key, value in data.items():
+            shards[hash(key) % shard_count][key] = value
+        return cls(tuple(shards))
+
+    def get(self, key, default=None):
+        return self.shards[hash(key) % len(self.shards)].get(key, default)
+
+    def __contains__(self, key):
+        return key in self.shards[hash(key) % len(self.shards)]
+
+    def __len__(self):
+        return sum(map(len, self.shards))
+
+    def replace_shard(self, key, change):
+        index = hash(key) % len(self.shards)
+        shard = dict(self.shards[index])
+        change(shard)
+        return ShardedMap(self.shards[:index] + (shard,) + self.shards[index + 1:])
+
+    def set(self, key, value):
+        return self.replace_shard(key, lambda shard: shard.__setitem__(key, value))
+
+    def delete(self, key):
+        return self.replace_shard(key, lambda shard: shard.pop(key, None))
+
+
+class CatalogSnapshot:
+    def __init__(self, version, songs, sorted_songs, name_index, songs_by_id, playlists, journal_seq=0, next_song_id=1):
+        #Unveränderlicher Stand des Katalogs zu einer Version des ConcurrentCatalog; Leser brauchen dafür keine Sperre
+        #songs und sorted_songs sind ChunkedLists, name_index und songs_by_id ShardedMaps: ein Schreiber baut die nächste Version
+        #aus der vorherigen und kopiert dabei nur die geänderten Teile (Copy-on-Write)
+        #Die Listen im Namensindex werden von MusicApp nur ersetzt, nie verändert, und können daher geteilt werden
+        #Playlists sind eigene Playlist-Objekte mit einer ChunkedList als songs; bei einer Änderung wird die Playlist ersetzt
+        self.version = version
+        self.songs = songs
+        self.sorted_songs = sorted_songs
+        self.name_index = name_index
+        self.songs_by_id = songs_by_id
+        self.playlists = playlists
+        self.playlist_index = self.index_playlists(playlists)
+        self.journal_seq = journal_seq
+        self.next_song_id = next_song_id
+
+    @staticmethod
+    def index_playlists(playlists):
+        #Normalisierter Name -> Playlist, bei gleichen Namen gewinnt wie bei MusicApp.find_playlist die erste
+        index = {}
+        for playlist in playlists:
+            index.setdefault(MusicApp.normalize_name(playlist.name), playlist)
+        return index
+
+    def replace(self, **changes):
+        #Neue Version mit den geänderten Feldern; alle übrigen Felder werden übernommen (nicht kopiert)
+        snapshot = CatalogSnapshot.__new__(CatalogSnapshot)
+        snapshot.__dict__.update(self.__dict__)
+        snapshot.__dict__.update(changes)
+        return snapshot
+
+    def find_songs(self, song_input):
+        return self.name_index.get(MusicApp.normalize_name(song_input), [])
+
+    def find_song(self, song_input):
+        songs = self.find_songs(song_input)
+        return songs[0] if songs else None
+
+    def find_playlist(self, playlist_name):
+        return self.playlist_index.get(MusicApp.normalize_name(playlist_name))
+
+    def get_sorted_songs(self):
+        return self.sorted_songs
+
+
+class ConcurrentCatalog:
+    def __init__(self, app):
+        #Threadsicherer Zugriff auf eine MusicApp: Änderungen laufen nacheinander unter der Schreibsperre,
+        #Suchen laufen parallel und ohne Sperre auf dem zuletzt veröffentlichten CatalogSnapshot
+        #Jede Änderung über add_song, delete_song, create_playlist, add_to_playlist und sort veröffentlicht vor dem Freigeben der Sperre
+        #einen neuen Snapshot, der inkrementell aus dem vorherigen entsteht (O(√n) statt einer Kopie des ganzen Katalogs)
+        #Lange Operationen (Sortieren, Speichern) arbeiten auf einem Snapshot und halten die Schreibsperre nur zum Übernehmen des Ergebnisses
+        self.app = app
+        self.lock = ReadWriteLock()
+        #Nur ein Speichervorgang schreibt gleichzeitig die Datei
+        self.save_lock = threading.Lock()
+        self.version = 0
+        self.current = self.capture()
+
+    def capture(self):
+        #Friert den kompletten aktuellen Stand ein, O(n); nur beim Start und nach Änderungen über write()
+        #Der Aufrufer muss Schreiber ausschließen (Schreibsperre oder noch kein anderer Thread)
+        #Die sortierte Sicht der MusicApp wird mitbenutzt (und dafür bei Bedarf aufgebaut): insert_song und remove_song halten sie mit derselben
+        #Binärsuche aktuell wie add_song und delete_song den Snapshot, so liegen Songs mit gleichem Namen in beiden in derselben Reihenfolge
+        app = self.app
+        sorted_songs = app.get_sorted_songs()
+        return CatalogSnapshot(self.version, ChunkedList.from_iterable(app.songs), ChunkedList.from_iterable(sorted_songs),
+                               ShardedMap.from_dict(app.get_name_index()), ShardedMap.from_dict(app.songs_by_id),
+                               tuple(self.frozen_playlist(playlist.name, playlist.songs) for playlist in app.playlists), app.journal_seq,
+                               app.next_song_id)
+
+    @staticmethod
+    def frozen_playlist(name, songs):
+        playlist = Playlist(name)
+        playlist.songs = songs if isinstance(songs, ChunkedList) else ChunkedList.from_iterable(songs)
+        return playlist
+
+    def publish(self, snapshot):
+        #Wird unter der Schreibsperre aufgerufen; die Zuweisung an self.current ist atomar, Leser sehen den alten oder den neuen Snapshot
+        self.version += 1
+        snapshot.version = self.version
+        snapshot.journal_seq = self.app.journal_seq
+        snapshot.next_song_id = self.app.next_song_id
+        self.current = snapshot
+
+    def snapshot(self):
+        #Gibt den aktuellen Snapshot zurück (enthält alle bis zum Aufruf abgeschlossenen Änderungen)
+        #Wartet oder schreibt gerade ein Schreiber, stellt sich der Leser hinter ihn (Schreiber-Vorrang): das Warten gibt den GIL frei
+        #Sonst muss der Schreiber nach jeder Freigabe des GIL (z.B. beim Anhängen an das Journal) erneut gegen alle rechnenden
+        #Leser-Threads um den GIL konkurrieren und kommt kaum noch voran; gewartet wird nur auf kurze Änderungen,
+        #Sortieren und Speichern halten die Schreibsperre nur zum Übernehmen des Ergebnisses
+        if self.lock.writer or self.lock.waiting_writers:
+            with self.lock.read():
+                pass
+        return self.current
+
+    @contextlib.contextmanager
+    def read(self):
+        #Direkter Lesezugriff auf die MusicApp für alles, was der Snapshot nicht enthält (z.B. query, fuzzy_search_core)
+        with self.lock.read():
+            yield self.app
+
+    @contextlib.contextmanager
+    def write(self):
+        #Exklusiver Zugriff auf die MusicApp für beliebige Änderungen (z.B. import_playlist)
+        #Danach wird der Snapshot komplett neu aufgebaut (O(n)), für einzelne Änderungen sind die Methoden unten günstiger
+        with self.lock.write():
+            try:
+                yield self.app
+            finally:
+                self.publish(self.capture())
+
+    @staticmethod
+    def sorted_position(sorted_songs, song):
+        #Position genau dieses Songs in der sortierten Sicht: Binärsuche bis zum ersten gleichen Namen, dann Vergleich über Identität
+        index = bisect.bisect_left(sorted_songs, song)
+        while index < len(sorted_songs) and sorted_songs[index].name == song.name:
+            if sorted_songs[index] is song:
+                return index
+            index += 1
+        return -1
+
+    def add_song(self, song):
+        with self.lock.write():
+            app = self.app
+            app.insert_song(song)
+            snapshot = self.current
+            key = app.normalize_name(song.name)
+            self.publish(snapshot.replace(
+                songs=snapshot.songs.append(song),
+                sorted_songs=snapshot.sorted_songs.insert(bisect.bisect_right(snapshot.sorted_songs, song), song),
+                name_index=snapshot.name_index.set(key, app.name_index[key]),
+                songs_by_id=snapshot.songs_by_id.set(song.id, song)))
+        return song
+
+    def delete_song(self, song):
+        #Gibt False zurück, wenn der Song (z.B. von einem anderen Thread) schon gelöscht wurde
+        with self.lock.write():
+            app = self.app
+            if app.songs_by_id.get(song.id) is not song:
+                return False
+            #snapshot.songs hat dieselbe Reihenfolge wie app.songs, die Position muss nicht ein zweites Mal gesucht werden
+            position = app.remove_song(song)
+            snapshot = self.current
+            key = app.normalize_name(song.name)
+            bucket = app.name_index.get(key)
+            #Wie MusicApp.remove_song wird der Song auch aus allen Playlists entfernt; nur betroffene Playlists werden ersetzt
+            playlists = tuple(playlist if not any(map(operator.is_, playlist.songs, itertools.repeat(song)))
+                              else self.frozen_playlist(playlist.name, [entry for entry in playlist.songs if entry is not song])
+                              for playlist in snapshot.playlists)
+            changes = {}
+            if any(new is not old for new, old in zip(playlists, snapshot.playlists)):
+                changes = {"playlists": playlists, "playlist_index": CatalogSnapshot.index_playlists(playlists)}
+            self.publish(snapshot.replace(
+                songs=snapshot.songs.delete(position),
+                sorted_songs=snapshot.sorted_songs.delete(self.sorted_position(snapshot.sorted_songs, song)),
+                name_index=snapshot.name_index.set(key, bucket) if bucket else snapshot.name_index.delete(key),
+                songs_by_id=snapshot.songs_by_id.delete(song.id), **changes))
+        return True
+
+    def create_playlist(self, name):
+        #Prüfen und Anlegen geschehen unter derselben Sperre; gibt None zurück, wenn die Playlist schon existiert
+        with self.lock.write():
+            app = self.app
+            if app.find_playlist(name) is not None:
+                return None
+            playlist = Playlist(name)
+            app.insert_playlist(playlist)
+            snapshot = self.current
+            playlists = snapshot.playlists + (self.frozen_playlist(name, ChunkedList()),)
+            self.publish(snapshot.replace(playlists=playlists, playlist_index=CatalogSnapshot.index_playlists(playlists)))
         return playlist
 
+    def add_to_playlist(self, playlist_name, song):
+        with self.lock.write():
+            app = self.app
+            playlist = app.find_playlist(playlist_name)
+            if playlist is None or app.songs_by_id.get(song.id) is not song:
+                return False
+            app.add_to_playlist(playlist, song)
+            snapshot = self.current
+            frozen = snapshot.find_playlist(playlist_name)
+            updated = self.frozen_playlist(frozen.name, frozen.songs.append(song))
+            playlists = tuple(updated if entry is frozen else entry for entry in snapshot.playlists)
+            self.publish(snapshot.replace(playlists=playlists, playlist_index=CatalogSnapshot.index_playlists(playlists)))
+        return True
+
+    def sort(self, algorithm='builtin', spec=None, retries=3):
+        #Sortiert self.songs mit einem Algorithmus aus sorting_benchmark_algorithms oder nach einer Sortierreihenfolge (spec)
+        #Sortiert wird eine Kopie des Snapshots ohne Sperre; übernommen wird nur, wenn sich der Katalog inzwischen nicht geändert hat
+        #Nach retries Konflikten wird unter der Schreibsperre sortiert (Leser mit einem Snapshot werden auch dann nicht blockiert)
+        if spec is not None:
+            spec = self.app.parse_sort_spec(spec) if isinstance(spec, str) else spec
+            sort_function = lambda arr: self.app.sort_by_keys(arr, spec)
+        else:
+            sort_function = self.app.sorting_benchmark_algorithms()[algorithm]
+
+        for _ in range(retries):
+            snapshot = self.snapshot()
+            arr = sort_function(list(snapshot.songs))
+            with self.lock.write():
+                if self.version == snapshot.version:
+                    self.app.songs = arr
+                    self.app.invalidate_song_order()
+                    self.publish(self.current.replace(songs=ChunkedList.from_iterable(arr)))
+                    return True
+        with self.lock.write():
+            app = self.app
+            app.songs = sort_function(list(app.songs))
+            app.invalidate_song_order()
+            self.publish(self.current.replace(songs=ChunkedList.from_iterable(app.songs)))
+        return False
+
+    def save(self, compact=False):
+        #Speichert einen Snapshot, ohne Leser oder Schreiber während des Schreibens der Datei aufzuhalten
+        #Im Journal-Modus bleibt das Journal erhalten, wenn während des Speicherns neue Einträge dazukamen:
+        #beim Laden werden die bereits im Snapshot enthaltenen Einträge übersprungen (journal_seq)
+        app = self.app
+        with self.save_lock:
+            if app.store is not None:
+                if compact:
+                    with self.lock.write():
+                        app.store.checkpoint()
+                return
+            if app.storage_mode == 'journal' and not compact and app.journal_length < app.journal_threshold:
+                return
+            snapshot = self.snapshot()
+            app.write_snapshot(app.data_file, source=snapshot)
+            with self.lock.write():
+                if app.journal_seq == snapshot.journal_seq:
+                    if os.path.exists(app.journal_file):
+                        os.remove(app.journal_file)
+                    app.journal_length = 0
+
+
+class BlockHead:
+    #Kopf eines sortierten Blocks im Heap von block_sort
+    #Jeder Heap-Vergleich vergleicht genau einmal zwei Songs, so zählt CountingSong auch die Vergleiche beim Zusammenführen
+    #Bei gleichen Namen gewinnt der Block mit der kleineren Nummer (<= statt <), dadurch bleibt die Sortierung stabil
+    __slots__ = ('song', 'block_index')
+
+    def __init__(self, song, block_index):
+        self.song = song
+        self.block_index = block_index
+
+    def __lt__(self, other):
+        if self.block_index < other.block_index:
+            return self.song <= other.song
+        return self.song < other.song
+
+
+def sort_name_chunk(start, names):
+    #Läuft in einem eigenen Prozess der parallelen Sortierung (muss dafür auf Modulebene stehen)
+    #Sortiert einen Block von Namen und gibt nur die Positionen im Gesamtarray in sortierter Reihenfolge zurück
+    #(als array, das kompakt gepickelt wird; die Namen selbst kennt der aufrufende Prozess schon)
+    order = sorted(range(len(names)), key=names.__getitem__)
+    return array.array('q', [start + index for index in order])
+
+
 class MusicApp:
-    def __init__(self, data_file='music_data.json'):
+    def __init__(self, data_file='music_data.json', storage_mode='snapshot', journal_threshold=1000, initial_songs=1000, seed=None,
+                 snapshot_format=None, query_cache_size=4096):
         #Initialisiert die MusicApp-Instanz mit dem Dateinamen, einer leeren Song- und Playlist-Liste, und der Funktion load_data um Songs & Playlists zu laden
+        #storage_mode 'snapshot': save_data schreibt jedes Mal die komplette Datei
+        #storage_mode 'journal': Änderungen werden als kleine Einträge an das Journal angehängt und erst ab journal_threshold Einträgen in den Snapshot übernommen
+        #initial_songs und seed legen fest, wie viele Songs generiert werden, wenn noch keine Daten vorhanden sind
+        #storage_mode 'sqlite': jede Änderung wird sofort in einer SQLite-Datenbank gespeichert (data_file mit der Endung .db, sonst daneben)
+        #   vorhandene JSON- oder Binärdaten in data_file werden beim ersten Start in die Datenbank übernommen
+        #snapshot_format 'json' oder 'binary' (BinaryCatalog); ohne Angabe 'binary' für .bin-Dateien und vorhandene binäre Dateien
+        #query_cache_size: Anzahl der Suchergebnisse im QueryCache (0 schaltet den Cache ab)
+        if storage_mode not in ('snapshot', 'journal', 'sqlite'):
+            raise ValueError(f"Unknown storage mode: {storage_mode}")
+        if snapshot_format is None:
+            snapshot_format = 'binary' if data_file.endswith('.bin') or BinaryCatalog.is_binary(data_file) else 'json'
+        if snapshot_format not in ('json', 'binary'):
+            raise ValueError(f"Unknown snapshot format: {snapshot_format}")
+        self.snapshot_format = snapshot_format
         self.data_file = data_file
+        self.storage_mode = storage_mode
+        self.journal_file = data_file + '.journal'
+        #Datenbank des SQLite-Modus (in den anderen Modi None)
+        self.store = None
+        if storage_mode == 'sqlite':
+            database_file = data_file if data_file.endswith(('.db', '.sqlite', '.sqlite3')) else os.path.splitext(data_file)[0] + '.db'
+            self.store = SQLiteStore(database_file)
+        self.journal_threshold = journal_threshold
+        #Anzahl der Einträge im Journal seit dem letzten Snapshot und laufende Nummer des letzten Eintrags
+        self.journal_length = 0
+        self.journal_seq = 0
         self.songs = []
         self.playlists = []
+        #Index: normalisierter Playlist-Name -> Playlist (wird erst bei Bedarf aufgebaut)
+        self.playlist_index = None
+        #Index: normalisierter Songname -> Liste der Songs mit diesem Namen (für O(1) Namensauflösung)
+        #Im SQLite-Modus None, bis ihn etwas anderes als find_songs braucht (get_name_index)
+        self.name_index = {}
+        #Index: Song-ID -> Song und die nächste freie ID
+        self.songs_by_id = {}
+        self.next_song_id = 1
+        #Nach Namen sortierte Sicht auf self.songs (wird erst bei Bedarf aufgebaut und danach inkrementell gepflegt)
+        self.sorted_songs = None
+        #Suchbaum über der sortierten Sicht für die Tiefensuche (wird bei jeder Änderung des Katalogs verworfen)
+        self.search_tree = None
+        #Präfix-Indizes für die Autovervollständigung (werden erst bei Bedarf aufgebaut und danach inkrementell gepflegt)
+        self.prefix_indexes = None
+        #n-Gramm-Index über die Songnamen für die fehlertolerante Suche (wird erst bei Bedarf aufgebaut)
+        self.ngram_index = None
+        #Sekundärindizes für Abfragen über artist, album, genre und duration (werden erst bei Bedarf aufgebaut)
+        self.query_index = None
+        #Prozess-Pool der parallelen Sortierung (wird erst beim ersten Aufruf gestartet)
+        self.sort_pool = None
+        self.sort_pool_workers = 0
+        #Zuletzt genutzte Suchergebnisse; Änderungen am Katalog entfernen genau die betroffenen Einträge
+        self.query_cache = QueryCache(query_cache_size)
         self.load_data()
 
-        if not self.songs:
+        if not self.songs and initial_songs > 0:
                 #Hier wird die Anzahl der generierten Songs angepasst
-                print("No songs found in the database. Generating 1000 random songs...")
-                self.songs = self.generate_random_songs(1000)
-                self.save_data()
+                print(f"No songs found in the database. Generating {initial_songs} random songs...")
+                self.songs = self.generate_random_songs(initial_songs, seed)
+                self.rebuild_indexes()
+                if self.store is not None:
+                    self.store.import_catalog(self.songs, self.playlists, self.next_song_id)
+                self.save_data(compact=True)
 
-    def generate_random_string(self, min_length=3, max_length=10):
-        length = random.randint(min_length, max_length)
-        return ''.join(random.choices(string.ascii_lowercase, k=length)).capitalize()
-
-    # Funktion zur Generierung einer zufälligen Dauer (zwischen 2.0 und 5.0 Minuten)
-    def generate_random_duration(self):
-        minutes = random.randint(2, 5)  # Minuten zwischen 2 und 5
-        seconds = random.randint(0, 59)  # Sekunden zwischen 0 und 59
-        return f"{minutes}:{seconds:02d}"  # Format: "MM:SS"
-
-    # Funktion zur Generierung zufälliger Songs
-    def generate_random_songs(self,num_songs):
-        songs = []
-        for _ in range(num_songs):
-            name = self.generate_random_string()  # Zufälliger Name
-            artist = self.generate_random_string()  # Zufälliger Künstler
-            album = self.generate_random_string()  # Zufälliges Album
-            genre = self.generate_random_string()  # Zufälliges Genre
-            duration = self.generate_random_duration()  # Zufällige Dauer
-
-            # Erzeuge Song-Objekt
-            song = Song(name, artist, album, genre, duration)
-            songs.append(song)
+    @staticmethod
+    def normalize_name(name):
+        #Vereinheitlicht einen Namen für die Index-Suche (Groß- und Kleinschreibung wird ignoriert)
+        return name.casefold()
+
+    def rebuild_indexes(self):
+        #Baut den Namensindex und den ID-Index komplett aus self.songs neu auf (nach dem Laden oder Generieren der Songs)
+        #Songs ohne ID (ältere Dateien, neu generierte Songs) bekommen dabei eine neue ID
+        self.next_song_id = max((song.id for song in self.songs if song.id is not None), default=0) + 1
+        name_index = {}
+        songs_by_id = {}
+        for song in self.songs:
+            if song.id is None:
+                song.id = self.next_song_id
+                self.next_song_id += 1
+            songs_by_id[song.id] = song
+            name_index.setdefault(self.normalize_name(song.name), []).append(song)
+        self.name_index = name_index
+        self.songs_by_id = songs_by_id
+        self.discard_derived_indexes()
+
+    def discard_derived_indexes(self):
+        #Die sortierte Sicht, der Suchbaum und die übrigen Indizes werden verworfen und beim nächsten Zugriff neu aufgebaut
+        self.sorted_songs = None
+        self.search_tree = None
+        self.prefix_indexes = None
+        self.ngram_index = None
+        self.query_index = None
+        #Gespeicherte Positionen beziehen sich auf die alte sortierte Sicht, daher wird der ganze Cache geleert (z.B. nach load_data)
+        self.query_cache.clear()
+
+    def get_sorted_songs(self):
+        #Gibt die nach Namen sortierte Sicht zurück; sortiert wird nur, wenn die Sicht noch nicht existiert
+        if self.sorted_songs is None:
+            #sorted ist stabil, Songs mit gleichem Namen behalten ihre Reihenfolge aus self.songs
+            self.sorted_songs = sorted(self.songs, key=lambda song: song.name)
+        return self.sorted_songs
+
+    def get_search_tree(self):
+        #Gibt den Suchbaum über der sortierten Sicht zurück; er wird nur neu gebaut, wenn sich der Katalog seit dem letzten Aufbau geändert hat
+        if self.search_tree is None:
+            self.search_tree = SearchTree(self.get_sorted_songs())
+        return self.search_tree
+
+    def get_name_index(self):
+        #Gibt den Namensindex zurück; im SQLite-Modus wird er erst beim ersten Bedarf aus der Namensspalte aufgebaut
+        #(dabei wird nur der Name der Songs geladen, die übrigen Felder bleiben in der Datenbank)
+        if self.name_index is None:
+            name_index = {}
+            for song_id, name in self.store.song_names():
+                song = self.songs_by_id[song_id]
+                song.name = name
+                name_index.setdefault(self.normalize_name(name), []).append(song)
+            self.name_index = name_index
+        return self.name_index
+
+    def find_songs(self, song_input):
+        #Gibt alle Songs mit dem angegebenen Namen zurück (Lookup im Index statt Durchlauf durch self.songs)
+        #Im SQLite-Modus ohne Namensindex im Speicher beantwortet der Index der Datenbank die Suche
+        if self.name_index is None:
+            return [self.songs_by_id[song_id] for song_id in self.store.find_song_ids(song_input)]
+        return self.name_index.get(self.normalize_name(song_input), [])
+
+    def find_song(self, song_input):
+        #Gibt den ersten Song mit dem angegebenen Namen zurück oder None, falls es keinen gibt
+        songs = self.find_songs(song_input)
+        return songs[0] if songs else None
+
+    def batch_search(self, names, method='index'):
+        #Löst viele Songnamen in einem Durchgang auf, ohne Ausgabe auf der Konsole
+        #Gibt {Name: erster passender Song oder None} zurück, also dasselbe Ergebnis wie find_song für jeden Namen
+        #method='index' fragt den Namensindex ab, method='merge' läuft einmal sortiert über die Anfragen und den sortierten Namensindex
+        names = list(names)
+        if method == 'index':
+            return {name: self.find_song(name) for name in names}
+        if method != 'merge':
+            raise ValueError(f"Unknown batch search method: {method}")
+
+        name_index = self.get_prefix_indexes()['name']
+        keys = name_index.keys
+        found = {}
+        position = 0
+        for key in sorted({self.normalize_name(name) for name in names}):
+            #Beide Seiten sind sortiert, daher geht es nur vorwärts; bisect überspringt lange Bereiche ohne Anfrage
+            position = bisect.bisect_left(keys, key, position)
+            if position == len(keys):
+                break
+            if keys[position] == key:
+                found[key] = name_index.songs[position]
+        return {name: found.get(self.normalize_name(name)) for name in names}
+
+    def insert_song(self, song, journal=True):
+        #Fügt einen Song zur Song-Liste hinzu und hält den Namensindex aktuell
+        if song.id is None:
+            song.id = self.next_song_id
+        self.next_song_id = max(self.next_song_id, song.id + 1)
+        self.songs_by_id[song.id] = song
+        if journal:
+            self.append_journal({"op": "add_song", "song": song.to_dict()})
+        self.songs.append(song)
+        #Ohne Namensindex (SQLite-Modus) gibt es auch keinen n-Gramm-Index, ob der Name neu ist, bleibt dann offen
+        name_added = True
+        if self.name_index is not None:
+            key = self.normalize_name(song.name)
+            #Die Liste eines Namens wird nie verändert, sondern ersetzt (Copy-on-Write), damit ein CatalogSnapshot den Index nur flach kopieren muss
+            bucket = self.name_index.get(key, []) + [song]
+            self.name_index[key] = bucket
+            name_added = len(bucket) == 1
+            #Der n-Gramm-Index kennt jeden Namen nur einmal, er muss nur bei einem neuen Namen ergänzt werden
+            if name_added and self.ngram_index is not None:
+                self.ngram_index.add(key)
+        self.search_tree = None
+        #Geordnetes Einfügen in die sortierte Sicht (Binärsuche für die Position statt neu zu sortieren)
+        sorted_position = None
+        if self.sorted_songs is not None:
+            sorted_position = bisect.bisect_right(self.sorted_songs, song)
+            self.sorted_songs.insert(sorted_position, song)
+        if self.prefix_indexes is not None:
+            for prefix_index in self.prefix_indexes.values():
+                prefix_index.add(song)
+        if self.query_index is not None:
+            self.query_index.add(song)
+        #Angehängt an self.songs verschiebt der Song keine Positionen, die sortierte Sicht wird dagegen länger
+        self.invalidate_cached_queries(song, None, sorted_position, name_added)
+
+    def remove_song(self, song, journal=True):
+        #Entfernt genau dieses Song-Objekt aus der Song-Liste und dem Namensindex; gibt seine bisherige Position in self.songs zurück
+        #Im SQLite-Modus löscht append_journal die Zeile, daher werden vorher die Felder (StoredSong) und die Playlists mit dem Song gelesen
+        key = self.normalize_name(song.name)
+        if self.store is not None:
+            playlist_keys = self.store.playlist_keys(song.id)
+            playlists = [playlist for playlist in self.playlists if self.normalize_name(playlist.name) in playlist_keys]
+        else:
+            playlists = self.playlists
+        if journal:
+            self.append_journal({"op": "delete_song", "id": song.id})
+        self.songs_by_id.pop(song.id, None)
+        self.search_tree = None
+        #Position genau dieses Objekts: map(operator.is_) vergleicht die Identität in C, list.index würde für jeden Song Song.__eq__ aufrufen
+        #Das bleibt ein Durchlauf über self.songs (O(n), aber ohne Python-Code pro Element), ebenso das Löschen aus der Liste
+        index = next(itertools.compress(itertools.count(), map(operator.is_, self.songs, itertools.repeat(song))))
+        del self.songs[index]
+        songs_position = index
+
+        name_removed = True
+        if self.name_index is not None:
+            bucket = [indexed_song for indexed_song in self.name_index.get(key, []) if indexed_song is not song]
+            name_removed = not bucket
+            if bucket:
+                self.name_index[key] = bucket
+            else:
+                self.name_index.pop(key, None)
+                if self.ngram_index is not None:
+                    self.ngram_index.remove(key)
+
+        #Aus der sortierten Sicht entfernen: Binärsuche bis zum ersten Song mit gleichem Namen, dann nach Identität suchen
+        sorted_position = None
+        if self.sorted_songs is not None:
+            index = bisect.bisect_left(self.sorted_songs, song)
+            while index < len(self.sorted_songs) and self.sorted_songs[index].name == song.name:
+                if self.sorted_songs[index] is song:
+                    del self.sorted_songs[index]
+                    sorted_position = index
+                    break
+                index += 1
+        if self.prefix_indexes is not None:
+            for prefix_index in self.prefix_indexes.values():
+                prefix_index.remove(song)
+        if self.query_index is not None:
+            self.query_index.remove(song)
+        self.invalidate_cached_queries(song, songs_position, sorted_position, name_removed)
+
+        #Playlists verweisen nur über die ID auf den Song, daher wird er auch aus allen Playlists entfernt
+        for playlist in playlists:
+            if any(entry is song for entry in playlist.songs):
+                playlist.remove_song(song)
+        return songs_position
+
+    def invalidate_cached_queries(self, song, songs_position=None, sorted_position=None, name_changed=True):
+        #Entfernt genau die Cache-Einträge, deren Ergebnis sich durch das Hinzufügen oder Löschen dieses Songs ändern kann:
+        #  Lineare Suchen nach demselben Namen, alle gespeicherten Positionen ab der Stelle, an der gelöscht wurde, und Fehlschläge (ihre Vergleiche = Länge der Liste),
+        #  alle Suchen auf der sortierten Sicht, sobald sie sich ändert: mit der Länge verschieben sich die Mitten von Binär-, Sprung-, Fibonacci-
+        #  und exponentieller Suche, damit die Anzahl der Vergleiche und bei mehrfach vorkommenden Namen auch der gefundene Song,
+        #  Präfixsuchen, deren Präfix zu einem Feld des Songs passt, und Abfragen, deren Bedingungen der Song erfüllt
+        #  Fehlertolerante Suchen nur, wenn ihr Ergebnis den Namen enthält oder der Name neu ist bzw. ganz verschwindet (name_changed) und nah genug an der Anfrage liegt
+        if not self.query_cache.entries:
+            return
+        key = self.normalize_name(song.name)
+        prefix_values = {field: PrefixIndex.normalize(getattr(song, field)) for field in self.PREFIX_FIELDS}
+        query_values = (QueryIndex.normalize(song.artist), QueryIndex.normalize(song.album), QueryIndex.normalize(song.genre))
+
+        def stale(entry, result):
+            kind = entry[0]
+            view = self.CACHED_SEARCH_VIEWS.get(kind)
+            if view == 'sorted':
+                return sorted_position is not None or entry[1] == key
+            if view is not None:
+                return entry[1] == key or result[0] < 0 or (songs_position is not None and result[0] >= songs_position)
+            if kind == 'prefix':
+                _, prefix, _, fields = entry
+                return any(prefix_values[field].startswith(prefix) for field in fields)
+            if kind == 'fuzzy':
+                _, query, _, max_distance = entry
+                if any(self.normalize_name(match.name) == key for match, _, _ in result):
+                    return True
+                return name_changed and NGramIndex.bounded_edit_distance(query, key, max_distance) <= max_distance
+            if kind == 'query':
+                _, *values, min_seconds, max_seconds = entry
+                return (all(value is None or value == song_value for value, song_value in zip(values, query_values))
+                        and (min_seconds is None or song.duration_seconds >= min_seconds)
+                        and (max_seconds is None or song.duration_seconds <= max_seconds))
+            return True
+
+        self.query_cache.invalidate(stale)
+
+    def invalidate_song_order(self):
+        #Nach dem Umsortieren von self.songs stimmen nur die Positionen der linearen Suche nicht mehr, die sortierte Sicht bleibt gleich
+        self.query_cache.invalidate(lambda entry, result: self.CACHED_SEARCH_VIEWS.get(entry[0]) == 'songs')
+
+    def insert_playlist(self, playlist, journal=True):
+        #Fügt eine neue Playlist zur Playlist-Liste hinzu
+        if journal:
+            self.append_journal({"op": "create_playlist", "name": playlist.name})
+        self.playlists.append(playlist)
+        if self.playlist_index is not None:
+            self.playlist_index.setdefault(self.normalize_name(playlist.name), playlist)
+
+    def find_playlist(self, playlist_name):
+        #Sucht eine Playlist anhand ihres Namens (Groß- und Kleinschreibung wird ignoriert)
+        #Bei gleichen Namen gewinnt wie bisher die zuerst angelegte Playlist
+        if self.playlist_index is None:
+            self.playlist_index = {}
+            for playlist in self.playlists:
+                self.playlist_index.setdefault(self.normalize_name(playlist.name), playlist)
+        return self.playlist_index.get(self.normalize_name(playlist_name))
 
-        return songs
+    def add_to_playlist(self, playlist, song, journal=True):
+        #Fügt einen Song zu einer Playlist hinzu
+        if journal:
+            self.append_journal({"op": "add_to_playlist", "playlist": playlist.name, "song_id": song.id})
+        playlist.add_song(song)
 
-    def load_data(self):
-        #Lädt Songs und Playlists aus der JSON-Datei, falls vorhanden
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                self.songs = [Song.from_dict(song_data) for song_data in data.get('songs', [])]
-                self.playlists = [Playlist.from_dict(pl_data) for pl_data in data.get('playlists', [])]
-            print("Data loaded successfully.")
-        else:
-            print("\033[41No data file found. Starting with an empty database.\033[0m")
+    def match_song(self, song_data):
+        #Sucht im Katalog den Song, dessen Felder (ohne ID) exakt dem Dictionary entsprechen (über den Namensindex)
+        fields = ('name', 'artist', 'album', 'genre')
+        duration_seconds = Song.parse_duration(song_data['duration'], invalid=0)
+        return next((song for song in self.find_songs(song_data['name'])
+                     if song.duration_seconds == duration_seconds and all(getattr(song, field) == song_data[field] for field in fields)), None)
+
+    def resolve_embedded_playlist_songs(self):
+        #Ältere Dateien speichern in den Playlists komplette Kopien der Songs
+        #Jede Kopie wird durch das gemeinsame Song-Objekt aus dem Katalog ersetzt; Songs, die nur in einer Playlist vorkommen, werden in den Katalog übernommen
+        for playlist in self.playlists:
+            resolved = []
+            for entry in playlist.songs:
+                if self.songs_by_id.get(entry.id) is entry:
+                    resolved.append(entry)
+                    continue
+                song = self.match_song(entry.to_dict())
+                if song is None:
+                    entry.id = None
+                    self.insert_song(entry, journal=False)
+                    song = entry
+                resolved.append(song)
+            playlist.songs = resolved
+
+    def append_journal(self, record):
+        #Hängt eine Änderung als eine JSON-Zeile an das Journal an (nur im Journal-Modus)
+        #Im SQLite-Modus wird dieselbe Änderung direkt in der Datenbank ausgeführt
+        if self.store is not None:
+            self.store.apply(record)
+            return
+        if self.storage_mode != 'journal':
+            return
+        self.journal_seq += 1
+        record = dict(record, seq=self.journal_seq)
+        with open(self.journal_file, 'a') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.journal_length += 1
+
+    def replay_journal(self, snapshot_seq=0):
+        #Spielt alle Journal-Einträge, die neuer als der Snapshot sind, auf die geladenen Daten ein
+        self.journal_seq = snapshot_seq
+        self.journal_length = 0
+        if not os.path.exists(self.journal_file):
+            return 0
 
-    def save_data(self):
-        #Speichert die aktuelle Liste der Songs und Playlists in einer JSON-Datei
+        applied = 0
+        with open(self.journal_file, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    #Eine abgeschnittene letzte Zeile (z.B. nach einem Absturz) wird ignoriert
+                    break
+                self.journal_length += 1
+                #Einträge, die bereits im Snapshot enthalten sind (Absturz während der Kompaktierung), werden übersprungen
+                if record['seq'] <= snapshot_seq:
+                    continue
+                self.apply_journal_record(record)
+                self.journal_seq = record['seq']
+                applied += 1
+        return applied
+
+    def apply_journal_record(self, record):
+        #Führt einen einzelnen Journal-Eintrag aus, ohne ihn erneut zu protokollieren
+        op = record['op']
+        if op == 'add_song':
+            self.insert_song(Song.from_dict(record['song']), journal=False)
+        elif op == 'delete_song':
+            song = self.songs_by_id.get(record['id']) if 'id' in record else self.match_song(record['song'])
+            if song:
+                self.remove_song(song, journal=False)
+        elif op == 'create_playlist':
+            self.insert_playlist(Playlist(record['name']), journal=False)
+        elif op == 'add_to_playlist':
+            playlist = self.find_playlist(record['playlist'])
+            if playlist:
+                song = self.songs_by_id.get(record['song_id']) if 'song_id' in record else self.match_song(record['song'])
+                if song:
+                    self.add_to_playlist(playlist, song, journal=False)
+
+    def compact_journal(self):
+        #Schreibt den aktuellen Stand als neuen Snapshot und leert danach das Journal
+        self.write_snapshot(self.data_file)
+
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self.journal_length = 0
+
+    def generate_random_songs(self, num_songs, seed=None, **distribution):
+        #Erzeugt num_songs zufällige Songs im Speicher; seed (Zahl oder random.Random) macht das Ergebnis reproduzierbar
+        #distribution wird an den CatalogGenerator weitergegeben (z.B. num_artists, artist_skew, duplicate_rate, min_duration)
+        return list(CatalogGenerator(seed, **distribution).songs(num_songs))
+
+    def generate_catalog(self, num_songs, seed=None, file_path=None, batch_size=100000, **distribution):
+        #Schreibt einen synthetischen Katalog mit num_songs Songs blockweise direkt in eine Datei (für Last- und Benchmark-Tests)
+        #Ohne file_path wird die eigene Datendatei ersetzt, das Journal verworfen und der neue Katalog geladen
+        target = file_path or self.data_file
+        start_time = time.perf_counter()
+        if self.store is not None and file_path is None:
+            #Im SQLite-Modus werden die Songs blockweise direkt in die Datenbank geschrieben
+            self.store.import_catalog(CatalogGenerator(seed, **distribution).songs(num_songs, batch_size), [])
+            print(f"Generated {num_songs} songs in {time.perf_counter() - start_time:.2f} seconds ({self.store.file_path}).")
+            self.load_data()
+            return num_songs
+
+        def progress(written, total):
+            print(f"Generating... {written} of {total} songs")
+
+        written = CatalogGenerator(seed, **distribution).write(target, num_songs, batch_size,
+                                                              progress if num_songs >= 10 * batch_size else None)
+        print(f"Generated {written} songs in {time.perf_counter() - start_time:.2f} seconds ({target}).")
+        if file_path is None or os.path.abspath(file_path) == os.path.abspath(self.data_file):
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+            self.load_data()
+            #Der Generator schreibt JSON; bei binärem Snapshot-Format wird die Datei gleich umgewandelt
+            if self.snapshot_format == 'binary':
+                self.compact_journal()
+        return written
+
+    def print_load_progress(self, num_songs, num_playlists, bytes_read, total_bytes):
+        #Standard-Fortschrittsanzeige für das Laden großer Dateien
+        percent = 100 * bytes_read / total_bytes if total_bytes else 100
+        print(f"Loading... {num_songs} songs, {num_playlists} playlists ({percent:.0f}%)")
+
+    def load_data(self, progress=None, progress_every=100000):
+        #Lädt Songs und Playlists aus der JSON-Datei, falls vorhanden
+        #Die Datei wird mit dem JSONStreamReader Element für Element gelesen, die Objekte werden direkt beim Lesen erzeugt
+        #progress(num_songs, num_playlists, bytes_read, total_bytes) wird alle progress_every Elemente aufgerufen
+        #Beim Laden entstehen sehr viele Objekte auf einmal, die zyklische Garbage Collection würde dabei immer wieder alle bisherigen Objekte durchsuchen
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            if self.store is not None and not self.store.is_empty():
+                self.load_sqlite()
+                print("Data loaded successfully.")
+                return
+            #Im SQLite-Modus ist data_file nur dann eine Quelle, wenn es nicht die Datenbank selbst ist
+            has_snapshot = self.store is None or os.path.abspath(self.data_file) != os.path.abspath(self.store.file_path)
+            if has_snapshot and BinaryCatalog.is_binary(self.data_file):
+                snapshot_seq = self.load_binary(self.data_file)
+                print("Data loaded successfully.")
+            elif has_snapshot and os.path.exists(self.data_file):
+                total_bytes = os.path.getsize(self.data_file)
+                #Bei kleinen Dateien wird standardmäßig kein Fortschritt ausgegeben
+                if progress is None and total_bytes > 16 * 1024 * 1024:
+                    progress = self.print_load_progress
+
+                songs = []
+                self.songs = songs
+                self.playlists = []
+                self.playlist_index = None
+                snapshot_seq = 0
+                #Nächste freie Song-ID aus dem Snapshot (ältere Dateien haben keine, dann gilt die größte ID + 1)
+                next_song_id = 0
+                indexed = False
+                #Playlists, die in der Datei vor den Songs stehen, können erst nach den Songs aufgelöst werden
+                pending_playlists = []
+                count = 0
+                with open(self.data_file, 'rb') as f:
+                    reader = JSONStreamReader(f)
+                    for key, value in reader.items():
+                        if key == 'songs':
+                            if indexed:
+                                self.insert_song(Song.from_dict(value), journal=False)
+                            else:
+                                songs.append(Song.from_dict(value))
+                        elif key == 'playlists':
+                            if not songs and not indexed:
+                                pending_playlists.append(value)
+                                continue
+                            if not indexed:
+                                #Sobald die Playlists beginnen, ist die Song-Liste vollständig und der ID-Index wird einmalig aufgebaut
+                                self.rebuild_indexes()
+                                indexed = True
+                            self.playlists.append(Playlist.from_dict(value, self.songs_by_id))
+                        elif key == 'journal_seq':
+                            snapshot_seq = value
+                        elif key == 'next_song_id':
+                            next_song_id = value
+                        count += 1
+                        if progress and count % progress_every == 0:
+                            progress(len(self.songs), len(self.playlists), reader.bytes_read, total_bytes)
+
+                if not indexed:
+                    self.rebuild_indexes()
+                #IDs gelöschter Songs werden nicht neu vergeben, sonst zeigen alte Verweise (Journal, song_ids anderer Dateien) auf einen anderen Song
+                self.next_song_id = max(self.next_song_id, next_song_id)
+                self.playlists.extend(Playlist.from_dict(pl_data, self.songs_by_id) for pl_data in pending_playlists)
+                self.resolve_embedded_playlist_songs()
+                if progress:
+                    progress(len(self.songs), len(self.playlists), total_bytes, total_bytes)
+                print("Data loaded successfully.")
+            else:
+                snapshot_seq = 0
+                print("\033[41No data file found. Starting with an empty database.\033[0m")
+
+            #Änderungen aus dem Journal, die seit dem letzten Snapshot angefallen sind, nachspielen
+            applied = self.replay_journal(snapshot_seq)
+            if applied:
+                print(f"Replayed {applied} journaled changes.")
+            #Erster Start im SQLite-Modus: die bisherigen Daten werden in einer Transaktion in die Datenbank übernommen
+            if self.store is not None and self.songs:
+                self.store.import_catalog(self.songs, self.playlists, self.next_song_id)
+                print(f"Migrated {len(self.songs)} songs and {len(self.playlists)} playlists to {self.store.file_path}.")
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def load_binary(self, file_path):
+        #Lädt einen binären Snapshot: die Songs werden als MappedSong angelegt und lesen ihre Felder erst bei Bedarf aus der Datei
+        #Für die Indizes werden nur die ID-Spalte und die Namen gebraucht; gibt die journal_seq des Snapshots zurück
+        catalog = BinaryCatalog(file_path)
+        self.songs = catalog.songs()
+        self.songs_by_id = dict(zip(catalog.ids, self.songs))
+        self.next_song_id = max(max(catalog.ids, default=0) + 1, catalog.next_song_id)
+        self.name_index = catalog.name_index(self.songs, self.normalize_name)
+        self.discard_derived_indexes()
+        self.playlists = [Playlist.from_dict({"name": name, "song_ids": song_ids}, self.songs_by_id) for name, song_ids in catalog.playlists()]
+        self.playlist_index = None
+        return catalog.journal_seq
+
+    def load_sqlite(self):
+        #Lädt aus der SQLite-Datenbank nur die Song-IDs und die Playlist-Einträge; die Songs sind StoredSongs und lesen ihre Felder erst bei Bedarf
+        #Suche nach Namen, Abfragen und die Playlists eines Songs laufen über die Indizes der Datenbank, der Namensindex entsteht erst bei Bedarf
+        song_ids = self.store.song_ids()
+        self.songs = [StoredSong(self.store, song_id) for song_id in song_ids]
+        self.songs_by_id = dict(zip(song_ids, self.songs))
+        self.next_song_id = max(max(song_ids, default=0) + 1, self.store.next_song_id())
+        self.name_index = None
+        self.discard_derived_indexes()
+        self.playlists = [Playlist.from_dict({"name": name, "song_ids": song_ids}, self.songs_by_id) for name, song_ids in self.store.playlists()]
+        self.playlist_index = None
+
+    def write_batch(self):
+        #Fasst viele Änderungen zu einer Transaktion zusammen (im SQLite-Modus, sonst ohne Wirkung)
+        if self.store is not None:
+            return self.store.transaction()
+        return contextlib.nullcontext()
+
+    def write_snapshot(self, file_path, snapshot_format=None, source=None):
+        #Schreibt den aktuellen Stand als Snapshot im gewünschten Format (auch zum Umwandeln zwischen JSON und Binärformat)
+        #source ist ein CatalogSnapshot, dann wird dessen eingefrorener Stand geschrieben statt self.songs und self.playlists
+        snapshot_format = snapshot_format or self.snapshot_format
+        source = source or self
+        if snapshot_format == 'binary':
+            BinaryCatalog.write(file_path, source.songs, source.playlists, source.journal_seq, source.next_song_id)
+            return
+        if snapshot_format != 'json':
+            raise ValueError(f"Unknown snapshot format: {snapshot_format}")
         data = {
-            "songs": [song.to_dict() for song in self.songs],
-            "playlists": [playlist.to_dict() for playlist in self.playlists]
+            "journal_seq": source.journal_seq,
+            "next_song_id": source.next_song_id,
+            "songs": [song.to_dict() for song in source.songs],
+            "playlists": [playlist.to_dict() for playlist in source.playlists]
         }
-        
-        with open(self.data_file, 'w') as f:
+
+        #Erst in eine temporäre Datei schreiben und dann atomar ersetzen, damit ein Absturz keinen halben Snapshot hinterlässt
+        temp_file = file_path + '.tmp'
+        with open(temp_file, 'w') as f:
             json.dump(data, f, indent=4)
-        print("\033[41Data saved successfully.\033[0m")
+        os.replace(temp_file, file_path)
+
+    def save_data(self, compact=False, quiet=False):
+        #Speichert die aktuelle Liste der Songs und Playlists in einer JSON-Datei
+        #Im Journal-Modus sind die Änderungen bereits im Journal gesichert, der Snapshot wird nur ab dem Schwellwert (oder mit compact=True) neu geschrieben
+        #quiet=True unterdrückt die Meldungen (z.B. im HTTP-Dienst, der aus einem Thread-Pool speichert)
+        if self.storage_mode == 'journal' and not compact and self.journal_length < self.journal_threshold:
+            if not quiet:
+                print(f"\033[41Changes are journaled ({self.journal_length} pending).\033[0m")
+            return 0
+        #Im SQLite-Modus ist jede Änderung bereits gespeichert; compact überträgt das Write-Ahead-Log in die Datenbankdatei
+        if self.store is not None:
+            if compact:
+                self.store.checkpoint()
+        else:
+            self.compact_journal()
+        if not quiet:
+            print("\033[41Data saved successfully.\033[0m")
         return 0
 
     def add_song(self):
@@ -150,8 +2212,12 @@ class MusicApp:
         album = input("\033[92mEnter album name: \033[0m")
         genre = input("\033[92mEnter genre: \033[0m")
         duration = input("\033[92mEnter duration (mm:ss): \033[0m")
-        song = Song(name, artist, album, genre, duration)
-        self.songs.append(song)
+        try:
+            song = Song(name, artist, album, genre, duration)
+        except ValueError:
+            print(f"\033[103mThe duration '{duration}' is not valid, please use the format mm:ss.\033[0m")
+            return -1
+        self.insert_song(song)
         print(f"\033[103mWe added the song with name: {song.name}, artist: {song.artist}, album: {song.album}, genre: {song.genre}, duration: {song.duration} to your app.\033[0m")
         return 0
 
@@ -160,7 +2226,7 @@ class MusicApp:
         print("\033[1m\033[32mHere you can create a new playlist.\033[0m")
         name = input("\033[92mEnter playlist name: \033[0m")
         playlist = Playlist(name)
-        self.playlists.append(playlist)
+        self.insert_playlist(playlist)
         print(f"\033[103mWe created a playlist with this name: {playlist} for you\033[0m")
         return 0
 
@@ -168,45 +2234,282 @@ class MusicApp:
         #Fügt einen vorhandenen Song zu einer vorhandenen Playlist hinzu, die der Benutzer durch den Playlist Namen angibt
         print("\033[1m\033[32mHere you can add a song to a playlist.\033[0m")
         playlist_name = input("\033[92mEnter the name of the playlist: \033[0m")
-        playlist = next((pl for pl in self.playlists if pl.name.lower() == playlist_name.lower()), None)
+        playlist = self.find_playlist(playlist_name)
         if not playlist:
             print(f"\033[103mWe could not find a playlist with this name {playlist_name}.\033[0m")
             return -1
 
         song_input = input("\033[92mEnter the name of the song to add: \033[0m")
-        song = next((song for song in self.songs if song.name.lower() == song_input.lower()), None)
+        song = self.find_song(song_input)
         if not song:
             print(f"\033[103mWe could not find a song with this name: {song_input}.\033[0m")
             return -1
 
-        playlist.add_song(song)
+        self.add_to_playlist(playlist, song)
         print(f"\033[103mWe added the song: '{song.name}' to the playlist: '{playlist.name}'.\033[0m")
         return 0
 
-    def analyze_search_algorithm_runtime(self, algorithm, arr, num_runs=None):
-        
-        # Dynamische Bestimmung der Anzahl der Durchläufe basierend auf der Anzahl der Songs
-        if num_runs is None:
-            num_runs = max(30, min(100, len(arr) // 10))  # Mindestens 30, maximal 100 Durchläufe
+    #Namen der Suchalgorithmen in der Reihenfolge des Menüs, so wie sie auch im Benchmark-Ergebnis stehen
+    SEARCH_ALGORITHMS = ('linear', 'binary', 'depth_first', 'breadth_first', 'jump', 'fibonacci', 'exponential', 'tree_descent')
+
+    #Algorithmen, deren Aufwand pro Suche linear mit der Katalog-Größe wächst
+    LINEAR_TIME_SEARCHES = ('linear', 'depth_first', 'breadth_first')
 
+    #Unterstützte Dateiformate für Import und Export von Playlists
+    PLAYLIST_FORMATS = {'.csv': 'csv', '.m3u': 'm3u', '.m3u8': 'm3u'}
 
-        # Durchschnittsfall: Mehrere Zufallstests
-        random_targets = [random.choice(arr).name for _ in range(num_runs)]
+    def playlist_format(self, file_path, file_format=None):
+        #Bestimmt das Format über die Dateiendung, falls es nicht ausdrücklich angegeben ist
+        if file_format is None:
+            file_format = self.PLAYLIST_FORMATS.get(os.path.splitext(file_path)[1].lower())
+        if file_format not in ('csv', 'm3u'):
+            raise ValueError(f"Unknown playlist format for {file_path}. Please use .csv or .m3u")
+        return file_format
+
+    @staticmethod
+    def read_playlist_entries(file_path, file_format):
+        #Liest die Datei Zeile für Zeile und liefert (Zeilennummer, Songname, Künstler oder None) als Generator
+        #CSV: Kopfzeile mit der Spalte "name" (optional "artist"); ohne Kopfzeile steht der Name in der ersten Spalte
+        #M3U: Titel und Künstler stehen in "#EXTINF:<Sekunden>,<Künstler> - <Titel>", sonst wird der Dateiname des Eintrags verwendet
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            if file_format == 'csv':
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if header is None:
+                    return
+                columns = [column.strip().lower() for column in header]
+                if 'name' in columns:
+                    name_column = columns.index('name')
+                    artist_column = columns.index('artist') if 'artist' in columns else None
+                else:
+                    #Keine Kopfzeile: die erste Zeile ist bereits ein Eintrag
+                    name_column, artist_column = 0, None
+                    if header and header[0].strip():
+                        yield reader.line_num, header[0].strip(), None
+                for row in reader:
+                    if len(row) <= name_column or not row[name_column].strip():
+                        continue
+                    artist = row[artist_column].strip() if artist_column is not None and len(row) > artist_column else None
+                    yield reader.line_num, row[name_column].strip(), artist or None
+            else:
+                title = artist = None
+                for line_number, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line or line == '#EXTM3U':
+                        continue
+                    if line.startswith('#EXTINF:'):
+                        info = line[len('#EXTINF:'):].split(',', 1)[-1].strip()
+                        artist, separator, title = info.partition(' - ')
+                        if not separator:
+                            artist, title = None, info
+                        continue
+                    if line.startswith('#'):
+                        continue
+                    #Die Zeile nach #EXTINF ist der Pfad bzw. die URL des Titels
+                    if title is None:
+                        title = os.path.splitext(os.path.basename(line.replace('\\', '/')))[0]
+                    yield line_number, title, artist
+                    title = artist = None
+
+    def import_playlist(self, file_path, playlist_name=None, file_format=None, batch_size=1000):
+        #Importiert eine Playlist aus einer CSV- oder M3U-Datei ohne Rückfragen
+        #Die Einträge werden gestreamt und blockweise mit batch_search im Katalog aufgelöst, die Datei wird also nie komplett geladen
+        #Gibt (Anzahl importierter Songs, Liste der nicht gefundenen Einträge als (Zeilennummer, Name)) zurück
+        file_format = self.playlist_format(file_path, file_format)
+        if playlist_name is None:
+            playlist_name = os.path.splitext(os.path.basename(file_path))[0]
+        playlist = self.find_playlist(playlist_name)
+        if playlist is None:
+            playlist = Playlist(playlist_name)
+            self.insert_playlist(playlist)
+
+        imported = 0
+        unmatched = []
+        entries = self.read_playlist_entries(file_path, file_format)
+        while True:
+            batch = list(itertools.islice(entries, batch_size))
+            if not batch:
+                break
+            matches = self.batch_search(name for _, name, _ in batch)
+            #Jeder Block wird in einer Transaktion gespeichert
+            with self.write_batch():
+                for line_number, name, artist in batch:
+                    song = matches[name]
+                    if song is not None and artist is not None and song.artist.casefold() != artist.casefold():
+                        #Mehrere Songs mit gleichem Namen: den Song des angegebenen Künstlers bevorzugen
+                        song = next((candidate for candidate in self.find_songs(name) if candidate.artist.casefold() == artist.casefold()), song)
+                    if song is None:
+                        unmatched.append((line_number, name))
+                        continue
+                    self.add_to_playlist(playlist, song)
+                    imported += 1
+        return imported, unmatched
+
+    def export_playlist(self, playlist_name, file_path, file_format=None):
+        #Exportiert eine Playlist als CSV oder M3U; jede Zeile wird direkt geschrieben, es wird kein Gesamttext im Speicher aufgebaut
+        #Gibt die Anzahl der exportierten Songs zurück
+        file_format = self.playlist_format(file_path, file_format)
+        playlist = self.find_playlist(playlist_name)
+        if playlist is None:
+            raise ValueError(f"Playlist not found: {playlist_name}")
+
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            if file_format == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(['name', 'artist', 'album', 'genre', 'duration'])
+                for song in playlist.songs:
+                    writer.writerow([song.name, song.artist, song.album, song.genre, song.duration])
+            else:
+                f.write("#EXTM3U\n")
+                for song in playlist.songs:
+                    f.write(f"#EXTINF:{song.duration_seconds},{song.artist} - {song.name}\n")
+                    f.write(f"{song.artist}/{song.album}/{song.name}\n")
+        return len(playlist.songs)
+
+    def import_playlist_from_file(self):
+        print("\033[1m\033[32mHere you can import a playlist from a CSV or M3U file.\033[0m")
+        file_path = input("\033[92mEnter the path of the file: \033[0m").strip()
+        playlist_name = input("\033[92mEnter the name of the playlist (leave empty to use the file name): \033[0m").strip() or None
+        try:
+            imported, unmatched = self.import_playlist(file_path, playlist_name)
+        except (OSError, ValueError) as error:
+            print(f"\033[91mThe playlist could not be imported: {error}\033[0m")
+            return -1
 
+        print(f"\033[103mWe imported {imported} songs.\033[0m")
+        if unmatched:
+            print(f"\033[91m{len(unmatched)} entries could not be found in the catalog:\033[0m")
+            for line_number, name in unmatched[:20]:
+                print(f"  line {line_number}: {name}")
+            if len(unmatched) > 20:
+                print(f"  ... and {len(unmatched) - 20} more")
+        return 0
 
-        # Durchschnittsfall Laufzeit über mehrere Zufallsziele
-        average_times = []
-        for target in random_targets:
-            start_time = time.time()
-            algorithm(song_input=target)
-            average_times.append(time.time() - start_time)
+    def export_playlist_to_file(self):
+        print("\033[1m\033[32mHere you can export a playlist to a CSV or M3U file.\033[0m")
+        playlist_name = input("\033[92mEnter the name of the playlist: \033[0m")
+        file_path = input("\033[92mEnter the path of the file (.csv or .m3u): \033[0m").strip()
+        try:
+            exported = self.export_playlist(playlist_name, file_path)
+        except (OSError, ValueError) as error:
+            print(f"\033[91mThe playlist could not be exported: {error}\033[0m")
+            return -1
+        print(f"\033[103mWe exported {exported} songs to {file_path}.\033[0m")
+        return 0
 
-        average_case_time = sum(average_times) / len(average_times)
+    @staticmethod
+    def percentile(sorted_values, percent):
+        #Perzentil nach der Nearest-Rank-Methode aus einer bereits sortierten Liste
+        if not sorted_values:
+            return 0
+        rank = max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)
+        return sorted_values[rank]
+
+    def benchmark_catalog(self, size, rng):
+        #Stellt einen Katalog mit genau size Songs für die Benchmarks zusammen
+        #Solange möglich werden echte Songs aus dem Katalog verwendet, nur der Rest wird zufällig generiert
+        if size <= len(self.songs):
+            return rng.sample(self.songs, size)
+        return list(self.songs) + self.generate_random_songs(size - len(self.songs), rng)
+
+    def search_benchmark_runners(self, songs, sorted_arr):
+        #Ordnet jedem Algorithmus eine Funktion name -> (Index, Vergleiche) zu, die ohne Ausgabe und ohne Namensauflösung sucht
+        #Der Baum wird nur gebaut, wenn er gebraucht wird, und nicht mitgemessen
+        search_tree = []
+
+        def get_search_tree():
+            if not search_tree:
+                search_tree.append(SearchTree(sorted_arr))
+            return search_tree[0]
 
         return {
+            'linear': lambda name: self.linear_search_core(songs, name),
+            'binary': lambda name: self.binary_search_core(sorted_arr, name),
+            'depth_first': lambda name: self.depth_first_search_core(get_search_tree(), name),
+            'breadth_first': lambda name: self.breadth_first_search_core(get_search_tree(), name),
+            'jump': lambda name: self.jump_search_core(sorted_arr, name),
+            'fibonacci': lambda name: self.fibonacci_search_core(sorted_arr, name),
+            'exponential': lambda name: self.exponential_search_core(sorted_arr, name),
+            'tree_descent': lambda name: self.tree_descent_search_core(get_search_tree(), name),
+        }
 
-            "Average Case Time": average_case_time
+    def measure_search(self, search, targets, warmup):
+        #Misst jede Suche einzeln mit perf_counter_ns, vorher laufen einige ungemessene Aufwärm-Durchläufe
+        for name in targets[:warmup]:
+            search(name)
+
+        timings = []
+        comparisons = 0
+        #Die Garbage Collection wird während der Messung pausiert, damit sie nicht zufällig einzelne Suchen verlangsamt
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for name in targets:
+                start = time.perf_counter_ns()
+                _, count = search(name)
+                timings.append(time.perf_counter_ns() - start)
+                comparisons += count
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        timings.sort()
+        return {
+            "queries": len(targets),
+            "p50_ns": self.percentile(timings, 50),
+            "p95_ns": self.percentile(timings, 95),
+            "p99_ns": self.percentile(timings, 99),
+            "mean_ns": sum(timings) // len(timings) if timings else 0,
+            "comparisons_per_query": comparisons / len(targets) if targets else 0
         }
+
+    def benchmark_search_algorithms(self, algorithms=None, sizes=(1000, 10000, 100000), queries=200, warmup=20,
+                                    linear_budget=20000000, seed=42, output_file='search_benchmark.json'):
+        #Benchmark für alle Suchalgorithmen über mehrere Katalog-Größen, jeweils für Treffer und Fehlschläge
+        #Bei den linearen Algorithmen wird die Anzahl der Suchen so begrenzt, dass size * queries höchstens linear_budget ist
+        if algorithms is None:
+            algorithms = self.SEARCH_ALGORITHMS
+        rng = random.Random(seed)
+        results = []
+
+        for size in sizes:
+            print(f"\033[94mPreparing catalog with {size} songs...\033[0m")
+            songs = self.benchmark_catalog(size, rng)
+            sorted_arr = sorted(songs, key=lambda song: song.name)
+            names = {song.name for song in songs}
+            runners = self.search_benchmark_runners(songs, sorted_arr)
+
+            #Treffer sind zufällige Namen aus dem Katalog, Fehlschläge zufällige Namen, die im Katalog nicht vorkommen
+            hits = [rng.choice(songs).name for _ in range(queries)]
+            misses = []
+            while len(misses) < queries:
+                candidate = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))).capitalize()
+                if candidate not in names:
+                    misses.append(candidate)
+
+            for algorithm in algorithms:
+                count = queries
+                if algorithm in self.LINEAR_TIME_SEARCHES:
+                    count = min(queries, max(10, linear_budget // max(size, 1)))
+                for case, targets in (("hit", hits[:count]), ("miss", misses[:count])):
+                    result = self.measure_search(runners[algorithm], targets, min(warmup, count))
+                    results.append(dict({"algorithm": algorithm, "size": size, "case": case}, **result))
+                    print(f"{algorithm:<14} {size:>10} {case:<5} p50 {result['p50_ns'] / 1000:>10.2f} µs  p95 {result['p95_ns'] / 1000:>10.2f} µs  "
+                          f"p99 {result['p99_ns'] / 1000:>10.2f} µs  comparisons {result['comparisons_per_query']:>10.1f}")
+
+        report = {
+            "benchmark": "search",
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "seed": seed,
+            "warmup": warmup,
+            "results": results
+        }
+        if output_file:
+            with open(output_file, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Results were saved to {output_file}.")
+        return report
     
     def searching_alogrithms_to_test(self):
         #Auswahl der verschiedenen Suchalgorithmen
@@ -217,42 +2520,27 @@ class MusicApp:
         print("5. Test jump search")
         print("6. Test fibonacci search")
         print("7. Test exponential search")
+        print("8. Test search tree descent")
+        print("9. Test all search algorithms")
 
         option= input("\033[1mChoose your algorithm by number: \033[0m")
-        if option == "1":
-            results= self.analyze_search_algorithm_runtime(self.linear_search, self.songs)
-
-        elif option == "2":
-            sorted_songs= self.quicksort(self.songs)
-            results = self.analyze_search_algorithm_runtime(lambda song_input: self.binary_search(arr=sorted_songs, song_input=song_input), sorted_songs)
-
-        elif option == "3":
-            tree = self.create_binary_tree(self.songs)
-            results = self.analyze_search_algorithm_runtime(lambda song_input: self.depth_first_search(node=tree, song_input=song_input), self.songs)
-
-        elif option == "4":
-            tree = self.create_binary_tree(self.songs)
-            results = self.analyze_search_algorithm_runtime(lambda song_input: self.breadth_first_search(node=tree, song_input=song_input), self.songs)
-
-        elif option == "5":
-            sorted_songs = self.quicksort(self.songs)  
-            results = self.analyze_search_algorithm_runtime(lambda song_input: self.jump_search(arr=sorted_songs, song_input=song_input), sorted_songs)
-
-        elif option == "6":
-            sorted_songs = self.quicksort(self.songs)  
-            results = self.analyze_search_algorithm_runtime(lambda song_input: self.fibonacci_search(arr=sorted_songs, song_input=song_input), sorted_songs)
-
-        elif option == "7":
-            sorted_songs = self.quicksort(self.songs)  
-            results = self.analyze_search_algorithm_runtime(lambda song_input: self.exponential_search(arr=sorted_songs, song_input=song_input), sorted_songs)
-                                                     
+        if option in ("1", "2", "3", "4", "5", "6", "7", "8"):
+            algorithms = (self.SEARCH_ALGORITHMS[int(option) - 1],)
+        elif option == "9":
+            algorithms = self.SEARCH_ALGORITHMS
         else:
             print("Invalid option selected.")
             return
 
-        if results:
-            print("\n\033[1mSummary of Algorithm Runtime\033[0m")
-            print(f"Average Case Time: {results['Average Case Time']:.6f} seconds")
+        sizes_input = input("\033[92mCatalog sizes to test, comma separated (empty: current catalog size): \033[0m")
+        try:
+            sizes = [int(size) for size in sizes_input.replace(' ', '').split(',') if size] or [len(self.songs)]
+        except ValueError:
+            print("Invalid catalog sizes.")
+            return
+
+        print("\n\033[1mSummary of Algorithm Runtime\033[0m")
+        self.benchmark_search_algorithms(algorithms, sizes)
 
     def search_songs_with_algorithms(self):
         #Auswahl der verschiedenen Suchalgorithmen
@@ -263,302 +2551,594 @@ class MusicApp:
         print("5. Search with jump search")
         print("6. Search with fibonacci search")
         print("7. Search with exponential search")
+        print("8. Search with search tree descent")
+        print("9. Autocomplete song, artist or album names (prefix search, most songs first)")
+        print("10. Search with typos (fuzzy search)")
+        print("11. Filter by artist, album, genre and duration")
         
         
         option= input("\033[1mChoose your algorithm by number: \033[0m")
         if option == "1":
             self.linear_search()
         elif option == "2":
-            self.songs = self.quicksort(self.songs)
-            self.binary_search()
+            self.binary_search(arr=self.get_sorted_songs())
         elif option == "3":
-            tree= self.create_binary_tree(self.songs)
-            self.depth_first_search(node= tree)
+            self.depth_first_search()
         elif option == "4":
-            tree= self.create_binary_tree(self.songs)
-            self.breadth_first_search(node=tree)
+            self.breadth_first_search()
         elif option == "5":
-            sorted_songs= self.quicksort(self.songs)
+            sorted_songs= self.get_sorted_songs()
             self.jump_search(arr=sorted_songs)
         elif option == "6":
-            sorted_songs= self.quicksort(self.songs)
+            sorted_songs= self.get_sorted_songs()
             self.fibonacci_search(arr=sorted_songs)
         elif option == "7":
-            sorted_songs= self.quicksort(self.songs)
+            sorted_songs= self.get_sorted_songs()
             self.exponential_search(arr= sorted_songs)
+        elif option == "8":
+            self.tree_descent_search()
+        elif option == "9":
+            self.prefix_search()
+        elif option == "10":
+            self.fuzzy_search()
+        elif option == "11":
+            self.query_songs()
        
 
 
+    #Textfelder, über die die Präfixsuche (Autocomplete) läuft
+    PREFIX_FIELDS = ('name', 'artist', 'album')
+
+    def get_prefix_indexes(self):
+        #Gibt die Präfix-Indizes (ein PrefixIndex pro Feld) zurück; sie werden beim ersten Zugriff aufgebaut und danach mit dem Katalog gepflegt
+        if self.prefix_indexes is None:
+            self.prefix_indexes = {field: PrefixIndex(field, self.songs) for field in self.PREFIX_FIELDS}
+        return self.prefix_indexes
+
+    def autocomplete(self, prefix, limit=10, fields=None):
+        #Gibt die limit häufigsten Vervollständigungen für ein Präfix über Songname, Künstler und Album zurück
+        #Ergebnis: [(Feld, Wert, Anzahl der Songs), ...] nach Anzahl absteigend, bei gleicher Anzahl alphabetisch
+        if fields is None:
+            fields = self.PREFIX_FIELDS
+        key = ('prefix', PrefixIndex.normalize(prefix), limit, tuple(fields))
+        completions = self.query_cache.get(key)
+        if completions is None:
+            indexes = self.get_prefix_indexes()
+            completions = []
+            for field in fields:
+                completions.extend((field, value, count) for value, count in indexes[field].complete(prefix, limit))
+            #nlargest ist stabil: bei gleicher Anzahl bleibt die alphabetische Reihenfolge erhalten
+            completions.sort(key=lambda completion: (completion[1].casefold(), completion[0]))
+            completions = heapq.nlargest(limit, completions, key=operator.itemgetter(2))
+            self.query_cache.put(key, completions)
+        return list(completions)
+
+    def prefix_search(self, prefix=None, limit=10):
+        print("\033[1m\033[32mAutocomplete is started\033[0m")
+        if prefix is None:
+            prefix = input("\033[92mStart typing a song, artist or album name: \033[0m")
+
+        start_time = time.perf_counter()
+        completions = self.autocomplete(prefix, limit)
+        end_time = time.perf_counter()
+
+        if not completions:
+            print(f"\033[103mNothing starts with: '{prefix}'\033[0m")
+        for field, value, count in completions:
+            print(f"\033[103m{value}\033[0m ({field}, {count} song{'s' if count != 1 else ''})")
+        print(f"Search took {(end_time - start_time) * 1000:.3f} ms.")
+        return completions
+
+
+    def get_ngram_index(self):
+        #Gibt den n-Gramm-Index über die Songnamen zurück (wird beim ersten Zugriff aufgebaut und danach mit dem Katalog gepflegt)
+        if self.ngram_index is None:
+            self.ngram_index = NGramIndex(self.get_name_index())
+        return self.ngram_index
+
+    def fuzzy_search_core(self, song_input, limit=5, max_distance=None):
+        #Fehlertolerante Suche: Kandidaten kommen aus dem n-Gramm-Index, danach wird nach Editierdistanz sortiert
+        #Gibt [(Song, Distanz, Score), ...] zurück; Score 1.0 bedeutet exakte Übereinstimmung
+        query = self.normalize_name(song_input)
+        if max_distance is None:
+            #Kurze Namen vertragen weniger Tippfehler als lange
+            max_distance = 1 if len(query) <= 4 else 2 if len(query) <= 8 else 3
+
+        cache_key = ('fuzzy', query, limit, max_distance)
+        matches = self.query_cache.get(cache_key)
+        if matches is not None:
+            return list(matches)
+
+        ngram_index = self.get_ngram_index()
+        ranked = []
+        for key in ngram_index.candidates(query):
+            distance = NGramIndex.bounded_edit_distance(query, key, max_distance)
+            if distance <= max_distance:
+                ranked.append((distance, key))
+        ranked.sort()
+
+        matches = []
+        for distance, key in ranked:
+            score = 1 - distance / max(len(query), len(key), 1)
+            matches.extend((song, distance, score) for song in self.get_name_index().get(key, []))
+            if len(matches) >= limit:
+                del matches[limit:]
+                break
+        self.query_cache.put(cache_key, matches)
+        return list(matches)
+
+    def fuzzy_search(self, song_input=None, limit=5):
+        print("\033[1m\033[32mFuzzy Search is started\033[0m")
+        if song_input is None:
+            song_input = input("\033[92mProvide the name of the song you want to search for (typos are allowed): \033[0m")
+
+        start_time = time.perf_counter()
+        matches = self.fuzzy_search_core(song_input, limit)
+        end_time = time.perf_counter()
+
+        if not matches:
+            print(f"\033[103mWe could not find a song similar to: '{song_input}'\033[0m")
+        for song, distance, score in matches:
+            print(f"\033[103m{song}\033[0m (score {score:.2f}, {distance} edit{'s' if distance != 1 else ''})")
+        print(f"Search took {(end_time - start_time) * 1000:.3f} ms.")
+        return matches
+
+
+    def get_query_index(self):
+        #Gibt die Sekundärindizes (artist, album, genre, duration) zurück; sie werden beim ersten Zugriff aufgebaut und danach mit dem Katalog gepflegt
+        if self.query_index is None:
+            self.query_index = QueryIndex(self.songs)
+        return self.query_index
+
+    def query_plan(self, artist=None, album=None, genre=None, min_duration=None, max_duration=None):
+        #Übersetzt die Abfrage in Prädikate und ordnet sie nach Selektivität
+        #Dauern dürfen als "M:SS", "H:MM:SS" oder in Sekunden angegeben werden
+        filters = {field: value for field, value in (('artist', artist), ('album', album), ('genre', genre)) if value is not None}
+        min_seconds = None if min_duration is None else Song.parse_duration(min_duration)
+        max_seconds = None if max_duration is None else Song.parse_duration(max_duration)
+        return self.get_query_index().plan(filters, min_seconds, max_seconds)
+
+    #Abfragen mit mehr Treffern werden nicht im QueryCache gespeichert (sie würden den Cache mit großen Listen füllen)
+    QUERY_CACHE_RESULT_LIMIT = 1000
+
+    def query(self, artist=None, album=None, genre=None, min_duration=None, max_duration=None):
+        #Gibt alle Songs zurück, die alle angegebenen Bedingungen erfüllen (UND-Verknüpfung), als Iterator
+        #Ohne Bedingung werden alle Songs geliefert
+        #Im SQLite-Modus führt die Datenbank die Abfrage aus (solange die QueryIndex-Struktur nicht ohnehin im Speicher liegt)
+        if all(value is None for value in (artist, album, genre, min_duration, max_duration)):
+            return iter(list(self.songs))
+        key = ('query', *(None if value is None else QueryIndex.normalize(value) for value in (artist, album, genre)),
+               None if min_duration is None else Song.parse_duration(min_duration),
+               None if max_duration is None else Song.parse_duration(max_duration))
+        songs = self.query_cache.get(key)
+        if songs is not None:
+            return iter(songs)
+        if self.store is not None and self.query_index is None:
+            results = map(self.songs_by_id.__getitem__, self.store.query_ids(artist, album, genre, key[-2], key[-1]))
+        else:
+            results = self.get_query_index().run(self.query_plan(artist, album, genre, min_duration, max_duration))
+        songs = list(itertools.islice(results, self.QUERY_CACHE_RESULT_LIMIT + 1))
+        if len(songs) > self.QUERY_CACHE_RESULT_LIMIT:
+            return itertools.chain(songs, results)
+        self.query_cache.put(key, tuple(songs))
+        return iter(songs)
+
+    def query_songs(self):
+        print("\033[1m\033[32mFilter songs by artist, album, genre and duration (leave a field empty to skip it)\033[0m")
+        criteria = {}
+        for field in ('artist', 'album', 'genre'):
+            value = input(f"\033[92m{field.capitalize()}: \033[0m").strip()
+            if value:
+                criteria[field] = value
+        for field, label in (('min_duration', 'Minimum duration (M:SS)'), ('max_duration', 'Maximum duration (M:SS)')):
+            value = input(f"\033[92m{label}: \033[0m").strip()
+            if value:
+                try:
+                    Song.parse_duration(value)
+                except ValueError:
+                    print("\033[91mInvalid duration. Please use the format M:SS.\033[0m")
+                    return []
+                criteria[field] = value
+
+        start_time = time.perf_counter()
+        #Im SQLite-Modus plant die Datenbank selbst, ein QueryIndex würde nur für die Anzeige des Plans aufgebaut
+        steps = self.query_plan(**criteria) if self.store is None else None
+        matches = list(self.query(**criteria))
+        end_time = time.perf_counter()
+
+        if steps:
+            print("Plan: " + " -> ".join(f"{field} (~{estimate})" for estimate, field, _ in steps))
+        for song in matches:
+            print(f"\033[103m{song}\033[0m")
+        print(f"{len(matches)} song{'s' if len(matches) != 1 else ''} found in {(end_time - start_time) * 1000:.3f} ms.")
+        return matches
+
+
+    #Positionssuchen, deren Ergebnis im QueryCache gespeichert wird, und die Liste, auf die sich die Position bezieht
+    CACHED_SEARCH_VIEWS = {'linear': 'songs', 'binary': 'sorted', 'jump': 'sorted', 'fibonacci': 'sorted', 'exponential': 'sorted'}
+
+    def cached_search_core(self, algorithm, arr, name):
+        #Wie <algorithm>_search_core, gibt (Index, Anzahl der Vergleiche) zurück; wiederholte Anfragen kommen aus dem QueryCache
+        #Gespeichert wird nur für self.songs bzw. die sortierte Sicht, andere Listen (z.B. im Benchmark) werden immer durchsucht
+        #Der Name wird wie bei find_song ohne Beachtung der Groß- und Kleinschreibung aufgelöst; die Anzahl der Vergleiche ist die des ersten Durchlaufs
+        core = getattr(self, f"{algorithm}_search_core")
+        view = self.CACHED_SEARCH_VIEWS.get(algorithm)
+        if view is None or arr is not (self.songs if view == 'songs' else self.sorted_songs):
+            return core(arr, name)
+        key = (algorithm, self.normalize_name(name))
+        result = self.query_cache.get(key)
+        if result is None:
+            target = self.find_song(name)
+            result = core(arr, target.name if target else name)
+            self.query_cache.put(key, result)
+        return result
+
     def linear_search(self, song_input=None):
         arr= self.songs
         # Wenn keine Eingabe (song_input) bereitgestellt wird, fordert das Programm den Benutzer auf, eine Eingabe zu machen
         if song_input is None:
             print("\033[1m\033[32mLinear Search is started\033[0m")
             song_input= input("\033[92mProvide the name of the song you want to search for: \033[0m")
-            song_input = song_input.lower()
 
         #Zeitmessung für die Dauer der Suche
         start_time = time.time()
-        # Iteration durch das Array, um das gesuchte Lied zu finden
-        # Der lineare Suchalgorithmus vergleicht jedes Song-Objekt im Array mit der Eingabe
-        for index, song in enumerate(arr):
-            # Wenn der Song gefunden wird (Unterscheidung von Groß- und Kleinschreibung wird ignoriert)
-            if song.name.lower() == song_input:
-                # Zeitmessung stoppen
-                end_time = time.time()
-                print(f"\033[103mWe found the song '{song.name}' by {song.artist} - Album: {song.album}, Genre: {song.genre}, Duration: {song.duration} min at index {index}.\033[0m")
-                print(f"Search took {end_time - start_time} seconds.")
-                return index 
-        #Zeitmessung stoppen, wenn der Song nicht gefunden wurde
+        #Der Namensindex sagt in O(1), ob es den Song überhaupt gibt -> bei einem Fehlschlag muss nicht das ganze Array durchlaufen werden
+        target = self.find_song(song_input)
+        index, comparisons = self.cached_search_core('linear', arr, target.name) if target else (-1, 0)
+        #Zeitmessung stoppen
         end_time = time.time()
-        print(f"\033[103mWe could not find a song with the name: {song_input}.\033[0m")
+        if index != -1:
+            song = arr[index]
+            print(f"\033[103mWe found the song '{song.name}' by {song.artist} - Album: {song.album}, Genre: {song.genre}, Duration: {song.duration} min at index {index}.\033[0m")
+        else:
+            print(f"\033[103mWe could not find a song with the name: {song_input}.\033[0m")
         print(f"Search took {end_time - start_time} seconds.")
-        return -1
+        return index
+
+    def linear_search_core(self, arr, name):
+        #Eigentlicher Algorithmus ohne Ausgabe: gibt (Index, Anzahl der Vergleiche) zurück, -1 wenn der Name nicht vorkommt
+        # Der lineare Suchalgorithmus vergleicht jedes Song-Objekt im Array mit dem gesuchten Namen
+        for index, song in enumerate(arr):
+            if song.name == name:
+                return index, index + 1
+        return -1, len(arr)
 
 
     def binary_search(self, arr=None, song_input=None, left=None, right=None):
-        # Falls kein Array übergeben wurde, wird das Standardarray der Songs verwendet
+        # Falls kein Array übergeben wurde, wird die sortierte Sicht der Songs verwendet
         if arr is None:
-            arr = self.songs
-        # Falls ein song_input übergeben wurde, wird geschaut ob der Songname im Array enthalten ist
-        if song_input is not None:
-            #Zeitmessung gestartet
-            start_time = time.time()
-            # Suche das entsprechende Song-Objekt anhand des song_input
-            song = next((s for s in arr if s.name.lower() == song_input.lower()), None)
-            if not song:
-                print(f"\033[103mWe could not find a song with the name: {song_input}.\033[0m")
-                return -1
-        else:
-            #Falls kein song_input übergeben wurde, fordert das Programm den Benutzer auf, einen Songnamen einzugeben
+            arr = self.get_sorted_songs()
+        #Falls kein song_input übergeben wurde, fordert das Programm den Benutzer auf, einen Songnamen einzugeben
+        if song_input is None:
             print("\033[1m\033[32mBinary Search is started\033[0m")
             song_input = input("\033[92mProvide the name of the song you want to search for: \033[0m")
-            start_time = time.time()
-            song = next((s for s in arr if s.name.lower() == song_input.lower()), None)
-            if not song:
-                print(f"\033[103mWe could not find a song with the name: {song_input}.\033[0m")
-                return -1
 
+        #Zeitmessung gestartet
+        start_time = time.time()
+        # Suche das entsprechende Song-Objekt anhand des song_input
+        song = self.find_song(song_input)
+        if not song:
+            print(f"\033[103mWe could not find a song with the name: {song_input}.\033[0m")
+            return -1
+
+        if left is None and right is None:
+            index, comparisons = self.cached_search_core('binary', arr, song.name)
+        else:
+            index, comparisons = self.binary_search_core(arr, song.name, left, right)
+        #Zeitmessung gestoppt
+        end_time = time.time()
+        if index != -1:
+            print(f"\033[103mA song with the name: {song.name} was found on index {index}.\033[0m")
+        else:
+            print(f"\033[103mWe could not find a song with the name: {song.name}.\033[0m")
+        print(f"Search took {end_time - start_time} seconds.")
+        return index
+
+    def binary_search_core(self, arr, name, left=None, right=None):
+        #Eigentlicher Algorithmus ohne Ausgabe: gibt (Index, Anzahl der Vergleiche) zurück
         #Standardwerte für linke und rechte Begrenzungen (Suchbereich) setzen, falls nicht übergeben
         if right is None:
             right = len(arr) - 1
         if left is None:
             left = 0
 
+        comparisons = 0
         #Durchführung der Binärsuche
         while left <= right:
             #Berechnung des mittleren Indexes
             mid_index = left + (right - left) // 2
-            #Wenn gesuchter Song gefunden wurde, wird dies ausgegeben
-            if song.name == arr[mid_index].name:
-                #Zeitmessung gestoppt
-                end_time = time.time()
-                print(f"\033[103mA song with the name: {song.name} was found on index {mid_index}.\033[0m")
-                print(f"Search took {end_time - start_time} seconds.")
-                return mid_index
-            elif song.name > arr[mid_index].name:
+            comparisons += 1
+            mid_name = arr[mid_index].name
+            if name == mid_name:
+                return mid_index, comparisons
+            elif name > mid_name:
                 left = mid_index + 1
             else:
                 right = mid_index - 1
 
-        end_time = time.time()
-        print(f"\033[103mWe could not find a song with the name: {song.name}.\033[0m")
-        print(f"Search took {end_time - start_time} seconds.")
-        return -1
+        return -1, comparisons
 
 
 
-    def create_binary_tree(self, arr):
-        if not arr:
-            return None
-        #Der mittlere Index des Arrays wird berechnet, um das Array in zwei Hälften zu teilen
-        mid_index = len(arr) // 2
-        #Es wird ein Knoten (Node) erstellt, dessen Wert das mittlere Element des Arrays ist
-        #Die linke und rechte Seite des Baumes wird rekursiv mit den Teilarrays erstellt
-        node = {
-            'value': arr[mid_index],
-            'left': self.create_binary_tree(arr[:mid_index]),
-            'right': self.create_binary_tree(arr[mid_index + 1:])
-        }
+    def depth_first_search(self, tree=None, song_input=None):
+        print("\033[1m\033[32mDepth First Search is started\033[0m")
+        #Falls kein Baum übergeben wurde, wird der zwischengespeicherte Suchbaum des Katalogs verwendet
+        if tree is None:
+            tree = self.get_search_tree()
 
-        return node
-    
-    def depth_first_search(self, node, song_input=None, path=None, first_call=True, index=0, start_time=None):
-        if first_call:
-            print("\033[1m\033[32mDepth First Search is started\033[0m")
+        #Falls kein song_input übergeben wurde, fordert das Programm den Benutzer auf, einen Songnamen einzugeben
+        if song_input is None:
+            song_input = input("\033[92mProvide the name of the song you want to search for: \033[0m")
 
-            #Falls kein song_input übergeben wurde, fordert das Programm den Benutzer auf, einen Songnamen einzugeben
-            if song_input is None:
-                song_input = input("\033[92mProvide the name of the song you want to search for: \033[0m")
-            
-            #Zeitmessung starten
-            start_time = time.time()
+        #Zeitmessung starten
+        start_time = time.time()
 
-        # Suche das Song-Objekt basierend auf dem Namen
-        song = next((song for song in self.songs if song.name.lower() == song_input.lower()), None)
+        #Das Song-Objekt wird nur einmal über den Namensindex aufgelöst, nicht in jedem Schritt der Suche
+        song = self.find_song(song_input)
         if not song:
             print(f"\033[103mWe could not find a song with the name: {song_input}.\033[0m")
             return -1
 
-        #Initialisierung des Pfads, falls nicht vorhanden
-        if path is None:
-            path = []
-
-         #Wenn der aktuelle Knoten None ist, kehrt die Funktion zurück (Basisfall)
-        if node is None:
-            return None
-
-        #Namen des aktuellen Knotens wird zum Pfad hinzugefügt
-        if node['value'] is not None:
-            path.append(node['value'].name)
-        else:
-            return None
-
-        #Wenn der gesuchte Song gefunden wurde
-        if song.name == node['value'].name:
-            end_time = time.time()
-            print(f"Total search time: {end_time - start_time} seconds.")
-            print(f"\033[103mA song with the name: {song.name} was found.\033[0m")
-            print(f"Path: {' -> '.join(path)}")
-            print(f"Index in depth-first search: {index}")
-            
-            
+        node, comparisons = self.depth_first_search_core(tree, song.name)
+        #Zeitmessung stoppen
+        end_time = time.time()
+        print(f"Total search time: {end_time - start_time} seconds.")
+        if node == -1:
+            print(f"\033[103mWe could not find a song with the name: {song.name}.\033[0m")
+            return -1
 
-        index += 1
+        path = tree.path_to(node)
+        print(f"\033[103mA song with the name: {song.name} was found.\033[0m")
+        print(f"Path: {' -> '.join(tree.songs[index].name for index in path)}")
+        print(f"Index in depth-first search: {comparisons - 1}")
+        print(f"Depth at which the song was found: {len(path) - 1}")
+        return node
 
-        #Rekursiver Aufruf auf der linken Seite des Baums
-        result = self.depth_first_search(node=node['left'], song_input=song_input, path=path, first_call=False, index=index, start_time=start_time)
-        if result == 0:
-            return result
+    def tree_descent_search(self, tree=None, song_input=None):
+        print("\033[1m\033[32mSearch tree descent is started\033[0m")
+        #Falls kein Baum übergeben wurde, wird der zwischengespeicherte Suchbaum des Katalogs verwendet
+        if tree is None:
+            tree = self.get_search_tree()
 
-        #Rekursiver Aufruf auf der rechten Seite des Baums
-        result = self.depth_first_search(node=node['right'], song_input=song_input, path=path, first_call=False, index=index, start_time=start_time)
-        if result == 0:
-            return result
+        if song_input is None:
+            song_input = input("\033[92mProvide the name of the song you want to search for: \033[0m")
 
-        # Den letzten Pfad entfernen (backtracking)
-        path.pop()
-        
-        if first_call:
-            #Zeitmessung stoppen
-            end_time = time.time()
-            print(f"Total search time: {end_time - start_time} seconds.")
+        start_time = time.time()
+        song = self.find_song(song_input)
+        if not song:
+            print(f"\033[103mWe could not find a song with the name: {song_input}.\033[0m")
+            return -1
 
-        return -1
+        node, comparisons = self.tree_descent_search_core(tree, song.name)
+        end_time = time.time()
+        if node == -1:
+            print(f"\033[103mWe could not find a song with the name: {song.name}.\033[0m")
+        else:
+            print(f"\033[103mA song with the name: {song.name} was found after {comparisons} comparisons.\033[0m")
+            print(f"Path: {' -> '.join(tree.songs[index].name for index in tree.path_to(node))}")
+        print(f"Search took {end_time - start_time} seconds.")
+        return node
 
 
 
     
-    def breadth_first_search(self, node, song_input=None, first_call=True):
-        visited = [] #liste der besuchten Knoten
-        queue = [] #Warteschlange für die Knoten, die durchsucht werden sollen
-        ted = []  #Liste zur Speicherung der Tiefe jedes Knotens
-        index = 0 #Zähler der Indexsuche
-
-        
+    def breadth_first_search(self, tree=None, song_input=None, show_path=True, path_limit=20):
         print("\033[1m\033[32mBreadth First Search is started\033[0m")
+        #Falls kein Baum übergeben wurde, wird der zwischengespeicherte Suchbaum des Katalogs verwendet
+        if tree is None:
+            tree = self.get_search_tree()
+
         #Falls kein song_input übergeben wurde, fordert das Programm den Benutzer auf, einen Songnamen einzugeben
         if song_input is None:
             song_input = input("\033[92mProvide the name of the song you want to search for: \033[0m")
 
         #Song-Objekt basierend auf dem Namen gesucht
-        song = next((song for song in self.songs if song.name.lower() == song_input.lower()), None)
+        song = self.find_song(song_input)
         if not song:
             print(f"\033[103mWe could not find a song with the name: {song_input}.\033[0m")
             return -1
 
-        queue.append((node, 0))  #Startknoten und die Tiefe 0 wird zu Wartexhclange hinzugefügt
-
-        #solange die Wartechlange nicht leer ist:
-        while queue:
-            #Aktuelle Tiefe & Knoten aus Warteschlange holen
-            m, depth = queue.pop(0)
-            current_song = m['value']
-
-            #Tiefe in die Liste ted hinzufügen
-            ted.append((current_song.name, depth))
-            
-            #Wenn der gesuchte Song gefunden wurde
-            if current_song.name == song.name:
-                visited.append(current_song.name)  # Füge den gesuchten Song zuletzt zum Pfad hinzu
-                print(f"\033[103m\nSong '{current_song.name}' by {current_song.artist} - Album: {current_song.album}, Genre: {current_song.genre}, Duration: {current_song.duration} was found!\033[0m")
-                print(f"Path to song: {' -> '.join(visited)}")
-                print(f"Depth at which the song was found: {depth}")
-                print(f"Index in breadth-first search: {index}")
-                return 0
-
-            # Füge den aktuellen Knoten zum Pfad hinzu, wenn er nicht der gesuchte Song ist
-            visited.append(current_song.name)
-
-            #Füge die Nachbarn (linkes und rechtes Kind) zur Warteschlange hinzu, falls sie nicht besucht wurden
-            if m['left'] and m['left']['value'].name not in visited:
-                queue.append((m['left'], depth + 1))  # Füge das linke Kind mit erhöhter Tiefe hinzu
-
-            if m['right'] and m['right']['value'].name not in visited:
-                queue.append((m['right'], depth + 1))  # Füge das rechte Kind mit erhöhter Tiefe hinzu
-
-            #Erhöhe den Index
-            index += 1
-
-        #Song wurde nicht gefunden
-        print(f"\nWe could not find a song with the name: '{song.name}'")
-        return -1
-
+        node, comparisons = self.breadth_first_search_core(tree, song.name)
+        if node == -1:
+            print(f"\nWe could not find a song with the name: '{song.name}'")
+            return -1
 
+        current_song = tree.songs[node]
+        print(f"\033[103m\nSong '{current_song.name}' by {current_song.artist} - Album: {current_song.album}, Genre: {current_song.genre}, Duration: {current_song.duration} was found!\033[0m")
+        #Der Pfad (alle vorher besuchten Knoten) ist optional und wird auf path_limit Namen begrenzt
+        if show_path:
+            visited = self.breadth_first_order(tree, min(comparisons, path_limit))
+            path = ' -> '.join(tree.songs[index].name for index in visited)
+            if comparisons > path_limit:
+                path += f" -> ... ({comparisons - path_limit} more)"
+            print(f"Path to song: {path}")
+        print(f"Depth at which the song was found: {len(tree.path_to(node)) - 1}")
+        print(f"Index in breadth-first search: {comparisons - 1}")
+        return node
 
-    def jump_search(self, arr, song_input=None):
+    def breadth_first_order(self, tree, limit):
+        #Gibt die ersten limit Knoten in Besuchsreihenfolge der Breitensuche zurück
+        order = []
+        queue = collections.deque([tree.root] if tree.root != -1 else [])
+        while queue and len(order) < limit:
+            node = queue.popleft()
+            order.append(node)
+            if tree.left[node] != -1:
+                queue.append(tree.left[node])
+            if tree.right[node] != -1:
+                queue.append(tree.right[node])
+        return order
+
+    def breadth_first_positions(self, names, tree=None):
+        #Bestimmt für viele Songnamen in einem einzigen Durchlauf der Breitensuche die Position in Besuchsreihenfolge und die Tiefe
+        #Gibt ein Dictionary Name -> {"index", "position", "depth"} zurück (None, wenn der Name nicht im Baum vorkommt)
+        #Der Durchlauf endet, sobald alle gesuchten Namen gefunden wurden
+        if tree is None:
+            tree = self.get_search_tree()
+
+        #Eingaben werden über den Namensindex auf den exakten Songnamen aufgelöst
+        results = {}
+        wanted = {}
+        for name in names:
+            results[name] = None
+            song = self.find_song(name)
+            if song:
+                wanted.setdefault(song.name, []).append(name)
+
+        songs, left, right = tree.songs, tree.left, tree.right
+        queue = collections.deque([(tree.root, 0)] if tree.root != -1 else [])
+        position = 0
+        while queue and wanted:
+            node, depth = queue.popleft()
+            inputs = wanted.pop(songs[node].name, None)
+            if inputs:
+                for name in inputs:
+                    results[name] = {"index": node, "position": position, "depth": depth}
+            position += 1
+            if left[node] != -1:
+                queue.append((left[node], depth + 1))
+            if right[node] != -1:
+                queue.append((right[node], depth + 1))
+        return results
+
+
+
+    def depth_first_search_core(self, tree, name):
+        #Eigentlicher Algorithmus ohne Ausgabe: Tiefensuche (Pre-Order) mit eigenem Stack statt Rekursion
+        #Gibt (Knoten = Position in der sortierten Liste, Anzahl der Vergleiche) zurück; die Position in der Besuchsreihenfolge ist Vergleiche - 1
+        songs, left, right = tree.songs, tree.left, tree.right
+        stack = [tree.root] if tree.root != -1 else []
+        comparisons = 0
+        while stack:
+            node = stack.pop()
+            comparisons += 1
+            if songs[node].name == name:
+                return node, comparisons
+            #Rechts zuerst auf den Stack, damit links zuerst besucht wird
+            if right[node] != -1:
+                stack.append(right[node])
+            if left[node] != -1:
+                stack.append(left[node])
+        return -1, comparisons
+
+    def tree_descent_search_core(self, tree, name):
+        #Eigentlicher Algorithmus ohne Ausgabe: Abstieg im binären Suchbaum, bei jedem Knoten wird nur links oder rechts weitergesucht -> O(log n)
+        songs, left, right = tree.songs, tree.left, tree.right
+        node = tree.root
+        comparisons = 0
+        while node != -1:
+            comparisons += 1
+            node_name = songs[node].name
+            if name == node_name:
+                return node, comparisons
+            node = left[node] if name < node_name else right[node]
+        return -1, comparisons
+
+    def breadth_first_search_core(self, tree, name):
+        #Eigentlicher Algorithmus ohne Ausgabe: Breitensuche mit einer deque als Warteschlange (popleft in O(1))
+        #Besuchte Knoten werden in einem Set gemerkt (Prüfung in O(1) statt Suche in einer Liste)
+        #Gibt (Knoten = Position in der sortierten Liste, Anzahl der Vergleiche) zurück; die Position in der Besuchsreihenfolge ist Vergleiche - 1
+        songs, left, right = tree.songs, tree.left, tree.right
+        queue = collections.deque([tree.root] if tree.root != -1 else [])
+        visited = set()
+        comparisons = 0
+        while queue:
+            node = queue.popleft()
+            visited.add(node)
+            comparisons += 1
+            if songs[node].name == name:
+                return node, comparisons
+            for child in (left[node], right[node]):
+                if child != -1 and child not in visited:
+                    queue.append(child)
+        return -1, comparisons
+
+    def jump_search(self, arr=None, song_input=None):
         print("\033[1m\033[32mJump Search is started\033[0m")
+        #Falls kein Array übergeben wurde, wird die sortierte Sicht der Songs verwendet
+        if arr is None:
+            arr = self.get_sorted_songs()
 
         #Wenn kein Song_input übergeben wurde, muss der Nutzer selbst die EIngabe machen
         if song_input is None:
             song_input = input("\033[92mProvide the name of the song you want to search for: \033[0m")
 
-        song = next((song for song in arr if song.name.lower() == song_input.lower()), None)
+        song = self.find_song(song_input)
         if not song:
             print(f"\033[103mThe song with the name: '{song_input}' could not be found.\033[0m")
             return -1
 
+        index, comparisons = self.cached_search_core('jump', arr, song.name)
+        if index != -1:
+            print(f"\033[103mWe found a song with the name: '{song.name}' on index: {index}\033[0m")
+        else:
+            print(f"\033[103mWe could not find a song with the name: '{song.name}'\033[0m")
+        return index
+
+    def jump_search_core(self, arr, name):
+        #Eigentlicher Algorithmus ohne Ausgabe: gibt (Index, Anzahl der Vergleiche) zurück
         num_elements = len(arr)
+        if num_elements == 0:
+            return -1, 0
         #Berechnung der Sprunggröße basierend auf der Quadratwurzel der Anzahl der Elemente
-        step = int(math.sqrt(num_elements))
+        jump = int(math.sqrt(num_elements))
+        step = jump
         prev = 0 #Startpunkt
+        comparisons = 0
 
         #Sprungweise Suche nach dem Block, der den gesuchten Song enthalten könnte
-        while prev < num_elements and song.name > arr[min(step, num_elements) - 1].name:
+        while True:
+            comparisons += 1
+            if not name > arr[min(step, num_elements) - 1].name:
+                break
             prev = step
-            step += int(math.sqrt(num_elements))
+            step += jump
 
             #Wenn der Suchbereich außerhalb des Arrays liegt, abbrechen
             if prev >= num_elements:
-                print(f"\033[103mWe could not find a song with the name: '{song.name}'\033[0m")
-                return -1
+                return -1, comparisons
 
         #Lineare Suche im gefundenen Block durchführen
-        while prev < min(step, num_elements) and song.name >= arr[prev].name:
-            if arr[prev].name == song.name:
-                print(f"\033[103mWe found a song with the name: '{song.name}' on index: {prev}\033[0m")
-                return prev  # Erfolgreich gefunden
+        while prev < min(step, num_elements):
+            comparisons += 1
+            current_name = arr[prev].name
+            if current_name == name:
+                return prev, comparisons  # Erfolgreich gefunden
+            if current_name > name:
+                break
             prev += 1
 
         # Falls der Song nicht gefunden wurde
-        print(f"\033[103mWe could not find a song with the name: '{song.name}'\033[0m")
-        return -1
+        return -1, comparisons
 
             
         
-    def fibonacci_search(self, arr, song_input= None):
+    def fibonacci_search(self, arr=None, song_input=None):
         print("\033[1m\033[32mFibonacci Search is started\033[0m")
+        #Falls kein Array übergeben wurde, wird die sortierte Sicht der Songs verwendet
+        if arr is None:
+            arr = self.get_sorted_songs()
 
         #Falls kein song_input mitgegeben wurde, muss der Nutzer die Eingabe machen
         if song_input is None:
             song_input = input("\033[92mPlease provide the name of the song you want to search for: \033[0m")
 
-        song = next((song for song in arr if song.name.lower() == song_input.lower()), None)
+        song = self.find_song(song_input)
         if not song:
             print(f"\033[103mWe could not find a song with the name: '{song_input}'\033[0m")
             return -1
 
+        index, comparisons = self.cached_search_core('fibonacci', arr, song.name)
+        if index != -1:
+            print(f"\033[103mA song with the name: {song.name} was found at index: {index}.\033[0m")
+        else:
+            print(f"\033[103mWe could not find a song with the name: '{song.name}'\033[0m")
+        return index
+
+    def fibonacci_search_core(self, arr, name):
+        #Eigentlicher Algorithmus ohne Ausgabe: gibt (Index, Anzahl der Vergleiche) zurück
         num_elements = len(arr)
+        comparisons = 0
 
         # Initialisiere Fibonacci-Zahlen
         f0 = 0  
@@ -578,103 +3158,469 @@ class MusicApp:
         while f2 > 1:
             # Index des Elements berechnen, das verglichen werden soll
             index = min(offset + f0, num_elements - 1)
+            comparisons += 1
+            current_name = arr[index].name
 
             # Wenn das Element an `index` kleiner als das gesuchte Element ist: Suchgrenze nach rechts verschieben
-            if arr[index].name < song.name:
+            if current_name < name:
                 f2 = f1
                 f1 = f0
                 f0 = f2 - f1
                 offset = index
 
             # Wenn das Element an `index` größer als das gesuchte Element ist: Suchgrenze nach links verschieben
-            elif arr[index].name > song.name:
+            elif current_name > name:
                 f2 = f0
                 f1 = f1 - f0
                 f0 = f2 - f1
 
              #Wenn der Song gefunden wurde, gib den Index zurück
             else:
-                print(f"\033[103mA song with the name: {song.name} was found at index: {index}.\033[0m")
-                return index
+                return index, comparisons
 
         #Überprüfen, ob der Song an der letzten möglichen Position gefunden wird
-        if f1 and arr[offset + 1].name == song.name:
-            print(f"\033[103mA song with the name: '{song.name}' was found at index: {offset + 1}.\033[0m")
-            return offset + 1
+        if f1 and offset + 1 < num_elements:
+            comparisons += 1
+            if arr[offset + 1].name == name:
+                return offset + 1, comparisons
 
         # Wenn der Song nicht gefunden wurde
-        print(f"\033[103mWe could not find a song with the name: '{song.name}'\033[0m")
-        return -1
+        return -1, comparisons
 
 
 
-    def exponential_search(self, arr, song_input= None):
+    def exponential_search(self, arr=None, song_input=None):
         print("\033[1m\033[32mExponential Search is started\033[0m")
+        #Falls kein Array übergeben wurde, wird die sortierte Sicht der Songs verwendet
+        if arr is None:
+            arr = self.get_sorted_songs()
 
         if song_input is None:
             song_input = input("\033[92mPlease provide the name of the song you want to search for: \033[0m")
 
-        song = next((song for song in arr if song.name.lower() == song_input.lower()), None)
+        start_time = time.time()
+        song = self.find_song(song_input)
         if not song:
             print(f"\033[103mWe could not find a song with the name: '{song_input}'\033[0m")
             return -1
 
+        index, comparisons = self.cached_search_core('exponential', arr, song.name)
+        end_time = time.time()
+        if index != -1:
+            print(f"\033[103mA song with the name: {song.name} was found on index {index}.\033[0m")
+        else:
+            print(f"\033[103mWe could not find a song with the name: '{song.name}'\033[0m")
+        print(f"Search took {end_time - start_time} seconds.")
+        return index
+
+    def exponential_search_core(self, arr, name):
+        #Eigentlicher Algorithmus ohne Ausgabe: gibt (Index, Anzahl der Vergleiche) zurück
         num_elements = len(arr)
+        if num_elements == 0:
+            return -1, 0
         #Überprüfen, ob der gesuchte Song das erste Element im Array ist
-        if song.name == arr[0].name:
-            return 0
+        comparisons = 1
+        if name == arr[0].name:
+            return 0, comparisons
 
         #Exponentielle Suche nach der maximalen möglichen Position des gesuchten Elements 
         index = 1
         #Solange der Index innerhalb der Grenzen des Arrays liegt (index < num_elements) und der Name des gesuchten Songs alphabetisch größer oder gleich dem Song an der aktuellen Position (arr[index]) ist, wird der Index weiter exponentiell vergrößert (index verdoppelt).
-        while index < num_elements and song.name >= arr[index].name:
+        while index < num_elements:
+            comparisons += 1
+            if not name >= arr[index].name:
+                break
             index = index * 2
 
         #Anwendung der Binärsuche auf den gefundenen Bereich
-        return self.binary_search(arr, left=index // 2, right=min(index, num_elements - 1), song_input=song_input)
+        found, binary_comparisons = self.binary_search_core(arr, name, left=index // 2, right=min(index, num_elements - 1))
+        return found, comparisons + binary_comparisons
 
 
-    def test_sorting_algorithm(self, algorithm, arr):
-        print(f"\033[1m\033[32mTesting {algorithm.__name__}...\033[0m")
+    #Eingabeverteilungen für den Sortier-Benchmark
+    SORT_DISTRIBUTIONS = ('random', 'sorted', 'reversed', 'nearly_sorted', 'duplicates')
 
-        # Messen der Startzeit
-        start_time = time.time()
-        
-        # Ausführen des übergebenen Algorithmus
-        algorithm(arr)
-        
-        # Messen der Endzeit
-        end_time = time.time()
-        
-        # Berechnen der benötigten Zeit
-        elapsed_time = end_time - start_time
-        
-        # Ausgabe der Laufzeit
-        print(f"Sorting completed in {elapsed_time:.6f} seconds.")
-        
-        return elapsed_time
+    def sorting_benchmark_algorithms(self):
+        #Ordnet jedem Namen im Sortier-Benchmark die Sortierfunktion zu (alle geben eine sortierte Liste zurück)
+        return {
+            'quicksort': self.quicksort,
+            'bubble_sort': self.bubble_sort,
+            'merge_sort': self.merge_sort,
+            'block_sort': self.block_sort,
+            #Ohne Schwelle und mit mindestens zwei Prozessen, damit auch bei kleinen Größen der parallele Weg gemessen wird
+            'parallel': lambda arr: self.parallel_sort(arr, workers=max(2, os.cpu_count() or 1), min_parallel_size=0),
+            'builtin': sorted
+        }
+
+    def sorting_benchmark_input(self, distribution, size, rng):
+        #Erzeugt eine Eingabeliste mit size Songs in der gewünschten Verteilung
+        songs = self.benchmark_catalog(size, rng)
+        if distribution == 'duplicates':
+            #Nur etwa 1% verschiedene Namen -> sehr viele gleiche Schlüssel
+            pool = [song.name for song in songs[:max(1, size // 100)]]
+            songs = [Song(rng.choice(pool), song.artist, song.album, song.genre, song.duration_seconds, song.id) for song in songs]
+            rng.shuffle(songs)
+        elif distribution == 'random':
+            rng.shuffle(songs)
+        else:
+            songs.sort(key=lambda song: song.name)
+            if distribution == 'reversed':
+                songs.reverse()
+            elif distribution == 'nearly_sorted':
+                #Etwa 1% der Elemente werden paarweise vertauscht
+                for _ in range(max(1, size // 100)):
+                    first, second = rng.randrange(size), rng.randrange(size)
+                    songs[first], songs[second] = songs[second], songs[first]
+        return songs
+
+    def measure_sort(self, algorithm, base, repeat):
+        #Misst repeat Durchläufe, jeder Durchlauf sortiert eine eigene Kopie der Eingabe
+        #Die Ausgaben der Sortieralgorithmen werden dabei unterdrückt
+        timings = []
+        result = base
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(repeat):
+                    arr = list(base)
+                    start = time.perf_counter_ns()
+                    result = algorithm(arr)
+                    timings.append(time.perf_counter_ns() - start)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        timings.sort()
+
+        #Vergleiche zählen: ein zusätzlicher Durchlauf mit CountingSong-Kopien (nicht in der Zeitmessung enthalten)
+        counted = [CountingSong(song.name, song.artist, song.album, song.genre, song.duration_seconds, song.id) for song in base]
+        CountingSong.comparisons = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            algorithm(counted)
+        comparisons = CountingSong.comparisons
+
+        #Speicherspitze: ein weiterer Durchlauf unter tracemalloc
+        import tracemalloc
+        arr = list(base)
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                algorithm(arr)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        names = [song.name for song in result]
+        return {
+            "repeat": repeat,
+            "min_ms": timings[0] / 1e6,
+            "median_ms": self.percentile(timings, 50) / 1e6,
+            "mean_ms": sum(timings) / len(timings) / 1e6,
+            "comparisons": comparisons,
+            "peak_memory_bytes": peak,
+            "correct": len(result) == len(base) and all(names[i] <= names[i + 1] for i in range(len(names) - 1))
+        }
+
+    def benchmark_sorting_algorithms(self, algorithms=None, sizes=(1000, 10000), distributions=None, repeat=5,
+                                     quadratic_limit=5000, seed=42, output_file='sort_benchmark.json'):
+        #Benchmark für die Sortieralgorithmen über mehrere Größen und Eingabeverteilungen
+        #Der Katalog selbst wird dabei nie verändert, jeder Algorithmus bekommt eigene Kopien
+        #Bubble Sort ist quadratisch und wird nur bis quadratic_limit Songs gemessen
+        available = self.sorting_benchmark_algorithms()
+        if algorithms is None:
+            algorithms = tuple(available)
+        if distributions is None:
+            distributions = self.SORT_DISTRIBUTIONS
+        rng = random.Random(seed)
+        results = []
+
+        print(f"{'algorithm':<12} {'input':<14} {'size':>9} {'median ms':>12} {'min ms':>12} {'comparisons':>13} {'peak KiB':>10}")
+        for size in sizes:
+            for distribution in distributions:
+                base = self.sorting_benchmark_input(distribution, size, rng)
+                for algorithm in algorithms:
+                    entry = {"algorithm": algorithm, "input": distribution, "size": size}
+                    if algorithm == 'bubble_sort' and size > quadratic_limit:
+                        results.append(dict(entry, skipped=True))
+                        print(f"{algorithm:<12} {distribution:<14} {size:>9} {'skipped':>12}")
+                        continue
+                    result = self.measure_sort(available[algorithm], base, repeat)
+                    results.append(dict(entry, **result))
+                    print(f"{algorithm:<12} {distribution:<14} {size:>9} {result['median_ms']:>12.3f} {result['min_ms']:>12.3f} "
+                          f"{result['comparisons']:>13} {result['peak_memory_bytes'] / 1024:>10.1f}"
+                          + ("" if result['correct'] else "  NOT SORTED"))
+
+        report = {
+            "benchmark": "sort",
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "seed": seed,
+            "results": results
+        }
+        if 'parallel' in algorithms:
+            #CountingSong erreicht die Prozesse nicht (dort werden nur Namen verglichen), gezählt wird daher nichts
+            note = "parallel: comparisons happen in the worker processes on plain names and are not counted (reported as 0)"
+            report["notes"] = [note]
+            print(note)
+        if output_file:
+            with open(output_file, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Results were saved to {output_file}.")
+        return report
     
+    #Speicherarten im Storage-Benchmark: Name -> (storage_mode, snapshot_format, Dateiname)
+    STORAGE_BENCHMARK_MODES = {
+        'json': ('snapshot', 'json', 'catalog.json'),
+        'binary': ('snapshot', 'binary', 'catalog.bin'),
+        'journal': ('journal', 'json', 'catalog.json'),
+        'sqlite': ('sqlite', None, 'catalog.db')
+    }
+
+    def benchmark_storage(self, modes=None, sizes=(10000, 100000), lookups=1000, inserts=50, snapshot_inserts=3, seed=42,
+                          output_file='storage_benchmark.json'):
+        #Vergleicht die Speicherarten (JSON-Snapshot, Binär-Snapshot, Journal, SQLite) bei gleichem Katalog:
+        #  write_ms: kompletten Katalog speichern, load_ms: MusicApp aus der Datei starten,
+        #  lookup_us: Suche nach einem Namen über find_songs (im Speicher über den Namensindex, bei SQLite als indizierte Abfrage,
+        #  die nur die Treffer lädt; load_ms enthält dort nur die Song-IDs und Playlist-Einträge),
+        #  insert_ms: ein Song hinzufügen und dauerhaft speichern
+        #Bei den Snapshot-Arten schreibt jedes Speichern die ganze Datei, daher werden dort nur snapshot_inserts Einfügungen gemessen
+        import tempfile
+        if modes is None:
+            modes = tuple(self.STORAGE_BENCHMARK_MODES)
+        rng = random.Random(seed)
+        results = []
+
+        print(f"{'storage':<8} {'size':>9} {'write ms':>10} {'load ms':>10} {'lookup us':>10} {'insert ms':>10} {'file KiB':>10}")
+        for size in sizes:
+            songs = self.generate_random_songs(size, rng)
+            names = [song.name for song in rng.sample(songs, min(lookups, size))]
+            for mode in modes:
+                storage_mode, snapshot_format, file_name = self.STORAGE_BENCHMARK_MODES[mode]
+                with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+                    path = os.path.join(directory, file_name)
+                    app = MusicApp(path, storage_mode, initial_songs=0, snapshot_format=snapshot_format)
+                    app.songs = [Song(song.name, song.artist, song.album, song.genre, song.duration_seconds) for song in songs]
+                    app.rebuild_indexes()
+
+                    start = time.perf_counter_ns()
+                    if app.store is not None:
+                        app.store.import_catalog(app.songs, app.playlists, app.next_song_id)
+                    app.save_data(compact=True)
+                    write_ms = (time.perf_counter_ns() - start) / 1e6
+                    if app.store is not None:
+                        app.store.close()
+
+                    start = time.perf_counter_ns()
+                    app = MusicApp(path, storage_mode, initial_songs=0, snapshot_format=snapshot_format)
+                    load_ms = (time.perf_counter_ns() - start) / 1e6
+
+                    start = time.perf_counter_ns()
+                    for name in names:
+                        app.find_songs(name)
+                    lookup_us = (time.perf_counter_ns() - start) / 1e3 / len(names)
+
+                    count = inserts if storage_mode != 'snapshot' else snapshot_inserts
+                    start = time.perf_counter_ns()
+                    for index in range(count):
+                        app.insert_song(Song(f"Benchmark {index}", "Benchmark", "Benchmark", "Benchmark", 180))
+                        app.save_data()
+                    insert_ms = (time.perf_counter_ns() - start) / 1e6 / count
+
+                    file_bytes = sum(os.path.getsize(os.path.join(directory, entry)) for entry in os.listdir(directory))
+                    if app.store is not None:
+                        app.store.close()
+
+                result = {"storage": mode, "size": size, "write_ms": round(write_ms, 3), "load_ms": round(load_ms, 3),
+                          "lookup_us": round(lookup_us, 3), "insert_ms": round(insert_ms, 3), "inserts": count, "file_bytes": file_bytes}
+                results.append(result)
+                print(f"{mode:<8} {size:>9} {write_ms:>10.1f} {load_ms:>10.1f} {lookup_us:>10.2f} {insert_ms:>10.3f} {file_bytes / 1024:>10.1f}")
+
+        report = {
+            "benchmark": "storage",
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "seed": seed,
+            "results": results
+        }
+        if output_file:
+            with open(output_file, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Results were saved to {output_file}.")
+        return report
+
+    def benchmark_concurrency(self, readers=(1, 2, 4, 8), sizes=(100000,), duration=2.0, io_ms=(0, 0.5), write_interval_ms=1.0,
+                              sort_interval=0.5, save_interval=1.0, seed=42, output_file='concurrency_benchmark.json'):
+        #Stresstest für den ConcurrentCatalog: readers Threads suchen Namen (Namensindex und Binärsuche in der sortierten Sicht),
+        #gleichzeitig fügt ein Schreiber Songs hinzu, löscht sie wieder und sortiert und speichert den Katalog regelmäßig
+        #Verglichen wird mit einer einzigen Sperre um die MusicApp ('mutex'), unter der auch Sortieren und Speichern laufen
+        #Jeder Lauf wird für jeden Wert in io_ms wiederholt: 0 misst die reine Suche, andere Werte simulieren pro Suche eine blockierende Ausgabe
+        #ohne Sperre (z.B. die Antwort an einen Client); reine Python-Rechenarbeit skaliert wegen des GIL kaum mit der Zahl der Threads,
+        #solche Wartezeiten überlappen dagegen
+        #Jede Suche prüft ihr Ergebnis (Namensindex, ID-Index und sortierte Sicht müssen denselben Stand zeigen), Abweichungen zählen als errors
+        #'write ms' ist die Dauer einer Änderung (Hinzufügen bzw. Löschen) selbst; ohne io_ms bestimmt vor allem der GIL, wie oft der Schreiber
+        #nach seiner Pause wieder drankommt, nicht die Sperre
+        import tempfile
+        rng = random.Random(seed)
+        results = []
+
+        print(f"{'mode':<9} {'size':>8} {'io ms':>6} {'readers':>8} {'reads/s':>10} {'p50 us':>9} {'p99 us':>9} {'max ms':>9} {'writes':>8} {'write ms':>9} {'sorts':>6} {'saves':>6} {'errors':>7}")
+        for size in sizes:
+            songs = self.generate_random_songs(size, rng)
+            names = [song.name for song in rng.sample(songs, min(1000, size))]
+            for io_wait, mode, reader_count in itertools.product(io_ms, ('snapshot', 'mutex'), readers):
+                with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+                    app = MusicApp(os.path.join(directory, 'stress.json'), 'journal', initial_songs=0)
+                    app.songs = [Song(song.name, song.artist, song.album, song.genre, song.duration_seconds) for song in songs]
+                    app.rebuild_indexes()
+                    app.save_data(compact=True)
+                    app.get_sorted_songs()
+                    catalog = ConcurrentCatalog(app) if mode == 'snapshot' else None
+                    mutex = threading.Lock()
+                    stop = threading.Event()
+                    latencies = [[] for _ in range(reader_count)]
+                    errors = [0] * reader_count
+                    counts = {"writes": 0, "sorts": 0, "saves": 0}
+                    write_latencies = []
+
+                    def read(worker):
+                        worker_rng = random.Random(seed + worker)
+                        worker_latencies = latencies[worker]
+                        while not stop.is_set():
+                            name = worker_rng.choice(names)
+                            start = time.perf_counter_ns()
+                            if catalog is not None:
+                                snapshot = catalog.snapshot()
+                                found = snapshot.find_songs(name)
+                                songs_by_id = snapshot.songs_by_id
+                                index, _ = self.binary_search_core(snapshot.get_sorted_songs(), name)
+                            else:
+                                with mutex:
+                                    found = app.find_songs(name)
+                                    songs_by_id = app.songs_by_id
+                                    index, _ = self.binary_search_core(app.get_sorted_songs(), name)
+                                    consistent = all(songs_by_id.get(song.id) is song for song in found) and (index >= 0) == bool(found)
+                            worker_latencies.append(time.perf_counter_ns() - start)
+                            if catalog is not None:
+                                consistent = all(songs_by_id.get(song.id) is song for song in found) and (index >= 0) == bool(found)
+                            if not consistent:
+                                errors[worker] += 1
+                            if io_wait:
+                                time.sleep(io_wait / 1000)
+
+                    def write():
+                        write_rng = random.Random(seed)
+                        added = collections.deque()
+                        next_sort = time.monotonic() + sort_interval
+                        next_save = time.monotonic() + save_interval
+                        while not stop.is_set():
+                            #Neue Songs tragen Namen aus der Suchliste, damit die Leser auch gerade veränderte Einträge treffen
+                            song = Song(write_rng.choice(names), "Stress", "Stress", "Stress", write_rng.randint(120, 359))
+                            start = time.perf_counter_ns()
+                            if catalog is not None:
+                                catalog.add_song(song)
+                            else:
+                                with mutex:
+                                    app.insert_song(song)
+                            added.append(song)
+                            if len(added) > 100:
+                                song = added.popleft()
+                                if catalog is not None:
+                                    catalog.delete_song(song)
+                                else:
+                                    with mutex:
+                                        app.remove_song(song)
+                            write_latencies.append(time.perf_counter_ns() - start)
+                            counts["writes"] += 1
+                            if time.monotonic() >= next_sort:
+                                #Abwechselnd nach mehreren Feldern (eigene Sortier-Engine) und nach Namen (Timsort)
+                                spec = 'artist,-duration' if counts["sorts"] % 2 == 0 else 'name'
+                                if catalog is not None:
+                                    catalog.sort(spec=spec)
+                                else:
+                                    with mutex:
+                                        app.sort_by_keys(app.songs, spec)
+                                        app.invalidate_song_order()
+                                counts["sorts"] += 1
+                                next_sort = time.monotonic() + sort_interval
+                            if time.monotonic() >= next_save:
+                                if catalog is not None:
+                                    catalog.save(compact=True)
+                                else:
+                                    with mutex:
+                                        app.save_data(compact=True)
+                                counts["saves"] += 1
+                                next_save = time.monotonic() + save_interval
+                            if write_interval_ms:
+                                time.sleep(write_interval_ms / 1000)
+
+                    threads = [threading.Thread(target=read, args=(worker,)) for worker in range(reader_count)]
+                    threads.append(threading.Thread(target=write))
+                    for thread in threads:
+                        thread.start()
+                    time.sleep(duration)
+                    stop.set()
+                    for thread in threads:
+                        thread.join()
+
+                timings = sorted(itertools.chain.from_iterable(latencies))
+                result = {"mode": mode, "size": size, "io_ms": io_wait, "readers": reader_count, "reads": len(timings),
+                          "reads_per_s": round(len(timings) / duration, 1),
+                          "p50_us": round(self.percentile(timings, 50) / 1e3, 1), "p99_us": round(self.percentile(timings, 99) / 1e3, 1),
+                          "max_ms": round(timings[-1] / 1e6, 3), "writes": counts["writes"],
+                          "write_p99_ms": round(self.percentile(sorted(write_latencies), 99) / 1e6, 3), "sorts": counts["sorts"],
+                          "saves": counts["saves"], "errors": sum(errors)}
+                results.append(result)
+                print(f"{mode:<9} {size:>8} {io_wait:>6} {reader_count:>8} {result['reads_per_s']:>10.0f} {result['p50_us']:>9.1f} {result['p99_us']:>9.1f} "
+                      f"{result['max_ms']:>9.2f} {result['writes']:>8} {result['write_p99_ms']:>9.2f} {result['sorts']:>6} {result['saves']:>6} {result['errors']:>7}")
+
+        report = {
+            "benchmark": "concurrency",
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            #Mit GIL läuft immer nur ein Thread Python-Code; ohne GIL (free-threaded Build) skalieren auch die Suchen selbst
+            "gil_enabled": getattr(sys, '_is_gil_enabled', lambda: True)(),
+            "cpu_count": os.cpu_count(),
+            "duration_s": duration,
+            "io_ms": io_ms,
+            "seed": seed,
+            "results": results
+        }
+        if output_file:
+            with open(output_file, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Results were saved to {output_file}.")
+        return report
+
     def sorting_algorithms_to_test(self):
         # Auswahl der Sortieralgorithmen
         print('1. Test Quicksort')
         print('2. Test Bubble sort')
         print('3. Test Merge Sort')
         print('4. Test Block Sort')
+        print('5. Test Parallel Sort')
+        print('6. Test builtin sort')
+        print('7. Test all sorting algorithms')
         
         option = input("Choose the algorithm by number: ")
         
-        if option == '1':
-            elapsed_time = self.test_sorting_algorithm(self.quicksort, self.songs)
-        elif option == '2':
-            elapsed_time = self.test_sorting_algorithm(self.bubble_sort, self.songs)
-        elif option == '3':
-            elapsed_time = self.test_sorting_algorithm(self.merge_sort, self.songs)
-        elif option == '4':
-            elapsed_time = self.test_sorting_algorithm(self.block_sort, self.songs)
+        names = ('quicksort', 'bubble_sort', 'merge_sort', 'block_sort', 'parallel', 'builtin')
+        if option in ('1', '2', '3', '4', '5', '6'):
+            algorithms = (names[int(option) - 1],)
+        elif option == '7':
+            algorithms = names
         else:
             print("Invalid option selected.")
             return
 
+        sizes_input = input("Input sizes to test, comma separated (empty: current catalog size): ")
+        try:
+            sizes = [int(size) for size in sizes_input.replace(' ', '').split(',') if size] or [len(self.songs)]
+        except ValueError:
+            print("Invalid input sizes.")
+            return
+
+        self.benchmark_sorting_algorithms(algorithms, sizes)
+
 
 
     def sort_songs_with_algorithms(self):
@@ -683,6 +3629,8 @@ class MusicApp:
         print('2. Bubble sort')
         print('3. Merge Sort')
         print('4. Block Sort')
+        print('5. Sort by multiple fields (e.g. artist, album, -duration)')
+        print('6. Parallel Sort (multiple processor cores)')
         option = input("Choose your algorithm by number: ")
 
         if option == '1':
@@ -693,6 +3641,16 @@ class MusicApp:
             self.songs = self.merge_sort(self.songs)
         elif option=='4':
             self.songs = self.block_sort(self.songs)
+        elif option == '5':
+            spec_input = input("Sort order, comma separated, '-' for descending (fields: name, artist, album, genre, duration, id): ")
+            try:
+                self.sort_by_keys(self.songs, spec_input)
+            except ValueError as error:
+                print(f"\033[103m{error}\033[0m")
+                return
+        elif option == '6':
+            self.songs = self.parallel_sort(self.songs)
+        self.invalidate_song_order()
 
         print(f"\033[33m{self.display_all_songs()}\033[0m")
 
@@ -729,6 +3687,113 @@ class MusicApp:
 
 
 
+    #Felder, nach denen die Sortier-Engine sortieren kann, und das zugehörige Song-Attribut
+    SORT_FIELDS = {'name': 'name', 'artist': 'artist', 'album': 'album', 'genre': 'genre', 'duration': 'duration_seconds', 'id': 'id'}
+
+    #Textfelder, die beim Sortieren optional ohne Beachtung der Groß- und Kleinschreibung verglichen werden
+    TEXT_SORT_FIELDS = ('name', 'artist', 'album', 'genre')
+
+    def parse_sort_spec(self, text):
+        #Wandelt eine Sortierreihenfolge wie "artist,album,-duration" in [('artist', False), ('album', False), ('duration', True)] um
+        #Ein vorangestelltes "-" bedeutet absteigend
+        spec = []
+        for part in text.replace(' ', '').split(','):
+            if not part:
+                continue
+            descending = part.startswith('-')
+            field = part.lstrip('+-').lower()
+            if field not in self.SORT_FIELDS:
+                raise ValueError(f"Unknown sort field: {field}")
+            spec.append((field, descending))
+        if not spec:
+            raise ValueError("The sort order is empty.")
+        return spec
+
+    def sort_by_keys(self, arr, spec, casefold=True):
+        #Sortier-Engine: sortiert arr in place nach mehreren Feldern, jedes Feld auf- oder absteigend
+        #1. Die Schlüssel werden einmalig berechnet (Decorate): pro Feld der Rang jedes Wertes, alle Ränge werden zu einer einzigen ganzen Zahl zusammengesetzt
+        #   Die ursprüngliche Position ist die letzte Stelle des Schlüssels -> alle Schlüssel sind verschieden und die Sortierung ist stabil
+        #2. Die Schlüssel werden mit einem iterativen In-Place-Quicksort sortiert (Sort)
+        #3. arr wird anhand der sortierten Schlüssel umgeordnet (Undecorate)
+        if isinstance(spec, str):
+            spec = self.parse_sort_spec(spec)
+        num_elements = len(arr)
+        if num_elements < 2:
+            return arr
+
+        keys = [0] * num_elements
+        for field, descending in spec:
+            attribute = self.SORT_FIELDS[field]
+            values = [getattr(song, attribute) for song in arr]
+            if casefold and field in self.TEXT_SORT_FIELDS:
+                values = [value.casefold() for value in values]
+            #Rang jedes Wertes unter den verschiedenen Werten dieses Feldes (absteigend = Rang von hinten gezählt)
+            distinct = sorted(set(values))
+            radix = len(distinct)
+            if descending:
+                ranks = {value: radix - 1 - rank for rank, value in enumerate(distinct)}
+            else:
+                ranks = {value: rank for rank, value in enumerate(distinct)}
+            for index, value in enumerate(values):
+                keys[index] = keys[index] * radix + ranks[value]
+
+        for index in range(num_elements):
+            keys[index] = keys[index] * num_elements + index
+
+        self.quicksort_in_place(keys)
+
+        original = list(arr)
+        arr[:] = [original[key % num_elements] for key in keys]
+        return arr
+
+    def quicksort_in_place(self, arr):
+        #Iterativer Quicksort, der arr direkt umordnet (keine Teillisten pro Rekursionsebene)
+        #Pivot per Median-of-Three, eine einzige Partitionierung pro Bereich, kleine Bereiche werden mit Insertion Sort sortiert
+        #Der größere Teilbereich kommt auf den Stack, der kleinere wird sofort bearbeitet -> Stack-Tiefe höchstens O(log n)
+        stack = [(0, len(arr) - 1)]
+        while stack:
+            low, high = stack.pop()
+            while high - low > 16:
+                mid = (low + high) // 2
+                if arr[mid] < arr[low]:
+                    arr[mid], arr[low] = arr[low], arr[mid]
+                if arr[high] < arr[low]:
+                    arr[high], arr[low] = arr[low], arr[high]
+                if arr[high] < arr[mid]:
+                    arr[high], arr[mid] = arr[mid], arr[high]
+                pivot = arr[mid]
+
+                #Hoare-Partitionierung: links landen alle Elemente <= Pivot, rechts alle >= Pivot
+                left, right = low, high
+                while left <= right:
+                    while arr[left] < pivot:
+                        left += 1
+                    while pivot < arr[right]:
+                        right -= 1
+                    if left <= right:
+                        arr[left], arr[right] = arr[right], arr[left]
+                        left += 1
+                        right -= 1
+
+                if right - low < high - left:
+                    stack.append((left, high))
+                    high = right
+                else:
+                    stack.append((low, right))
+                    low = left
+
+            #Insertion Sort für den verbleibenden kleinen Bereich
+            for index in range(low + 1, high + 1):
+                value = arr[index]
+                position = index - 1
+                while position >= low and value < arr[position]:
+                    arr[position + 1] = arr[position]
+                    position -= 1
+                arr[position + 1] = value
+        return arr
+
+
+
     def bubble_sort(self, arr):
         print("\033[94mBubble Sort is started\033[0m")
         
@@ -811,11 +3876,13 @@ class MusicApp:
         return block_size
         
 
-    def block_sort(self, arr):
+    def block_sort(self, arr, block_size=None):
         print("\033[94mBlock Sort is started\033[0m")
         
-        #Berechnung der Block Größen
-        block_size = self.calculate_block_size(len(arr))
+        #Berechnung der Block Größen (falls keine eigene Blockgröße übergeben wurde)
+        if block_size is None:
+            block_size = self.calculate_block_size(len(arr))
+        block_size = max(1, block_size)
 
         #Liste, um die Blöcke zu speichern, die wir nach und nach sortieren werden
         blocks = []
@@ -830,20 +3897,31 @@ class MusicApp:
         #Ergebnisliste, die die vollständig sortierten Elemente enthalten wird
         result = []
 
-        #Hauptschleife: Solange noch Blöcke übrig sind, wird das kleinste Element (min Heap) aus den Blöcken entnommen und zum Ergebnis hinzugefügt
-        while blocks:
-            #Findet den Block, der das kleinste erste Element enthält
-            min_index = 0
-            for index in range(1, len(blocks)): #Vergleicht das erste Element jedes Blocks
-                if blocks[index][0] < blocks[min_index][0]:
-                    min_index = index #Speichert den Index des Blocks mit dem kleinsten Element
+        #Für jeden Block merkt sich ein Cursor die Position des nächsten noch nicht übernommenen Elements (statt pop(0), das den ganzen Block verschiebt)
+        cursors = [0] * len(blocks)
+
+        #Min-Heap mit dem aktuellen Kopf jedes Blocks; verglichen werden die Songs selbst (siehe BlockHead)
+        heap = [BlockHead(block[0], block_index) for block_index, block in enumerate(blocks)]
+        heapq.heapify(heap)
+
+        #Hauptschleife: Solange der Heap nicht leer ist, wird das kleinste Element entnommen und zum Ergebnis hinzugefügt -> O(n log k) bei k Blöcken
+        while heap:
+            head = heap[0]
+            block_index = head.block_index
+            block = blocks[block_index]
+            cursor = cursors[block_index]
 
             #Fügt das kleinste Element aus dem entsprechenden Block zur Ergebnisliste (Output Array) hinzu
-            result.append(blocks[min_index].pop(0))
-    
-            #Wenn ein Block leer ist, entfernt man ihn vollständig aus der Liste der Blöcke
-            if len(blocks[min_index]) == 0:
-                blocks.pop(min_index)
+            result.append(block[cursor])
+            cursor += 1
+            cursors[block_index] = cursor
+
+            #Der nächste Kopf des Blocks ersetzt den alten im Heap, ist der Block leer, wird er aus dem Heap entfernt
+            if cursor < len(block):
+                head.song = block[cursor]
+                heapq.heapreplace(heap, head)
+            else:
+                heapq.heappop(heap)
 
         print("Songs were successfully sorted")
 
@@ -853,14 +3931,51 @@ class MusicApp:
 
 
 
+
+    def get_sort_pool(self, workers=None):
+        #Prozess-Pool für die parallele Sortierung; er wird beim ersten Aufruf gestartet und danach wiederverwendet
+        import concurrent.futures
+        workers = workers or os.cpu_count() or 1
+        if self.sort_pool is None or self.sort_pool_workers != workers:
+            if self.sort_pool is not None:
+                self.sort_pool.shutdown()
+            self.sort_pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+            self.sort_pool_workers = workers
+        return self.sort_pool
+
+    def parallel_sort(self, arr, workers=None, min_parallel_size=100000):
+        print("\033[94mParallel Sort is started\033[0m")
+        #Sortiert nach Namen auf mehreren Prozessorkernen und gibt eine neue sortierte Liste zurück (stabil wie sorted)
+        #An die Prozesse gehen nur die Namen (die Schlüsselspalte), nicht die Song-Objekte; jeder Prozess sortiert einen Block
+        #und gibt nur die sortierten Positionen zurück; die Blöcke werden mit einem k-Wege-Mischen (heapq.merge) in O(n log k) zusammengeführt
+        #Gleiche Namen werden über die Position entschieden, dadurch bleibt die Sortierung stabil
+        #Bei kleinen Listen kostet das Verteilen mehr als es bringt, dann wird direkt sortiert
+        workers = workers or os.cpu_count() or 1
+        if len(arr) < min_parallel_size or workers < 2:
+            result = sorted(arr, key=operator.attrgetter('name'))
+            print("Songs were successfully sorted")
+            return result
+
+        names = [song.name for song in arr]
+        chunk_size = math.ceil(len(names) / workers)
+        pool = self.get_sort_pool(workers)
+        futures = [pool.submit(sort_name_chunk, start, names[start:start + chunk_size]) for start in range(0, len(names), chunk_size)]
+
+        #Die Paare (Name, Position) entstehen erst beim Mischen (zip/map laufen in C, keine Zwischenlisten)
+        runs = [zip(map(names.__getitem__, positions), positions) for positions in (future.result() for future in futures)]
+        result = list(map(arr.__getitem__, map(operator.itemgetter(1), heapq.merge(*runs))))
+
+        print("Songs were successfully sorted")
+        return result
+
     def delete_song(self):
         song_input= input("Provide the song name you want to delete: ")
 
 
-        song_to_delete = next((song for song in self.songs if song.name.lower() == song_input.lower()), None)
+        song_to_delete = self.find_song(song_input)
         #Prüfen ob Song name in Liste vorkommt
         if song_to_delete:
-            self.songs.remove(song_to_delete)
+            self.remove_song(song_to_delete)
             print(f"Song '{song_to_delete.name}' by {song_to_delete.artist} has been deleted.")
         else:
             print(f"No song named '{song_input}' found in the list.")
@@ -897,8 +4012,10 @@ class MusicApp:
             print("8. Delete Song")
             print("9. Test the Runtime of the searching-algorithms")
             print("10. Test the Runtime of the sorting-algorithms")
-            print("11. Save")
-            print("12. Exit")
+            print("11. Import Playlist (CSV/M3U)")
+            print("12. Export Playlist (CSV/M3U)")
+            print("13. Save")
+            print("14. Exit")
 
             choice = input("Enter your choice: ")
 
@@ -924,8 +4041,13 @@ class MusicApp:
             elif choice == '10':
                 self.sorting_algorithms_to_test()
             elif choice == '11':
-                self.save_data()
+                if self.import_playlist_from_file() == 0:
+                    self.save_data()
             elif choice == '12':
+                self.export_playlist_to_file()
+            elif choice == '13':
+                self.save_data(compact=True)
+            elif choice == '14':
                 self.save_data()
                 print("Exiting the app.")
                 break
@@ -933,6 +4055,259 @@ class MusicApp:
                 print("Invalid choice. Please try again.")
 
 
+def parse_sizes(text):
+    #Wandelt "1000,10000" in eine Liste von Zahlen um (für --sizes)
+    return [int(size) for size in text.replace(' ', '').split(',') if size]
+
+
+def build_parser():
+    #Kommandozeile: ohne Unterbefehl startet das interaktive Menü, mit Unterbefehl wird genau eine Aktion ausgeführt
+    import argparse
+    parser = argparse.ArgumentParser(description="Music App: manage, search and sort a song catalog.")
+    parser.add_argument('--data', default='music_data.json', help="data file (default: music_data.json)")
+    parser.add_argument('--storage', choices=('snapshot', 'journal', 'sqlite'), default='snapshot', help="storage mode (default: snapshot)")
+    parser.add_argument('--timing', action='store_true', help="print load and command times to stderr")
+    commands = parser.add_subparsers(dest='command')
+
+    search = commands.add_parser('search', help="search songs by name and/or artist, album, genre and duration")
+    search.add_argument('name', nargs='?', help="song name (exact, case-insensitive)")
+    mode = search.add_mutually_exclusive_group()
+    mode.add_argument('--prefix', action='store_true', help="treat NAME as a prefix")
+    mode.add_argument('--fuzzy', action='store_true', help="allow typos in NAME")
+    search.add_argument('--artist')
+    search.add_argument('--album')
+    search.add_argument('--genre')
+    search.add_argument('--min-duration', help="M:SS or seconds")
+    search.add_argument('--max-duration', help="M:SS or seconds")
+    search.add_argument('--limit', type=int, default=20, help="maximum number of results (default: 20, 0 = no limit)")
+    search.add_argument('--json', action='store_true', help="print one JSON object per line")
+
+    sort = commands.add_parser('sort', help="sort the catalog and print it")
+    order = sort.add_mutually_exclusive_group()
+    order.add_argument('--by', help="sort order, e.g. 'artist,album,-duration'")
+    order.add_argument('--algorithm', choices=('quicksort', 'merge_sort', 'block_sort', 'parallel'), help="sort by name with this algorithm")
+    sort.add_argument('--limit', type=int, default=0, help="print only the first N songs (default: all)")
+    sort.add_argument('--save', action='store_true', help="store the new order in the data file")
+    sort.add_argument('--json', action='store_true', help="print one JSON object per line")
+
+    import_command = commands.add_parser('import', help="import a playlist from a CSV or M3U file")
+    import_command.add_argument('file')
+    import_command.add_argument('--playlist', help="playlist name (default: file name)")
+    import_command.add_argument('--format', choices=('csv', 'm3u'), help="file format (default: from the file extension)")
+
+    export = commands.add_parser('export', help="export a playlist to a CSV or M3U file")
+    export.add_argument('playlist')
+    export.add_argument('file')
+    export.add_argument('--format', choices=('csv', 'm3u'), help="file format (default: from the file extension)")
+
+    bench = commands.add_parser('bench', help="run the search, sort, storage, startup or concurrency benchmark")
+    bench.add_argument('kind', choices=('search', 'sort', 'storage', 'startup', 'concurrency'))
+    bench.add_argument('--sizes', type=parse_sizes, help="comma separated catalog sizes")
+    bench.add_argument('--runs', type=int, default=10, help="process starts for the startup benchmark (default: 10)")
+    bench.add_argument('--readers', type=parse_sizes, default=[1, 2, 4, 8], help="comma separated reader thread counts (default: 1,2,4,8)")
+    bench.add_argument('--duration', type=float, default=2.0, help="seconds per concurrency run (default: 2)")
+    bench.add_argument('--io-ms', type=lambda text: [float(value) for value in text.replace(' ', '').split(',') if value], default=[0, 0.5],
+                       help="comma separated simulated blocking I/O per read in the concurrency benchmark (default: 0,0.5)")
+    bench.add_argument('--output', help="result file (default: <kind>_benchmark.json)")
+
+    convert = commands.add_parser('convert', help="write the catalog to another file as JSON or binary snapshot")
+    convert.add_argument('file')
+    convert.add_argument('--format', choices=('json', 'binary'), help="snapshot format (default: binary for .bin files, otherwise json)")
+
+    serve = commands.add_parser('serve', help="serve search and playlist operations as an HTTP/JSON service")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--workers', type=int, help="threads for catalog-wide operations (default: up to 4)")
+
+    stats = commands.add_parser('stats', help="print catalog statistics")
+    stats.add_argument('--json', action='store_true')
+
+    generate = commands.add_parser('generate', help="replace the catalog with a generated one")
+    generate.add_argument('count', type=int)
+    generate.add_argument('--seed', type=int)
+    generate.add_argument('--artists', type=int, default=5000)
+    generate.add_argument('--genres', type=int, default=40)
+    generate.add_argument('--duplicate-rate', type=float, default=0.01)
+    return parser
+
+
+def print_songs(songs, as_json, limit=0):
+    #Gibt Songs auf stdout aus (als Text oder als eine JSON-Zeile pro Song) und liefert die Anzahl zurück
+    count = 0
+    for song in songs:
+        if limit and count >= limit:
+            break
+        sys.stdout.write((json.dumps(song.to_dict()) if as_json else str(song)) + "\n")
+        count += 1
+    return count
+
+
+def run_search(app, args):
+    filters = {field: getattr(args, field) for field in ('artist', 'album', 'genre', 'min_duration', 'max_duration') if getattr(args, field) is not None}
+    limit = args.limit
+    if args.name is None:
+        if not filters:
+            raise ValueError("Please provide a song name or at least one filter.")
+        songs = app.query(**filters)
+    else:
+        if args.prefix:
+            songs = app.get_prefix_indexes()['name'].songs_with_prefix(args.name)
+        elif args.fuzzy:
+            songs = [song for song, _, _ in app.fuzzy_search_core(args.name, limit=limit or len(app.songs))]
+        else:
+            songs = app.find_songs(args.name)
+        if filters:
+            ids = {song.id for song in app.query(**filters)}
+            songs = (song for song in songs if song.id in ids)
+    return 0 if print_songs(songs, args.json, limit) else 1
+
+
+def run_sort(app, args):
+    if args.algorithm:
+        algorithm = {'quicksort': app.quicksort, 'merge_sort': app.merge_sort, 'block_sort': app.block_sort, 'parallel': app.parallel_sort}[args.algorithm]
+        with contextlib.redirect_stdout(sys.stderr):
+            app.songs = algorithm(app.songs)
+    else:
+        app.sort_by_keys(app.songs, args.by or 'name')
+    app.invalidate_song_order()
+    print_songs(app.songs, args.json, args.limit)
+    if args.save:
+        with contextlib.redirect_stdout(sys.stderr):
+            app.save_data(compact=True)
+    return 0
+
+
+def run_stats(app, args, load_ms):
+    total_seconds = sum(song.duration_seconds for song in app.songs)
+    stats = {
+        "songs": len(app.songs),
+        "distinct_names": len(app.get_name_index()),
+        "artists": len({song.artist for song in app.songs}),
+        "albums": len({song.album for song in app.songs}),
+        "genres": len({song.genre for song in app.songs}),
+        "playlists": len(app.playlists),
+        "playlist_entries": sum(len(playlist.songs) for playlist in app.playlists),
+        "total_duration": Song.format_duration(total_seconds),
+        "storage": app.storage_mode,
+        "snapshot_format": app.snapshot_format,
+        "data_file_bytes": os.path.getsize(app.data_file) if os.path.exists(app.data_file) else 0,
+        "load_ms": round(load_ms, 3),
+        "query_cache": app.query_cache.stats()
+    }
+    if args.json:
+        sys.stdout.write(json.dumps(stats) + "\n")
+    else:
+        for key, value in stats.items():
+            sys.stdout.write(f"{key:<17} {value}\n")
+    return 0
+
+
+def benchmark_startup(data_file, runs=10, output_file='startup_benchmark.json'):
+    #Misst den Kaltstart als kompletten Prozess (Interpreter, Imports, Laden der Daten) über den stats-Befehl
+    import subprocess
+    command = [sys.executable, os.path.abspath(__file__), '--data', data_file, 'stats', '--json']
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter_ns()
+        completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter_ns() - start) / 1e6)
+    timings.sort()
+    stats = json.loads(completed.stdout)
+    report = {
+        "benchmark": "startup",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "songs": stats["songs"],
+        "runs": runs,
+        "median_ms": round(timings[len(timings) // 2], 3),
+        "min_ms": round(timings[0], 3),
+        "max_ms": round(timings[-1], 3),
+        "load_ms": stats["load_ms"]
+    }
+    print(f"Cold start over {runs} runs ({stats['songs']} songs): median {report['median_ms']:.1f} ms, "
+          f"min {report['min_ms']:.1f} ms, max {report['max_ms']:.1f} ms (loading the data: {report['load_ms']:.1f} ms)")
+    if output_file:
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results were saved to {output_file}.")
+    return report
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        app = MusicApp(args.data, args.storage)
+        app.main_menu()
+        return 0
+
+    #Alle Meldungen der App (Laden, Speichern, Fortschritt) gehen nach stderr, damit stdout nur die Ergebnisse enthält
+    with contextlib.redirect_stdout(sys.stderr):
+        start_time = time.perf_counter()
+        if args.command == 'generate':
+            app = MusicApp(args.data, args.storage, initial_songs=0)
+        else:
+            app = MusicApp(args.data, args.storage)
+        load_ms = (time.perf_counter() - start_time) * 1000
+
+    command_start = time.perf_counter()
+    try:
+        if args.command == 'search':
+            status = run_search(app, args)
+        elif args.command == 'sort':
+            status = run_sort(app, args)
+        elif args.command == 'stats':
+            status = run_stats(app, args, load_ms)
+        elif args.command == 'serve':
+            import asyncio
+            from service import MusicService
+            try:
+                asyncio.run(MusicService(app, args.workers).serve(args.host, args.port))
+            except KeyboardInterrupt:
+                pass
+            #Der Dienst sammelt Änderungen im Journal, beim Beenden werden sie in den Snapshot übernommen
+            with contextlib.redirect_stdout(sys.stderr):
+                app.save_data(compact=True)
+            status = 0
+        elif args.command == 'bench':
+            #Die Ergebnistabellen der Benchmarks sind die eigentliche Ausgabe und gehen nach stdout
+            output_file = args.output or f"{args.kind}_benchmark.json"
+            if args.kind == 'search':
+                app.benchmark_search_algorithms(sizes=args.sizes or (1000, 10000, 100000), output_file=output_file)
+            elif args.kind == 'sort':
+                app.benchmark_sorting_algorithms(sizes=args.sizes or (1000, 10000), output_file=output_file)
+            elif args.kind == 'storage':
+                app.benchmark_storage(sizes=args.sizes or (10000, 100000), output_file=output_file)
+            elif args.kind == 'concurrency':
+                app.benchmark_concurrency(args.readers, args.sizes or (100000,), args.duration, args.io_ms, output_file=output_file)
+            else:
+                benchmark_startup(args.data, args.runs, output_file)
+            status = 0
+        else:
+            with contextlib.redirect_stdout(sys.stderr):
+                if args.command == 'import':
+                    imported, unmatched = app.import_playlist(args.file, args.playlist, args.format)
+                    app.save_data()
+                    print(f"Imported {imported} songs, {len(unmatched)} entries not found.")
+                    for line_number, name in unmatched:
+                        print(f"line {line_number}: {name}")
+                elif args.command == 'export':
+                    exported = app.export_playlist(args.playlist, args.file, args.format)
+                    print(f"Exported {exported} songs to {args.file}.")
+                elif args.command == 'convert':
+                    snapshot_format = args.format or ('binary' if args.file.endswith('.bin') else 'json')
+                    app.write_snapshot(args.file, snapshot_format)
+                    print(f"Wrote {len(app.songs)} songs and {len(app.playlists)} playlists to {args.file} ({snapshot_format}).")
+                elif args.command == 'generate':
+                    app.generate_catalog(args.count, args.seed, num_artists=args.artists, num_genres=args.genres, duplicate_rate=args.duplicate_rate)
+            status = 0
+    except (OSError, ValueError) as error:
+        sys.stderr.write(f"Error: {error}\n")
+        status = 2
+
+    if args.timing:
+        sys.stderr.write(f"load {load_ms:.1f} ms, {args.command} {(time.perf_counter() - command_start) * 1000:.1f} ms\n")
+    return status
+
+
 if __name__ == "__main__":
-    app = MusicApp()
-    app.main_menu()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,248 @@
+import asyncio
+import functools
+import json
+import os
+import urllib.parse
+
+from main import Playlist, PrefixIndex, SearchTree, Song
+
+
+class MusicService:
+    #HTTP/JSON-Dienst auf Basis von asyncio für eine MusicApp (nur Standardbibliothek, HTTP/1.1 mit Keep-Alive)
+    #Günstige Anfragen (Index-Lookups, Binärsuche auf der fertigen sortierten Sicht) laufen direkt in der Event-Loop
+    #Alles, was den ganzen Katalog anfasst (sortierte Sicht oder Präfix-Index aufbauen, Statistik, Speichern), läuft in einem Thread-Pool
+    #Änderungen werden nur in der Event-Loop ausgeführt, dadurch gibt es keine gleichzeitigen Schreibzugriffe
+    #Jede Änderung wird als Journal-Eintrag angehängt, der Snapshot wird erst ab journal_threshold Einträgen neu geschrieben
+    ORDERED_ALGORITHMS = ('binary', 'jump', 'fibonacci', 'exponential', 'tree_descent')
+    MAX_BODY_BYTES = 1 << 20
+    REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 409: 'Conflict',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+    def __init__(self, app, workers=None):
+        import concurrent.futures
+        self.app = app
+        #Im Snapshot-Modus würde jede Änderung die ganze Datei neu schreiben, der Dienst arbeitet deshalb mit dem Journal
+        #(load_data spielt das Journal in jedem Modus nach, ein späterer Start im Snapshot-Modus sieht also denselben Stand)
+        if app.storage_mode == 'snapshot':
+            app.storage_mode = 'journal'
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1))
+        #build_lock verhindert, dass zwei Anfragen denselben Index gleichzeitig aufbauen; save_lock serialisiert Änderungen und Speichern
+        self.build_lock = asyncio.Lock()
+        self.save_lock = asyncio.Lock()
+        self.requests = 0
+
+    async def run_blocking(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def sorted_songs(self):
+        if self.app.sorted_songs is None:
+            async with self.build_lock:
+                if self.app.sorted_songs is None:
+                    await self.run_blocking(self.app.get_sorted_songs)
+        return self.app.sorted_songs
+
+    async def search_tree(self):
+        if self.app.search_tree is None:
+            sorted_songs = await self.sorted_songs()
+            async with self.build_lock:
+                if self.app.search_tree is None:
+                    self.app.search_tree = await self.run_blocking(SearchTree, sorted_songs)
+        return self.app.search_tree
+
+    async def prefix_indexes(self):
+        if self.app.prefix_indexes is None:
+            async with self.build_lock:
+                if self.app.prefix_indexes is None:
+                    await self.run_blocking(self.app.get_prefix_indexes)
+        return self.app.prefix_indexes
+
+    async def mutate(self, change):
+        #Führt eine Änderung in der Event-Loop aus; gesichert ist sie mit ihrem Journal-Eintrag (bzw. im SQLite-Modus in der Datenbank)
+        #Erst ab journal_threshold Einträgen wird der Snapshot neu geschrieben, das läuft im Thread-Pool
+        #Der Lock sorgt dafür, dass keine weitere Änderung (oder ein Journal-Eintrag) in ein laufendes Speichern fällt
+        #Gibt change() None zurück, wurde nichts geändert und es wird auch nicht gespeichert
+        async with self.save_lock:
+            result = change()
+            if result is not None and self.app.store is None and self.app.journal_length >= self.app.journal_threshold:
+                await self.run_blocking(functools.partial(self.app.save_data, quiet=True))
+        return result
+
+    def catalog_stats(self):
+        songs = self.app.songs
+        return {
+            "songs": len(songs),
+            "distinct_names": len(self.app.get_name_index()),
+            "artists": len({song.artist for song in songs}),
+            "albums": len({song.album for song in songs}),
+            "genres": len({song.genre for song in songs}),
+            "playlists": len(self.app.playlists),
+            "playlist_entries": sum(len(playlist.songs) for playlist in self.app.playlists),
+            "total_duration": Song.format_duration(sum(song.duration_seconds for song in songs)),
+            "storage": self.app.storage_mode,
+            "query_cache": self.app.query_cache.stats(),
+            "requests": self.requests
+        }
+
+    @staticmethod
+    def required(query, key):
+        value = query.get(key, [''])[0]
+        if not value:
+            raise ValueError(f"Missing query parameter: {key}")
+        return value
+
+    async def handle(self, method, path, query, body):
+        #Ordnet eine Anfrage dem passenden Endpunkt zu und gibt (Status, JSON-Objekt) zurück
+        parts = [urllib.parse.unquote(part) for part in path.strip('/').split('/') if part]
+        if parts == ['stats'] and method == 'GET':
+            return 200, await self.run_blocking(self.catalog_stats)
+
+        if parts[:1] == ['songs'] and method == 'GET':
+            if len(parts) == 1:
+                songs = self.app.find_songs(self.required(query, 'name'))
+                return 200, {"songs": [song.to_dict() for song in songs]}
+            if parts[1:] == ['ordered']:
+                return await self.ordered_search(query)
+            if parts[1:] == ['prefix']:
+                prefix = self.required(query, 'q')
+                limit = int(query.get('limit', ['10'])[0])
+                indexes = await self.prefix_indexes()
+                #Bis PrefixIndex.TOP_SIZE Vorschläge kommen aus den vorab bestimmten Listen (unter einer Millisekunde),
+                #größere limit durchlaufen den Präfixbereich und laufen deshalb im Thread-Pool
+                if limit <= PrefixIndex.TOP_SIZE:
+                    completions = self.app.autocomplete(prefix, limit)
+                else:
+                    completions = await self.run_blocking(self.app.autocomplete, prefix, limit)
+                songs = indexes['name'].songs_with_prefix(prefix, limit)
+                return 200, {"completions": [{"field": field, "value": value, "songs": count} for field, value, count in completions],
+                             "songs": [song.to_dict() for song in songs]}
+            return 404, {"error": "Unknown endpoint"}
+
+        if parts[:1] == ['playlists']:
+            if len(parts) == 1 and method == 'GET':
+                return 200, {"playlists": [{"name": playlist.name, "songs": len(playlist.songs)} for playlist in self.app.playlists]}
+            if len(parts) == 1 and method == 'POST':
+                name = str(body.get('name') or '').strip()
+                if not name:
+                    raise ValueError("Missing field: name")
+
+                def create():
+                    #Die Prüfung läuft im Lock, damit zwei gleichzeitige Anfragen nicht beide dieselbe Playlist anlegen
+                    if self.app.find_playlist(name) is not None:
+                        return None
+                    playlist = Playlist(name)
+                    self.app.insert_playlist(playlist)
+                    return playlist
+
+                playlist = await self.mutate(create)
+                if playlist is None:
+                    return 409, {"error": f"Playlist already exists: {name}"}
+                return 201, {"name": playlist.name, "songs": 0}
+            playlist = self.app.find_playlist(parts[1]) if len(parts) >= 2 else None
+            if playlist is None:
+                return 404, {"error": f"Playlist not found: {parts[1] if len(parts) >= 2 else ''}"}
+            if len(parts) == 2 and method == 'GET':
+                return 200, {"name": playlist.name, "songs": [song.to_dict() for song in playlist.songs]}
+            if parts[2:] == ['songs'] and method == 'POST':
+                if 'song_id' in body:
+                    song_id = body['song_id']
+                    #bool ist eine Unterklasse von int, true wäre sonst die ID 1
+                    if not isinstance(song_id, int) or isinstance(song_id, bool):
+                        raise ValueError("song_id must be an integer")
+                    song = self.app.songs_by_id.get(song_id)
+                else:
+                    song = self.app.find_song(str(body.get('song') or ''))
+                if song is None:
+                    return 404, {"error": "Song not found"}
+                await self.mutate(lambda: self.app.add_to_playlist(playlist, song) or True)
+                return 201, {"name": playlist.name, "songs": len(playlist.songs), "added": song.to_dict()}
+            return 405, {"error": "Method not allowed"}
+
+        return 404, {"error": "Unknown endpoint"}
+
+    async def ordered_search(self, query):
+        #Suche auf der sortierten Sicht mit einem der geordneten Suchalgorithmen
+        name = self.required(query, 'name')
+        algorithm = query.get('algorithm', ['binary'])[0]
+        if algorithm not in self.ORDERED_ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algorithm}. Use one of: {', '.join(self.ORDERED_ALGORITHMS)}")
+        sorted_songs = await self.sorted_songs()
+        target = self.app.find_song(name)
+        if target is None:
+            return 404, {"error": f"Song not found: {name}", "algorithm": algorithm}
+        if algorithm == 'tree_descent':
+            tree = await self.search_tree()
+            index, comparisons = self.app.tree_descent_search_core(tree, target.name)
+        else:
+            index, comparisons = self.app.cached_search_core(algorithm, sorted_songs, target.name)
+        #-1 heißt nicht gefunden (z.B. wenn sich die sortierte Sicht seit find_song geändert hat), sorted_songs[-1] wäre der letzte Song
+        if index < 0:
+            return 404, {"error": f"Song not found: {name}", "algorithm": algorithm, "comparisons": comparisons}
+        return 200, {"algorithm": algorithm, "index": index, "comparisons": comparisons, "song": sorted_songs[index].to_dict()}
+
+    async def serve_client(self, reader, writer):
+        #Eine Verbindung kann mehrere Anfragen nacheinander senden (Keep-Alive)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "Malformed request line"}, keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        key, value = line.split(':', 1)
+                        headers[key.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+                try:
+                    length = int(headers.get('content-length', '0') or 0)
+                except ValueError:
+                    length = -1
+                #Ohne gültige Länge lässt sich das Ende des Bodys nicht bestimmen, die Verbindung wird nach der Antwort geschlossen
+                if length < 0:
+                    await self.respond(writer, 400, {"error": "Invalid Content-Length"}, keep_alive=False)
+                    break
+                if length > self.MAX_BODY_BYTES:
+                    await self.respond(writer, 413, {"error": "Request body too large"}, keep_alive=False)
+                    break
+                raw_body = await reader.readexactly(length) if length else b''
+
+                self.requests += 1
+                url = urllib.parse.urlsplit(target)
+                try:
+                    body = json.loads(raw_body) if raw_body else {}
+                    if not isinstance(body, dict):
+                        raise ValueError("The request body must be a JSON object")
+                    status, payload = await self.handle(method, url.path, urllib.parse.parse_qs(url.query), body)
+                except ValueError as error:
+                    status, payload = 400, {"error": str(error)}
+                except Exception as error:
+                    status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive=True):
+        body = json.dumps(payload).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {self.REASONS.get(status, '')}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8000, ready=None):
+        server = await asyncio.start_server(self.serve_client, host, port, backlog=1024)
+        address = server.sockets[0].getsockname()
+        print(f"Serving the music catalog on http://{address[0]}:{address[1]} ({len(self.app.songs)} songs)")
+        if ready is not None:
+            ready(address)
+        async with server:
+            await server.serve_forever()
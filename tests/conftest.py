@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    #Erzeugt eine MusicApp mit eigener Datei in tmp_path (ohne vorhandene Datei werden initial_songs Songs mit seed generiert)
+    apps = []
+
+    def make(name='music_data.json', **options):
+        options.setdefault('initial_songs', 300)
+        options.setdefault('seed', 7)
+        app = main.MusicApp(str(tmp_path / name), **options)
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        if app.store is not None:
+            app.store.close()
+
+
+def state(app):
+    #Vergleichbarer Stand eines Katalogs: alle Songs mit ID, die Playlists als ID-Listen und die nächste freie ID
+    return ([song.to_dict() for song in app.songs], [playlist.to_dict() for playlist in app.playlists], app.next_song_id)
+
+
+@pytest.fixture
+def catalog_state():
+    return state
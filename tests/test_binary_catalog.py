@@ -0,0 +1,116 @@
+import copy
+import json
+
+import pytest
+
+import main
+
+
+def add_playlists(app):
+    #Playlists mit doppelten Einträgen, eine leere Playlist und Namen außerhalb von ASCII
+    app.insert_song(main.Song('Straße über Ölfeld ♫', 'Björk', 'Homogénic', 'Électronique', '4:05'))
+    mix = main.Playlist('Mix')
+    app.insert_playlist(mix)
+    for song in (app.songs[3], app.songs[-1], app.songs[3]):
+        app.add_to_playlist(mix, song)
+    app.insert_playlist(main.Playlist('Leer ✓'))
+
+
+def test_json_binary_json_round_trip(make_app, catalog_state, tmp_path):
+    source = make_app('source.json')
+    add_playlists(source)
+    source.remove_song(max(source.songs, key=lambda song: song.id))
+    expected = catalog_state(source)
+
+    source.write_snapshot(str(tmp_path / 'catalog.bin'), 'binary')
+    assert main.BinaryCatalog.is_binary(str(tmp_path / 'catalog.bin'))
+    binary = make_app('catalog.bin')
+    assert binary.snapshot_format == 'binary'
+    assert all(isinstance(song, main.MappedSong) for song in binary.songs)
+    assert catalog_state(binary) == expected
+
+    binary.write_snapshot(str(tmp_path / 'back.json'), 'json')
+    with open(tmp_path / 'back.json') as f:
+        assert json.load(f)['songs'] == expected[0]
+    assert catalog_state(make_app('back.json')) == expected
+
+
+def test_fields_are_decoded_on_first_access(make_app, tmp_path):
+    make_app('source.json').write_snapshot(str(tmp_path / 'catalog.bin'), 'binary')
+    app = make_app('catalog.bin')
+    song = app.songs[5]
+    catalog = song.catalog
+    #Beim Laden werden nur die Songnamen dekodiert, Künstler, Album und Genre bleiben in der Datei
+    assert all(value is None for value in catalog.strings[catalog.name_count:])
+    artist = song.artist
+    assert catalog.strings.count(None) < catalog.string_count - catalog.name_count
+    assert song.artist is artist
+    #Kopien sind normale Songs, die die Datei nicht offen halten
+    duplicate = copy.copy(song)
+    assert type(duplicate) is main.Song and duplicate.to_dict() == song.to_dict()
+
+
+def test_journal_on_binary_snapshot(make_app, catalog_state, tmp_path):
+    make_app('source.json').write_snapshot(str(tmp_path / 'catalog.bin'), 'binary')
+    app = make_app('catalog.bin', storage_mode='journal', journal_threshold=10 ** 9)
+    add_playlists(app)
+    app.remove_song(app.songs[0])
+    expected = catalog_state(app)
+    assert catalog_state(make_app('catalog.bin', storage_mode='journal')) == expected
+
+    app.save_data(compact=True)
+    assert main.BinaryCatalog.is_binary(app.data_file)
+    reopened = make_app('catalog.bin', storage_mode='journal')
+    assert catalog_state(reopened) == expected
+    assert reopened.journal_seq == app.journal_seq
+
+
+def test_version_1_header_derives_next_song_id(make_app, catalog_state, tmp_path):
+    source = make_app('source.json')
+    path = str(tmp_path / 'catalog.bin')
+    source.write_snapshot(path, 'binary')
+    with open(path, 'rb') as f:
+        data = bytearray(f.read())
+    #Version 1: derselbe Kopf ohne nächste freie Song-ID, die Abschnittstabelle folgt direkt danach (absolute Positionen bleiben gleich)
+    header = main.BinaryCatalog.HEADER.unpack_from(data, 0)
+    table = data[main.BinaryCatalog.HEADER.size:main.BinaryCatalog.HEADER.size + main.BinaryCatalog.SECTION_TABLE.size]
+    version_1 = main.BinaryCatalog.HEADERS[1]
+    version_1.pack_into(data, 0, header[0], 1, *header[2:-1])
+    data[version_1.size:version_1.size + len(table)] = table
+    with open(path, 'wb') as f:
+        f.write(data)
+    app = make_app('catalog.bin')
+    assert [song.to_dict() for song in app.songs] == catalog_state(source)[0]
+    assert app.next_song_id == max(song.id for song in source.songs) + 1
+
+
+def test_mapped_songs_survive_detach(make_app, catalog_state, tmp_path, monkeypatch):
+    make_app('source.json').write_snapshot(str(tmp_path / 'catalog.bin'), 'binary')
+    app = make_app('catalog.bin')
+    expected = catalog_state(app)
+    old_songs = list(app.songs)
+    catalog = old_songs[0].catalog
+    #Unter Windows werden gemappte Kataloge vor dem Ersetzen der Datei geschlossen, die Songs lesen dann aus Kopien
+    monkeypatch.setattr(main.os, 'name', 'nt')
+    app.write_snapshot(app.data_file)
+    monkeypatch.undo()
+    assert catalog.mm.closed
+    assert [song.to_dict() for song in old_songs] == expected[0]
+
+
+def test_unstorable_values_leave_file_unchanged(make_app, tmp_path):
+    app = make_app('source.json')
+    path = str(tmp_path / 'catalog.bin')
+    app.write_snapshot(path, 'binary')
+    with open(path, 'rb') as f:
+        before = f.read()
+    song = main.Song.from_dict({"name": "Legacy", "artist": "A", "album": "B", "genre": "Pop", "duration": "3 min"})
+    app.insert_song(song)
+    with pytest.raises(ValueError):
+        app.write_snapshot(path, 'binary')
+    song.duration = '3:00'
+    app.insert_song(main.Song('Null\0byte', 'A', 'B', 'Pop', 10))
+    with pytest.raises(ValueError):
+        app.write_snapshot(path, 'binary')
+    with open(path, 'rb') as f:
+        assert f.read() == before
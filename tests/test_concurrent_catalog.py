@@ -0,0 +1,143 @@
+import random
+import threading
+
+import pytest
+
+import main
+
+
+def contents(snapshot):
+    #Vergleichbarer Inhalt eines CatalogSnapshot; Songs werden über ihre Identität verglichen
+    name_index = {}
+    for shard in snapshot.name_index.shards:
+        name_index.update((key, [id(song) for song in songs]) for key, songs in shard.items())
+    songs_by_id = {}
+    for shard in snapshot.songs_by_id.shards:
+        songs_by_id.update((song_id, id(song)) for song_id, song in shard.items())
+    return ([id(song) for song in snapshot.songs], [id(song) for song in snapshot.sorted_songs], name_index, songs_by_id,
+            [(playlist.name, [id(song) for song in playlist.songs]) for playlist in snapshot.playlists],
+            sorted(snapshot.playlist_index), snapshot.journal_seq, snapshot.next_song_id)
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    #Kleine Blöcke, damit schon wenige Änderungen Blöcke teilen und zusammenlegen
+    monkeypatch.setattr(main.ChunkedList, 'CHUNK_SIZE', 4)
+
+
+def test_chunked_list_matches_list(small_chunks):
+    rng = random.Random(1)
+    expected = list(range(50))
+    chunked = main.ChunkedList.from_iterable(expected)
+    versions = []
+    for step in range(2000):
+        if expected and rng.random() < 0.5:
+            index = rng.randrange(len(expected))
+            del expected[index]
+            chunked = chunked.delete(index)
+        else:
+            index = rng.randint(0, len(expected))
+            expected.insert(index, step)
+            chunked = chunked.insert(index, step)
+        assert len(chunked) == len(expected)
+        if step % 100 == 0:
+            versions.append((chunked, list(expected)))
+    assert list(chunked) == expected
+    assert [chunked[index] for index in range(len(expected))] == expected
+    assert all(len(chunk) <= 2 * main.ChunkedList.CHUNK_SIZE for chunk in chunked.chunks)
+    #Ältere Versionen bleiben unverändert (Copy-on-Write)
+    assert all(list(version) == items for version, items in versions)
+
+
+def test_incremental_snapshots_match_full_capture(make_app, small_chunks):
+    app = make_app(storage_mode='journal', journal_threshold=10 ** 9, initial_songs=120)
+    catalog = main.ConcurrentCatalog(app)
+    rng = random.Random(2)
+    names = [song.name for song in rng.sample(app.songs, 8)]
+    catalog.create_playlist('Mix')
+    history = []
+    for step in range(300):
+        operation = rng.random()
+        if operation < 0.4:
+            catalog.add_song(main.Song(rng.choice(names), 'Artist', 'Album', 'Pop', 100 + step))
+        elif operation < 0.75:
+            assert catalog.delete_song(rng.choice(list(catalog.snapshot().songs)))
+        elif operation < 0.95:
+            assert catalog.add_to_playlist('mix', rng.choice(list(catalog.snapshot().songs)))
+        else:
+            assert catalog.sort(spec=rng.choice(['artist', '-duration,name']))
+        snapshot = catalog.snapshot()
+        #Der inkrementell erzeugte Snapshot muss genau dem entsprechen, was eine vollständige Kopie der MusicApp ergibt
+        assert contents(snapshot) == contents(catalog.capture()), step
+        history.append((snapshot, contents(snapshot)))
+    assert all(contents(snapshot) == expected for snapshot, expected in history)
+    assert len({snapshot.version for snapshot, _ in history}) == len(history)
+
+
+def test_readers_see_consistent_snapshots_while_writing(make_app, catalog_state):
+    app = make_app(storage_mode='journal', journal_threshold=50, initial_songs=500)
+    catalog = main.ConcurrentCatalog(app)
+    catalog.create_playlist('Shared')
+    errors = []
+    done = threading.Event()
+
+    def writer(index):
+        rng = random.Random(index)
+        try:
+            for step in range(150):
+                if rng.random() < 0.6:
+                    song = catalog.add_song(main.Song(f"Writer {index} song {step % 20}", 'Artist', 'Album', 'Pop', 200))
+                    catalog.add_to_playlist('Shared', song)
+                else:
+                    catalog.delete_song(rng.choice(list(catalog.snapshot().songs)))
+                if step % 50 == 0:
+                    catalog.save()
+        except Exception as error:
+            errors.append(error)
+
+    def reader():
+        try:
+            while not done.is_set():
+                snapshot = catalog.snapshot()
+                songs = list(snapshot.songs)
+                sorted_songs = list(snapshot.sorted_songs)
+                assert len(songs) == len(sorted_songs) == len(snapshot.songs_by_id)
+                assert sorted(map(id, songs)) == sorted(map(id, sorted_songs))
+                assert all(a.name <= b.name for a, b in zip(sorted_songs, sorted_songs[1:]))
+                assert all(snapshot.songs_by_id.get(song.id) is song for song in songs)
+                assert all(song in snapshot.find_songs(song.name) for song in songs[:50])
+                assert all(snapshot.songs_by_id.get(song.id) is song for song in snapshot.find_playlist('shared').songs)
+        except Exception as error:
+            errors.append(error)
+
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    writers = [threading.Thread(target=writer, args=(index,)) for index in range(3)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+    assert errors == []
+
+    assert contents(catalog.snapshot()) == contents(catalog.capture())
+    catalog.save(compact=True)
+    assert catalog_state(make_app(storage_mode='journal')) == catalog_state(app)
+
+
+def test_sort_during_writes_keeps_all_songs(make_app):
+    app = make_app(storage_mode='journal', journal_threshold=10 ** 9, initial_songs=2000)
+    catalog = main.ConcurrentCatalog(app)
+
+    def add_songs():
+        for step in range(100):
+            catalog.add_song(main.Song(f"Late {step}", 'Artist', 'Album', 'Pop', 100))
+
+    thread = threading.Thread(target=add_songs)
+    thread.start()
+    catalog.sort(spec='artist')
+    thread.join()
+    snapshot = catalog.snapshot()
+    assert sorted(map(id, snapshot.songs)) == sorted(map(id, app.songs)) and len(app.songs) == 2100
+    assert contents(snapshot) == contents(catalog.capture())
@@ -0,0 +1,104 @@
+import json
+import os
+import shutil
+
+import main
+
+
+def make_changes(app):
+    #Eine Folge von Änderungen, die jede Art von Journal-Eintrag erzeugt
+    added = [main.Song(f"Journal song {index}", 'Journal Artist', 'Album', 'Rock', 180 + index) for index in range(5)]
+    for song in added:
+        app.insert_song(song)
+    app.remove_song(added[1])
+    app.remove_song(app.songs[0])
+    favourites = main.Playlist('Favourites')
+    app.insert_playlist(favourites)
+    for song in (added[0], added[2], app.songs[10], added[0]):
+        app.add_to_playlist(favourites, song)
+    app.insert_playlist(main.Playlist('Empty'))
+    return added
+
+
+def test_journal_replay_restores_catalog(make_app, catalog_state):
+    app = make_app(storage_mode='journal', journal_threshold=10 ** 9)
+    make_changes(app)
+    expected = catalog_state(app)
+    with open(app.journal_file) as f:
+        records = [json.loads(line) for line in f]
+    assert [record['seq'] for record in records] == list(range(1, len(records) + 1))
+
+    reopened = make_app(storage_mode='journal')
+    assert catalog_state(reopened) == expected
+    assert reopened.journal_seq == len(records)
+    #Playlists verweisen auf dieselben Song-Objekte wie der Katalog
+    favourites = reopened.find_playlist('favourites')
+    assert all(reopened.songs_by_id[song.id] is song for song in favourites.songs)
+    assert favourites.songs[0] is favourites.songs[-1]
+
+
+def test_snapshot_mode_replays_existing_journal(make_app, catalog_state):
+    app = make_app(storage_mode='journal', journal_threshold=10 ** 9)
+    make_changes(app)
+    assert catalog_state(make_app(storage_mode='snapshot')) == catalog_state(app)
+
+
+def test_compaction_then_more_changes(make_app, catalog_state):
+    app = make_app(storage_mode='journal', journal_threshold=10 ** 9)
+    make_changes(app)
+    app.save_data(compact=True)
+    assert not os.path.exists(app.journal_file)
+    with open(app.data_file) as f:
+        data = json.load(f)
+    #Playlists speichern nur IDs
+    assert all(set(playlist) == {'name', 'song_ids'} for playlist in data['playlists'])
+    assert data['journal_seq'] == app.journal_seq
+
+    app.remove_song(app.songs[3])
+    app.add_to_playlist(app.find_playlist('Empty'), app.songs[4])
+    assert catalog_state(make_app(storage_mode='journal')) == catalog_state(app)
+
+
+def test_records_already_in_snapshot_are_skipped(make_app, catalog_state, tmp_path):
+    #Absturz nach dem Schreiben des Snapshots, aber vor dem Löschen des Journals: die Einträge dürfen nicht doppelt wirken
+    app = make_app(storage_mode='journal', journal_threshold=10 ** 9)
+    make_changes(app)
+    saved_journal = str(tmp_path / 'saved.journal')
+    shutil.copy(app.journal_file, saved_journal)
+    app.save_data(compact=True)
+    shutil.copy(saved_journal, app.journal_file)
+    app.insert_song(main.Song('After the crash', 'Artist', 'Album', 'Pop', 200))
+    assert catalog_state(make_app(storage_mode='journal')) == catalog_state(app)
+
+
+def test_truncated_last_record_is_ignored(make_app, catalog_state):
+    app = make_app(storage_mode='journal', journal_threshold=10 ** 9)
+    make_changes(app)
+    expected = catalog_state(app)
+    with open(app.journal_file, 'a') as f:
+        f.write('{"op":"add_song","song":{"name":"Cut')
+    assert catalog_state(make_app(storage_mode='journal')) == expected
+
+
+def test_deleted_ids_are_not_reused(make_app):
+    app = make_app(storage_mode='journal', journal_threshold=10 ** 9)
+    newest = max(app.songs, key=lambda song: song.id)
+    app.remove_song(newest)
+    app.save_data(compact=True)
+    reopened = make_app(storage_mode='journal')
+    song = main.Song('New song', 'Artist', 'Album', 'Pop', 200)
+    reopened.insert_song(song)
+    assert song.id == newest.id + 1
+
+
+def test_embedded_playlists_resolve_to_catalog_songs(make_app, tmp_path):
+    #Ältere Dateien betten die Songs in die Playlists ein; beim Laden werden daraus die Song-Objekte des Katalogs
+    songs = [{"id": index, "name": f"Song {index}", "artist": "Artist", "album": "Album", "genre": "Pop", "duration": "3:00"}
+             for index in range(3)]
+    legacy = {"songs": songs, "playlists": [{"name": "Old", "songs": [dict(songs[2], id=None), dict(songs[0], id=None)]}]}
+    with open(tmp_path / 'legacy.json', 'w') as f:
+        json.dump(legacy, f)
+    app = make_app('legacy.json')
+    playlist = app.find_playlist('Old')
+    assert [song.id for song in playlist.songs] == [2, 0]
+    assert all(app.songs_by_id[song.id] is song for song in playlist.songs)
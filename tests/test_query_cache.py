@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+import main
+
+
+ALGORITHMS = ('linear', 'binary', 'jump', 'fibonacci', 'exponential')
+
+
+def search_results(app, names, prefixes):
+    #Alle gecachten Suchen für die gegebenen Namen und Präfixe; Songs werden über ihre ID verglichen
+    sorted_songs = app.get_sorted_songs()
+    results = []
+    for name in names:
+        for algorithm in ALGORITHMS:
+            arr = app.songs if algorithm == 'linear' else sorted_songs
+            index, comparisons = app.cached_search_core(algorithm, arr, name)
+            results.append((algorithm, name, index, comparisons, arr[index].id if index >= 0 else None))
+        results.append(('fuzzy', name, [(match.id, distance) for match, distance, _ in app.fuzzy_search_core(name[:-1] + 'x', 3)]))
+    for prefix in prefixes:
+        results.append(('prefix', prefix, app.autocomplete(prefix, 5)))
+    for genre in ('Pop', 'Rock', 'Jazz'):
+        results.append(('query', genre, [song.id for song in app.query(genre=genre, min_duration='2:00')]))
+    return results
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_cached_results_match_uncached_over_changes(make_app, seed):
+    #Dieselben Änderungen auf zwei Katalogen, einmal mit und einmal ohne QueryCache: jede Suche muss identisch antworten
+    cached = make_app('cached.json', storage_mode='journal', journal_threshold=10 ** 9)
+    uncached = make_app('uncached.json', storage_mode='journal', journal_threshold=10 ** 9, query_cache_size=0)
+    assert [song.to_dict() for song in cached.songs] == [song.to_dict() for song in uncached.songs]
+
+    rng = random.Random(seed)
+    #Wenige Namen, damit sie nach den Einfügungen mehrfach vorkommen
+    names = [song.name for song in rng.sample(cached.songs, 12)] + ['No such song']
+    prefixes = ['', 'a', 'b', names[0][:2], names[1][:3]]
+    artists = sorted({song.artist for song in cached.songs})
+    for step in range(150):
+        assert search_results(cached, names, prefixes) == search_results(uncached, names, prefixes), step
+        operation = rng.random()
+        if operation < 0.45:
+            name = rng.choice(names[:-1]) if rng.random() < 0.8 else f"New song {step}"
+            fields = (name, rng.choice(artists), 'Album', rng.choice(['Pop', 'Rock', 'Jazz']), rng.randint(60, 400))
+            cached.insert_song(main.Song(*fields))
+            uncached.insert_song(main.Song(*fields))
+        elif operation < 0.85:
+            position = rng.randrange(len(cached.songs))
+            cached.remove_song(cached.songs[position])
+            uncached.remove_song(uncached.songs[position])
+        elif operation < 0.95:
+            spec = rng.choice(['artist', '-duration', 'name,-artist'])
+            for app in (cached, uncached):
+                app.sort_by_keys(app.songs, spec)
+                app.invalidate_song_order()
+        else:
+            #Laden spielt das Journal nach und verwirft alle Indizes und den Cache
+            for app in (cached, uncached):
+                app.load_data()
+    assert cached.query_cache.hits > 0
+
+
+def test_insert_elsewhere_changes_duplicate_found_by_binary_search(make_app):
+    #Mit der Länge der sortierten Sicht ändern sich die Mitten der Binärsuche; ein veralteter Eintrag würde einen anderen Song liefern
+    app = make_app(initial_songs=0)
+    for index in range(40):
+        app.insert_song(main.Song('Same' if index % 3 == 0 else f"Song {index:02d}", 'Artist', 'Album', 'Pop', 200))
+    sorted_songs = app.get_sorted_songs()
+    first = app.cached_search_core('binary', sorted_songs, 'Same')
+    assert app.cached_search_core('binary', sorted_songs, 'Same') == first
+    for index in range(5):
+        app.insert_song(main.Song(f"Zulu {index}", 'Artist', 'Album', 'Pop', 200))
+        assert app.cached_search_core('binary', sorted_songs, 'Same') == app.binary_search_core(sorted_songs, 'Same')
+
+
+def test_load_data_clears_cache(make_app):
+    app = make_app()
+    name = app.songs[0].name
+    app.cached_search_core('binary', app.get_sorted_songs(), name)
+    assert app.query_cache.entries
+    app.load_data()
+    assert not app.query_cache.entries
@@ -0,0 +1,163 @@
+import asyncio
+import contextlib
+import json
+import os
+import urllib.parse
+
+from load_generator import request
+from service import MusicService
+
+
+@contextlib.asynccontextmanager
+async def running(service):
+    #Startet den Dienst auf einem freien Port und beendet ihn nach dem with-Block
+    ready = asyncio.get_running_loop().create_future()
+    task = asyncio.create_task(service.serve('127.0.0.1', 0, ready.set_result))
+    host, port = await ready
+    try:
+        yield host, port
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        service.executor.shutdown()
+
+
+async def raw(host, port, data):
+    #Schickt Bytes unverändert und liest alle Antworten bis zum Schließen der Verbindung
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def test_search_endpoints_match_app(make_app):
+    app = make_app()
+    name = app.songs[17].name
+    prefix = name[:2]
+
+    async def scenario():
+        async with running(MusicService(app)) as (host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            #Alle Anfragen über eine Keep-Alive-Verbindung
+            status, payload = await request(reader, writer, 'GET', f"/songs?name={urllib.parse.quote(name.upper())}")
+            assert status == 200
+            assert [song['id'] for song in payload['songs']] == [song.id for song in app.find_songs(name)]
+            for algorithm in MusicService.ORDERED_ALGORITHMS:
+                status, payload = await request(reader, writer, 'GET', f"/songs/ordered?name={urllib.parse.quote(name)}&algorithm={algorithm}")
+                assert status == 200, payload
+                assert app.sorted_songs[payload['index']].name == name
+                assert payload['song']['name'] == name
+            status, payload = await request(reader, writer, 'GET', f"/songs/prefix?q={urllib.parse.quote(prefix)}&limit=5")
+            assert status == 200
+            assert [(item['field'], item['value'], item['songs']) for item in payload['completions']] == app.autocomplete(prefix, 5)
+            assert all(song['name'].casefold().startswith(prefix.casefold()) for song in payload['songs'])
+            status, payload = await request(reader, writer, 'GET', '/stats')
+            assert status == 200 and payload['songs'] == len(app.songs) and payload['requests'] == 8
+
+            assert (await request(reader, writer, 'GET', '/songs/ordered?name=No+such+song'))[0] == 404
+            assert (await request(reader, writer, 'GET', f"/songs/ordered?name={urllib.parse.quote(name)}&algorithm=bogo"))[0] == 400
+            assert (await request(reader, writer, 'GET', '/songs'))[0] == 400
+            assert (await request(reader, writer, 'GET', '/nothing'))[0] == 404
+            writer.close()
+
+    asyncio.run(scenario())
+
+
+def test_playlist_writes_are_journaled(make_app, catalog_state):
+    app = make_app(journal_threshold=10 ** 9)
+    snapshot_time = os.path.getmtime(app.data_file)
+    song_ids = [song.id for song in app.songs[:4]]
+
+    async def scenario():
+        async with running(MusicService(app)) as (host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            assert (await request(reader, writer, 'POST', '/playlists', {'name': 'Mix'}))[0] == 201
+            assert (await request(reader, writer, 'POST', '/playlists', {'name': 'mix'}))[0] == 409
+            for song_id in song_ids:
+                status, payload = await request(reader, writer, 'POST', '/playlists/Mix/songs', {'song_id': song_id})
+                assert status == 201 and payload['added']['id'] == song_id
+            status, payload = await request(reader, writer, 'POST', '/playlists/Mix/songs', {'song': app.songs[9].name})
+            assert status == 201
+            for song_id in (True, '7', 1.0):
+                assert (await request(reader, writer, 'POST', '/playlists/Mix/songs', {'song_id': song_id}))[0] == 400
+            assert (await request(reader, writer, 'POST', '/playlists/Mix/songs', {'song_id': 10 ** 9}))[0] == 404
+            assert (await request(reader, writer, 'POST', '/playlists/Nope/songs', {'song_id': song_ids[0]}))[0] == 404
+            status, payload = await request(reader, writer, 'GET', '/playlists/MIX')
+            assert [song['id'] for song in payload['songs']] == song_ids + [app.find_song(app.songs[9].name).id]
+            writer.close()
+
+    asyncio.run(scenario())
+    #Der Dienst hängt Journal-Einträge an, statt den Snapshot neu zu schreiben
+    assert app.storage_mode == 'journal'
+    assert os.path.getmtime(app.data_file) == snapshot_time
+    with open(app.journal_file) as f:
+        assert [json.loads(line)['op'] for line in f] == ['create_playlist'] + ['add_to_playlist'] * 5
+    assert catalog_state(make_app()) == catalog_state(app)
+
+
+def test_threshold_compacts_journal(make_app, catalog_state):
+    app = make_app(journal_threshold=3)
+
+    async def scenario():
+        async with running(MusicService(app)) as (host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            await request(reader, writer, 'POST', '/playlists', {'name': 'Mix'})
+            for song in app.songs[:5]:
+                await request(reader, writer, 'POST', '/playlists/Mix/songs', {'song_id': song.id})
+            writer.close()
+
+    asyncio.run(scenario())
+    assert app.journal_length < 3
+    assert catalog_state(make_app()) == catalog_state(app)
+
+
+def test_concurrent_clients(make_app, catalog_state):
+    app = make_app(journal_threshold=7)
+    clients = 20
+
+    async def client(host, port, index):
+        reader, writer = await asyncio.open_connection(host, port)
+        for song in app.songs[index * 3:index * 3 + 3]:
+            status, _ = await request(reader, writer, 'POST', '/playlists/Shared/songs', {'song_id': song.id})
+            assert status == 201
+            status, payload = await request(reader, writer, 'GET', f"/songs?name={urllib.parse.quote(song.name)}")
+            assert status == 200 and song.id in [found['id'] for found in payload['songs']]
+        writer.close()
+
+    async def scenario():
+        async with running(MusicService(app)) as (host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            await request(reader, writer, 'POST', '/playlists', {'name': 'Shared'})
+            writer.close()
+            await asyncio.gather(*(client(host, port, index) for index in range(clients)))
+
+    asyncio.run(scenario())
+    playlist = app.find_playlist('Shared')
+    assert sorted(song.id for song in playlist.songs) == sorted(song.id for song in app.songs[:clients * 3])
+    assert catalog_state(make_app()) == catalog_state(app)
+
+
+def test_malformed_requests(make_app):
+    app = make_app()
+    playlists = len(app.playlists)
+
+    async def scenario():
+        async with running(MusicService(app)) as (host, port):
+            for length in (b'abc', b'-5'):
+                response = await raw(host, port, b"POST /playlists HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}")
+                assert response.startswith(b"HTTP/1.1 400 ") and b"Connection: close" in response
+            response = await raw(host, port, f"POST /playlists HTTP/1.1\r\nContent-Length: {MusicService.MAX_BODY_BYTES + 1}\r\n\r\n".encode())
+            assert response.startswith(b"HTTP/1.1 413 ")
+            response = await raw(host, port, b"POST /playlists HTTP/1.1\r\nContent-Length: 5\r\nConnection: close\r\n\r\n[1, 2")
+            assert response.startswith(b"HTTP/1.1 400 ")
+            response = await raw(host, port, b"GARBAGE\r\n\r\n")
+            assert response.startswith(b"HTTP/1.1 400 ")
+            #Zwei Anfragen hintereinander auf derselben Verbindung, die zweite schließt sie
+            response = await raw(host, port, b"GET /stats HTTP/1.1\r\n\r\nGET /playlists HTTP/1.1\r\nConnection: close\r\n\r\n")
+            assert response.count(b"HTTP/1.1 200 OK") == 2
+
+    asyncio.run(scenario())
+    assert len(app.playlists) == playlists
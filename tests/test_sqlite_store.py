@@ -0,0 +1,106 @@
+import json
+import random
+import shutil
+
+import pytest
+
+import main
+
+
+def by_id(state):
+    #Die SQLite-Datenbank liefert die Songs nach ID sortiert
+    songs, playlists, next_song_id = state
+    return sorted(songs, key=lambda song: song['id']), playlists, next_song_id
+
+
+@pytest.fixture
+def pair(make_app, tmp_path):
+    #Derselbe Katalog einmal im Speicher (Snapshot) und einmal in SQLite (beim ersten Start aus der JSON-Datei übernommen)
+    make_app('source.json')
+    shutil.copy(tmp_path / 'source.json', tmp_path / 'memory.json')
+    shutil.copy(tmp_path / 'source.json', tmp_path / 'catalog.json')
+    return make_app('memory.json'), make_app('catalog.json', storage_mode='sqlite')
+
+
+def test_first_start_migrates_json(pair, catalog_state, tmp_path):
+    memory, sqlite = pair
+    assert sqlite.store.file_path == str(tmp_path / 'catalog.db')
+    assert by_id(catalog_state(sqlite)) == by_id(catalog_state(memory))
+    #Beim nächsten Start kommt alles aus der Datenbank, die Songs lesen ihre Felder erst bei Bedarf
+    reopened = main.MusicApp(str(tmp_path / 'catalog.json'), 'sqlite', initial_songs=0)
+    try:
+        assert all(isinstance(song, main.StoredSong) for song in reopened.songs)
+        assert reopened.name_index is None
+        assert by_id(catalog_state(reopened)) == by_id(catalog_state(memory))
+    finally:
+        reopened.store.close()
+
+
+def test_changes_match_in_memory_catalog(pair, catalog_state, tmp_path):
+    memory, sqlite = pair
+    rng = random.Random(3)
+    names = [song.name for song in rng.sample(memory.songs, 10)]
+    for app in (memory, sqlite):
+        app.insert_playlist(main.Playlist('Road Trip'))
+    for step in range(120):
+        operation = rng.random()
+        if operation < 0.4:
+            fields = (rng.choice(names), f"Artist {step % 4}", 'Album', rng.choice(['Pop', 'Rock']), rng.randint(60, 400))
+            for app in (memory, sqlite):
+                app.insert_song(main.Song(*fields))
+        elif operation < 0.7:
+            song_id = rng.choice(sorted(memory.songs_by_id))
+            for app in (memory, sqlite):
+                app.remove_song(app.songs_by_id[song_id])
+        else:
+            song_id = rng.choice(sorted(memory.songs_by_id))
+            for app in (memory, sqlite):
+                app.add_to_playlist(app.find_playlist('road trip'), app.songs_by_id[song_id])
+        name = rng.choice(names)
+        assert [song.id for song in sqlite.find_songs(name.upper())] == [song.id for song in memory.find_songs(name)]
+        criteria = {'artist': f"artist {step % 4}", 'min_duration': '2:00'} if step % 2 else {'genre': 'POP', 'max_duration': '5:00'}
+        assert sorted(song.id for song in sqlite.query(**criteria)) == sorted(song.id for song in memory.query(**criteria))
+        assert sqlite.store.playlists() == [(playlist.name, [song.id for song in playlist.songs]) for playlist in memory.playlists]
+
+    #Der gelöschte Song mit der größten ID darf seine ID auch nach einem Neustart nicht weitergeben
+    newest = max(memory.songs, key=lambda song: song.id)
+    for app in (memory, sqlite):
+        app.remove_song(app.songs_by_id[newest.id])
+    expected = by_id(catalog_state(memory))
+    sqlite.store.close()
+    reopened = main.MusicApp(str(tmp_path / 'catalog.json'), 'sqlite', initial_songs=0)
+    try:
+        assert by_id(catalog_state(reopened)) == expected
+        song = main.Song('After restart', 'Artist', 'Album', 'Pop', 200)
+        reopened.insert_song(song)
+        assert song.id == newest.id + 1
+    finally:
+        reopened.store.close()
+
+
+def test_failed_batch_is_rolled_back(pair):
+    _, sqlite = pair
+    store = sqlite.store
+    before = store.song_ids()
+    song = main.Song('Rolled back', 'Artist', 'Album', 'Pop', 200, song_id=sqlite.next_song_id)
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.apply({"op": "add_song", "song": song.to_dict()})
+            store.apply({"op": "delete_song", "id": before[0]})
+            raise RuntimeError("abort")
+    assert store.song_ids() == before
+    assert store.find_song_ids('rolled back') == []
+
+
+def test_invalid_duration_is_not_migrated(make_app, tmp_path):
+    songs = [{"id": 0, "name": "Legacy", "artist": "A", "album": "B", "genre": "Pop", "duration": "3 min"}]
+    with open(tmp_path / 'legacy.json', 'w') as f:
+        json.dump({"songs": songs, "playlists": []}, f)
+    with pytest.raises(ValueError):
+        make_app('legacy.json', storage_mode='sqlite')
+    #Die Übernahme läuft in einer Transaktion, die Datenbank bleibt leer und der nächste Start versucht es erneut
+    store = main.SQLiteStore(str(tmp_path / 'legacy.db'))
+    try:
+        assert store.is_empty()
+    finally:
+        store.close()